@@ -3,7 +3,25 @@
 #
 # SPDX-License-Identifier: MIT
 
-from .registry import Registry, ImplementationDetails
+from .registry import (
+    Registry,
+    FrozenRegistry,
+    ImplementationDetails,
+    Lifetime,
+    PoolStatistics,
+    RegistrySnapshot,
+)
+from .instrumentation import RegistryObserver, StatisticsCollector
 from .settings import SettingDetails
 
-__all__ = ["Registry", "ImplementationDetails", "SettingDetails"]
+__all__ = [
+    "Registry",
+    "FrozenRegistry",
+    "ImplementationDetails",
+    "Lifetime",
+    "PoolStatistics",
+    "RegistrySnapshot",
+    "RegistryObserver",
+    "StatisticsCollector",
+    "SettingDetails",
+]
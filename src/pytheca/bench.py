@@ -0,0 +1,306 @@
+# SPDX-FileCopyrightText: 2025 SamuelYaron <samuel.yaron@oxur.de>
+# SPDX-FileCopyrightText: [year] [copyright holder] <[email address]>
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Benchmarks for registry resolution and settings lookup.
+
+Run with ``python -m pytheca.bench``. Results can be written to a JSON file and compared against a previous run.
+"""
+
+import argparse
+import json
+import time
+import weakref
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, NamedTuple
+
+from .registry import ImplementationDetails, Lifetime, Registry
+from .settings import EnvSettingsProvider, SettingDetails
+
+
+class BenchmarkResult(NamedTuple):
+    name: str
+    iterations: int
+    total_seconds: float
+
+    @property
+    def nanoseconds_per_call(self) -> float:
+        return self.total_seconds / self.iterations * 1e9
+
+
+class _Service:
+    pass
+
+
+class _ServiceWithSettings:
+    def __init__(
+        self,
+        first: Annotated[int, SettingDetails("bench.first", 1)],
+        second: Annotated[str, SettingDetails("bench.second", "2")],
+        third: Annotated[float, SettingDetails("bench.third", 3.0)],
+        fourth: Annotated[bool, SettingDetails("bench.fourth", True)],
+        fifth: Annotated[int, SettingDetails("bench.fifth", 5)],
+    ) -> None:
+        pass
+
+
+class _Level0:
+    pass
+
+
+class _Level1:
+    def __init__(self, dependency: _Level0) -> None:
+        pass
+
+
+class _Level2:
+    def __init__(self, dependency: _Level1) -> None:
+        pass
+
+
+class _Level3:
+    def __init__(self, dependency: _Level2) -> None:
+        pass
+
+
+class _Level4:
+    def __init__(self, dependency: _Level3) -> None:
+        pass
+
+
+class _DeclarativeRegistry(Registry):
+    service: Annotated[_Service, ImplementationDetails(_Service)]
+
+
+def _dynamic_registry() -> Registry:
+    registry = Registry()
+    registry.register_interface(
+        "service", _Service, implementation_details=ImplementationDetails(_Service)
+    )
+    return registry
+
+
+def _bench_transient() -> Callable[[], object]:
+    registry = _dynamic_registry()
+    return lambda: registry.service
+
+
+def _bench_singleton() -> Callable[[], object]:
+    registry = Registry()
+    registry.register_interface(
+        "service",
+        _Service,
+        implementation_details=ImplementationDetails(
+            _Service, lifetime=Lifetime.SINGLETON
+        ),
+    )
+    return lambda: registry.service
+
+
+def _bench_frozen_singleton() -> Callable[[], object]:
+    registry = Registry()
+    registry.register_interface(
+        "service",
+        _Service,
+        implementation_details=ImplementationDetails(
+            _Service, lifetime=Lifetime.SINGLETON
+        ),
+    )
+    frozen_registry = registry.freeze()
+    return lambda: frozen_registry.service
+
+
+def _bench_pooled_lease() -> Callable[[], object]:
+    registry = Registry()
+    registry.register_interface(
+        "service",
+        _Service,
+        implementation_details=ImplementationDetails(
+            _Service, lifetime=Lifetime.POOLED
+        ),
+    )
+
+    def lease() -> object:
+        with registry.lease("service") as service:
+            return service
+
+    return lease
+
+
+def _bench_many_settings() -> Callable[[], object]:
+    registry = Registry()
+    registry.register_interface(
+        "service",
+        _ServiceWithSettings,
+        implementation_details=ImplementationDetails(_ServiceWithSettings),
+    )
+    return lambda: registry.service
+
+
+def _bench_nested() -> Callable[[], object]:
+    registry = Registry()
+    for index, cls in enumerate([_Level0, _Level1, _Level2, _Level3, _Level4]):
+        registry.register_interface(
+            f"level{index}", cls, implementation_details=ImplementationDetails(cls)
+        )
+    return lambda: registry.level4
+
+
+def _bench_declarative_construction() -> Callable[[], object]:
+    return lambda: _DeclarativeRegistry().service
+
+
+def _bench_dynamic_construction() -> Callable[[], object]:
+    return lambda: _dynamic_registry().service
+
+
+def _bench_child_construction() -> Callable[[], object]:
+    registry = _DeclarativeRegistry()
+    return lambda: registry.child().service
+
+
+def _bench_rebinding() -> Callable[[], object]:
+    registry = _dynamic_registry()
+    implementation_details = ImplementationDetails(_Service)
+
+    def rebind_and_resolve() -> object:
+        registry.service = implementation_details
+        return registry.service
+
+    return rebind_and_resolve
+
+
+def _bench_concurrent() -> Callable[[], object]:
+    registry = Registry()
+    registry.register_interface(
+        "service",
+        _ServiceWithSettings,
+        implementation_details=ImplementationDetails(
+            _ServiceWithSettings, lifetime=Lifetime.SINGLETON
+        ),
+    )
+    executor = ThreadPoolExecutor(max_workers=8)
+
+    def resolve_concurrently() -> object:
+        return list(executor.map(lambda _: registry.service, range(8)))
+
+    weakref.finalize(resolve_concurrently, executor.shutdown)
+    return resolve_concurrently
+
+
+def _bench_env_settings_lookup() -> Callable[[], object]:
+    settings_provider = EnvSettingsProvider()
+    return lambda: settings_provider.get_setting_value("bench.first", int, 1)
+
+
+BENCHMARKS: dict[str, Callable[[], Callable[[], object]]] = {
+    "resolve_transient": _bench_transient,
+    "resolve_singleton": _bench_singleton,
+    "resolve_frozen_singleton": _bench_frozen_singleton,
+    "lease_pooled": _bench_pooled_lease,
+    "resolve_many_settings": _bench_many_settings,
+    "resolve_nested": _bench_nested,
+    "declarative_registry_construction": _bench_declarative_construction,
+    "dynamic_registry_construction": _bench_dynamic_construction,
+    "child_registry_construction": _bench_child_construction,
+    "rebinding_churn": _bench_rebinding,
+    "concurrent_resolution": _bench_concurrent,
+    "env_settings_lookup": _bench_env_settings_lookup,
+}
+
+
+def run_benchmark(name: str, iterations: int) -> BenchmarkResult:
+    """
+    Runs a single benchmark.
+
+    :param name: The name of the benchmark, must be a key of ``BENCHMARKS``.
+    :param iterations: The number of calls to time.
+    :return: The result of the benchmark.
+    """
+    benchmark = BENCHMARKS[name]()
+    benchmark()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        benchmark()
+    return BenchmarkResult(name, iterations, time.perf_counter() - start)
+
+
+def run_benchmarks(
+    iterations: int = 10000, names: Iterable[str] | None = None
+) -> list[BenchmarkResult]:
+    """
+    Runs the given benchmarks.
+
+    :param iterations: The number of calls to time per benchmark.
+    :param names: The benchmarks to run, all benchmarks if not set.
+    :return: The results of the benchmarks.
+    """
+    return [run_benchmark(name, iterations) for name in (names or list(BENCHMARKS))]
+
+
+def to_json(results: Iterable[BenchmarkResult]) -> dict[str, dict[str, float]]:
+    """
+    Converts benchmark results to a JSON serializable dictionary.
+    """
+    return {
+        result.name: {
+            "iterations": result.iterations,
+            "total_seconds": result.total_seconds,
+            "nanoseconds_per_call": result.nanoseconds_per_call,
+        }
+        for result in results
+    }
+
+
+def compare(
+    results: Iterable[BenchmarkResult], baseline: dict[str, dict[str, float]]
+) -> dict[str, float]:
+    """
+    Compares benchmark results to a baseline.
+
+    :param results: The current results.
+    :param baseline: A baseline as produced by ``to_json``.
+    :return: The ratio of current to baseline time per call for every benchmark present in both.
+    """
+    return {
+        result.name: result.nanoseconds_per_call
+        / baseline[result.name]["nanoseconds_per_call"]
+        for result in results
+        if result.name in baseline
+    }
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m pytheca.bench", description=__doc__
+    )
+    parser.add_argument("--iterations", type=int, default=10000)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--baseline", help="Compare against results in this file.")
+    parser.add_argument("benchmarks", nargs="*", help="The benchmarks to run.")
+    args = parser.parse_args(argv)
+    unknown_benchmarks = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown_benchmarks:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown_benchmarks))}")
+
+    results = run_benchmarks(args.iterations, args.benchmarks)
+    ratios: dict[str, float] = {}
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            ratios = compare(results, json.load(baseline_file))
+    for result in results:
+        line = f"{result.name:<36}{result.nanoseconds_per_call:>14.0f} ns/call"
+        if result.name in ratios:
+            line += f"{ratios[result.name]:>10.2f}x baseline"
+        print(line)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(to_json(results), output_file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,352 @@
+# SPDX-FileCopyrightText: 2025 SamuelYaron <samuel.yaron@oxur.de>
+# SPDX-FileCopyrightText: [year] [copyright holder] <[email address]>
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Converters turning raw setting values into typed values.
+
+A converter is a callable taking a raw value, either a string read from the environment or a value parsed from a
+settings file, and returning the typed value. It raises ``ValueError`` if the value is malformed and ``TypeError``
+if the value has a shape the type cannot be built from, e.g. a list for an ``int`` setting.
+"""
+
+import dataclasses
+import enum
+import json
+import re
+import threading
+from collections.abc import Callable
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Literal, Union, get_args, get_origin, get_type_hints
+from types import UnionType
+
+Converter = Callable[[Any], Any]
+ConverterFactory = Callable[[Any, "ConverterRegistry"], Converter | None]
+
+
+class ByteSize(int):
+    """
+    A number of bytes, parsed from values like ``512``, ``10KB`` or ``1.5GiB``.
+    """
+
+
+class ConverterRegistry:
+    """
+    A registry of converters keyed by setting type.
+
+    Converters for plain types are registered with ``register``. Parameterized and structured types like
+    ``list[int]``, ``Literal``, enums and dataclasses are handled by factories, which build a converter for a type
+    from the converters of its components. The converter for a type is built once and cached, so converting a
+    composite value is a single call without dispatching on the type again.
+    """
+
+    def __init__(self) -> None:
+        self._converters: dict[Any, Converter] = {}
+        self._factories: list[ConverterFactory] = []
+        self._cache: dict[Any, Converter | None] = {}
+        self._lock = threading.Lock()
+
+    def register(self, setting_type: Any, converter: Converter) -> None:
+        """
+        Registers the converter for a type, replacing a previously registered one.
+        :param setting_type: The type the converter produces.
+        :param converter: The converter.
+        """
+        with self._lock:
+            self._converters[setting_type] = converter
+            self._cache = {}
+
+    def register_factory(self, factory: ConverterFactory) -> None:
+        """
+        Registers a factory building converters for types without a registered converter.
+
+        Factories registered later are asked first. A factory returns None for types it does not handle.
+        :param factory: A callable taking a type and this registry and returning a converter or None.
+        """
+        with self._lock:
+            self._factories.insert(0, factory)
+            self._cache = {}
+
+    def get_converter(self, setting_type: Any) -> Converter | None:
+        """
+        Returns the converter for a type.
+        :param setting_type: The type to convert to.
+        :return: The converter or None if the type is not supported.
+        """
+        try:
+            return self._cache[setting_type]
+        except KeyError:
+            pass
+        except TypeError:
+            return self.__build_converter(setting_type)
+        converter = self.__build_converter(setting_type)
+        self._cache[setting_type] = converter
+        return converter
+
+    def __build_converter(self, setting_type: Any) -> Converter | None:
+        try:
+            converter = self._converters.get(setting_type)
+        except TypeError:
+            converter = None
+        if converter is not None:
+            return converter
+        for factory in self._factories:
+            converter = factory(setting_type, self)
+            if converter is not None:
+                return converter
+        return None
+
+
+def _scalar(setting_type: type, parse: Callable[[str], Any] | None = None) -> Converter:
+    convert = parse or setting_type
+
+    def convert_scalar(raw_value: Any) -> Any:
+        if type(raw_value) is setting_type:
+            return raw_value
+        if isinstance(raw_value, (dict, list)):
+            raise TypeError(f"Cannot convert {type(raw_value)} to {setting_type}.")
+        return convert(str(raw_value))
+
+    return convert_scalar
+
+
+_DURATION_UNITS = {
+    "us": 1e-6,
+    "ms": 1e-3,
+    "s": 1,
+    "m": 60,
+    "h": 3600,
+    "d": 86400,
+    "w": 604800,
+}
+_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(us|ms|s|m|h|d|w)")
+
+
+def _parse_duration(raw_value: str) -> timedelta:
+    """
+    Parses a number of seconds or a duration like ``1h30m`` or ``250ms``.
+    """
+    raw_value = raw_value.strip().lower()
+    try:
+        return timedelta(seconds=float(raw_value))
+    except ValueError:
+        pass
+    parts = _DURATION_PATTERN.findall(raw_value)
+    if not parts or "".join(number + unit for number, unit in parts) != raw_value:
+        raise ValueError(f"Invalid duration {raw_value!r}.")
+    return timedelta(
+        seconds=sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+    )
+
+
+_BYTE_SIZE_UNITS = {
+    "": 1,
+    "b": 1,
+    "kb": 1000,
+    "mb": 1000**2,
+    "gb": 1000**3,
+    "tb": 1000**4,
+    "kib": 1024,
+    "mib": 1024**2,
+    "gib": 1024**3,
+    "tib": 1024**4,
+}
+_BYTE_SIZE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*([a-z]*)")
+
+
+def _parse_byte_size(raw_value: str) -> ByteSize:
+    """
+    Parses a number of bytes with an optional decimal (``KB``) or binary (``KiB``) unit.
+    """
+    match = _BYTE_SIZE_PATTERN.fullmatch(raw_value.strip().lower())
+    if match is None or match.group(2) not in _BYTE_SIZE_UNITS:
+        raise ValueError(f"Invalid byte size {raw_value!r}.")
+    return ByteSize(float(match.group(1)) * _BYTE_SIZE_UNITS[match.group(2)])
+
+
+def _split_sequence(raw_value: Any) -> list[Any]:
+    if isinstance(raw_value, list):
+        return raw_value
+    if not isinstance(raw_value, str):
+        raise TypeError(f"Cannot convert {type(raw_value)} to a sequence.")
+    if raw_value.lstrip().startswith("["):
+        values: list[Any] = json.loads(raw_value)
+        return values
+    return [value.strip() for value in raw_value.split(",")] if raw_value else []
+
+
+def _split_mapping(raw_value: Any) -> dict[Any, Any]:
+    if isinstance(raw_value, dict):
+        return raw_value
+    if not isinstance(raw_value, str):
+        raise TypeError(f"Cannot convert {type(raw_value)} to a mapping.")
+    if raw_value.lstrip().startswith("{"):
+        values: dict[Any, Any] = json.loads(raw_value)
+        return values
+    mapping = {}
+    for item in raw_value.split(",") if raw_value else []:
+        key, separator, value = item.partition("=")
+        if not separator:
+            raise ValueError(f"Invalid mapping item {item!r}.")
+        mapping[key.strip()] = value.strip()
+    return mapping
+
+
+def _sequence_factory(
+    setting_type: Any, converters: ConverterRegistry
+) -> Converter | None:
+    origin = get_origin(setting_type) or setting_type
+    if origin not in (list, tuple, set, frozenset):
+        return None
+    arguments = get_args(setting_type)
+    if origin is tuple and arguments and arguments[-1] is not Ellipsis:
+        item_converters = [converters.get_converter(argument) for argument in arguments]
+        if None in item_converters:
+            return None
+
+        def convert_fixed_tuple(raw_value: Any) -> tuple[Any, ...]:
+            values = _split_sequence(raw_value)
+            if len(values) != len(item_converters):
+                raise ValueError(
+                    f"Expected {len(item_converters)} items, got {len(values)}."
+                )
+            return tuple(
+                convert(value)  # type: ignore[misc]
+                for convert, value in zip(item_converters, values)
+            )
+
+        return convert_fixed_tuple
+    item_converter = converters.get_converter(arguments[0]) if arguments else None
+    if arguments and item_converter is None:
+        return None
+
+    def convert_sequence(raw_value: Any) -> Any:
+        values = _split_sequence(raw_value)
+        if item_converter is not None:
+            values = [item_converter(value) for value in values]
+        return values if origin is list else origin(values)
+
+    return convert_sequence
+
+
+def _mapping_factory(
+    setting_type: Any, converters: ConverterRegistry
+) -> Converter | None:
+    if (get_origin(setting_type) or setting_type) is not dict:
+        return None
+    arguments = get_args(setting_type)
+    if not arguments:
+        return _split_mapping
+    key_converter = converters.get_converter(arguments[0])
+    value_converter = converters.get_converter(arguments[1])
+    if key_converter is None or value_converter is None:
+        return None
+
+    def convert_mapping(raw_value: Any) -> dict[Any, Any]:
+        return {
+            key_converter(key): value_converter(value)
+            for key, value in _split_mapping(raw_value).items()
+        }
+
+    return convert_mapping
+
+
+def _lookup(values: dict[str, Any], description: str) -> Converter:
+    def convert_lookup(raw_value: Any) -> Any:
+        try:
+            return values[str(raw_value)]
+        except KeyError:
+            raise ValueError(f"{raw_value!r} is not one of {description}.") from None
+
+    return convert_lookup
+
+
+def _literal_factory(
+    setting_type: Any, converters: ConverterRegistry
+) -> Converter | None:
+    if get_origin(setting_type) is not Literal:
+        return None
+    values = {str(value): value for value in get_args(setting_type)}
+    return _lookup(values, ", ".join(values))
+
+
+def _enum_factory(setting_type: Any, converters: ConverterRegistry) -> Converter | None:
+    if not (isinstance(setting_type, type) and issubclass(setting_type, enum.Enum)):
+        return None
+    members = {str(member.value): member for member in setting_type}
+    members.update(setting_type.__members__)
+    return _lookup(members, ", ".join(setting_type.__members__))
+
+
+def _optional_factory(
+    setting_type: Any, converters: ConverterRegistry
+) -> Converter | None:
+    if get_origin(setting_type) not in (Union, UnionType):
+        return None
+    arguments = [
+        argument for argument in get_args(setting_type) if argument is not type(None)
+    ]
+    if len(arguments) != 1:
+        return None
+    return converters.get_converter(arguments[0])
+
+
+def _dataclass_factory(
+    setting_type: Any, converters: ConverterRegistry
+) -> Converter | None:
+    if not (isinstance(setting_type, type) and dataclasses.is_dataclass(setting_type)):
+        return None
+    try:
+        type_hints = get_type_hints(setting_type)
+    except NameError:
+        return None
+    field_converters = {}
+    for field in dataclasses.fields(setting_type):
+        if not field.init:
+            continue
+        field_converter = converters.get_converter(type_hints[field.name])
+        if field_converter is None:
+            return None
+        field_converters[field.name] = field_converter
+
+    def convert_dataclass(raw_value: Any) -> Any:
+        if isinstance(raw_value, setting_type):
+            return raw_value
+        values = _split_mapping(raw_value)
+        unknown_fields = set(values) - set(field_converters)
+        if unknown_fields:
+            raise ValueError(f"Unknown fields {', '.join(sorted(unknown_fields))}.")
+        return setting_type(
+            **{name: field_converters[name](value) for name, value in values.items()}
+        )
+
+    return convert_dataclass
+
+
+default_converters = ConverterRegistry()
+"""
+The converters used by the settings providers of pytheca. Register converters for custom types here.
+"""
+
+for _setting_type, _parse in (
+    (int, None),
+    (str, None),
+    (bool, None),
+    (float, None),
+    (Path, None),
+    (timedelta, _parse_duration),
+    (ByteSize, _parse_byte_size),
+):
+    default_converters.register(_setting_type, _scalar(_setting_type, _parse))
+for _factory in (
+    _dataclass_factory,
+    _enum_factory,
+    _literal_factory,
+    _mapping_factory,
+    _sequence_factory,
+    _optional_factory,
+):
+    default_converters.register_factory(_factory)
+del _setting_type, _parse, _factory
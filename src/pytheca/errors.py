@@ -13,6 +13,12 @@ class PythecaError(Exception):
 class RegistryError(PythecaError): ...
 
 
+class RegistryValidationError(RegistryError):
+    def __init__(self, message: str, errors: list[PythecaError]) -> None:
+        super().__init__(message)
+        self.errors = errors
+
+
 class SettingError(PythecaError):
     def __init__(
         self, message: str, setting_identifier: str, setting_type: type | None = None
@@ -20,3 +26,9 @@ class SettingError(PythecaError):
         super().__init__(message)
         self.setting_type = setting_type
         self.setting_identifier = setting_identifier
+
+
+class SettingsFileError(PythecaError):
+    def __init__(self, message: str, path: str) -> None:
+        super().__init__(message)
+        self.path = path
@@ -0,0 +1,142 @@
+# SPDX-FileCopyrightText: 2025 SamuelYaron <samuel.yaron@oxur.de>
+# SPDX-FileCopyrightText: [year] [copyright holder] <[email address]>
+#
+# SPDX-License-Identifier: MIT
+
+import math
+import threading
+from collections import deque
+from typing import Any
+
+
+class RegistryObserver:
+    """
+    Receives events about the resolution of interfaces.
+
+    Observers are registered with ``Registry.add_observer``. All methods do nothing by default, subclasses override
+    the events they are interested in. Durations are given in seconds.
+    """
+
+    def on_resolve_start(self, name: str) -> None:
+        """
+        Called before an interface is resolved.
+        :param name: The name of the interface.
+        """
+
+    def on_resolve_end(self, name: str, duration: float, cache_hit: bool) -> None:
+        """
+        Called after an interface was resolved.
+        :param name: The name of the interface.
+        :param duration: The time the whole resolution took.
+        :param cache_hit: Whether a cached instance was returned.
+        """
+
+    def on_settings_lookup(
+        self, name: str, setting_identifier: str, duration: float
+    ) -> None:
+        """
+        Called after a setting was retrieved for an implementation.
+        :param name: The name of the interface the setting is injected into.
+        :param setting_identifier: The identifier of the setting.
+        :param duration: The time the lookup took. All settings of an implementation are retrieved at once, the
+            time of that lookup is split evenly among them.
+        """
+
+    def on_construct(self, name: str, duration: float) -> None:
+        """
+        Called after the constructor of an implementation returned.
+        :param name: The name of the interface.
+        :param duration: The time the constructor took, excluding setting lookups and dependencies.
+        """
+
+
+class _InterfaceStatistics:
+    def __init__(self, max_samples: int) -> None:
+        self.resolutions = 0
+        self.cache_hits = 0
+        self.constructions = 0
+        self.construction_seconds = 0.0
+        self.construction_samples: deque[float] = deque(maxlen=max_samples)
+        self.settings_lookups = 0
+        self.settings_lookup_seconds = 0.0
+
+
+class StatisticsCollector(RegistryObserver):
+    """
+    An observer aggregating resolution statistics per interface.
+    """
+
+    def __init__(self, max_samples: int = 1000) -> None:
+        """
+        :param max_samples: The number of most recent construction times kept per interface to compute percentiles.
+        """
+        self.max_samples = max_samples
+        self._statistics: dict[str, _InterfaceStatistics] = {}
+        self._lock = threading.Lock()
+
+    def _get_statistics(self, name: str) -> _InterfaceStatistics:
+        statistics = self._statistics.get(name)
+        if statistics is None:
+            statistics = self._statistics.setdefault(
+                name, _InterfaceStatistics(self.max_samples)
+            )
+        return statistics
+
+    def on_resolve_end(self, name: str, duration: float, cache_hit: bool) -> None:
+        with self._lock:
+            statistics = self._get_statistics(name)
+            statistics.resolutions += 1
+            statistics.cache_hits += cache_hit
+
+    def on_settings_lookup(
+        self, name: str, setting_identifier: str, duration: float
+    ) -> None:
+        with self._lock:
+            statistics = self._get_statistics(name)
+            statistics.settings_lookups += 1
+            statistics.settings_lookup_seconds += duration
+
+    def on_construct(self, name: str, duration: float) -> None:
+        with self._lock:
+            statistics = self._get_statistics(name)
+            statistics.constructions += 1
+            statistics.construction_seconds += duration
+            statistics.construction_samples.append(duration)
+
+    def reset(self) -> None:
+        """
+        Discards all collected statistics.
+        """
+        with self._lock:
+            self._statistics = {}
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """
+        Exports the collected statistics.
+        :return: A dictionary mapping interface names to their statistics.
+        """
+        with self._lock:
+            return {
+                name: {
+                    "resolutions": statistics.resolutions,
+                    "cache_hits": statistics.cache_hits,
+                    "cache_hit_ratio": statistics.cache_hits / statistics.resolutions
+                    if statistics.resolutions
+                    else None,
+                    "constructions": statistics.constructions,
+                    "construction_seconds": statistics.construction_seconds,
+                    "construction_p99_seconds": _percentile(
+                        statistics.construction_samples, 0.99
+                    ),
+                    "settings_lookups": statistics.settings_lookups,
+                    "settings_lookup_seconds": statistics.settings_lookup_seconds,
+                }
+                for name, statistics in self._statistics.items()
+            }
+
+
+def _percentile(samples: deque[float], percentile: float) -> float | None:
+    if not samples:
+        return None
+    ordered_samples = sorted(samples)
+    return ordered_samples[math.ceil(percentile * len(ordered_samples)) - 1]
@@ -3,11 +3,41 @@
 #
 # SPDX-License-Identifier: MIT
 
-from typing import Any, NamedTuple, get_type_hints, Annotated
+import asyncio
+import concurrent.futures
+import functools
+import importlib
+import inspect
+import itertools
+import os
+import threading
+import time
+import weakref
+from collections import ChainMap
+from collections.abc import Hashable, Iterable, Iterator, Mapping
+from contextlib import AsyncExitStack, ExitStack, contextmanager
+from enum import Enum
+from typing import (
+    Any,
+    Callable,
+    NamedTuple,
+    NoReturn,
+    Self,
+    get_type_hints,
+    Annotated,
+)
 
-from .settings import SettingsProvider, EnvSettingsProvider, SettingDetails
+from .converters import default_converters
+from .settings import (
+    SettingsProvider,
+    EnvSettingsProvider,
+    SettingDetails,
+    SettingRequest,
+    StaticSettingsProvider,
+)
 
-from .errors import RegistryError
+from .errors import PythecaError, RegistryError, RegistryValidationError
+from .instrumentation import RegistryObserver
 
 
 class _InterfaceDetails(NamedTuple):
@@ -15,29 +45,287 @@ class _InterfaceDetails(NamedTuple):
     interface_cls: type
 
 
+class Lifetime(Enum):
+    """
+    Determines how long an instance created by the registry is reused.
+    """
+
+    #: A new instance is created on every access.
+    TRANSIENT = "transient"
+    #: One instance is created per registry and reused on every access.
+    SINGLETON = "singleton"
+    #: One instance is created per active ``Registry.scope()`` and reused within it.
+    SCOPED = "scoped"
+    #: Instances are kept in a bounded pool and handed out exclusively by ``Registry.lease()``.
+    POOLED = "pooled"
+
+
 class ImplementationDetails(NamedTuple):
-    implementation_cls: type
+    #: The implementation class or its import path, e.g. ``"myapp.printers.UpperPrinter"`` or
+    #: ``"myapp.printers:UpperPrinter"``. Import paths are imported on first resolution.
+    implementation_cls: type | str
+    lifetime: Lifetime = Lifetime.TRANSIENT
+    lazy: bool = False
+    #: A callable creating the instances instead of the implementation class. Its parameters are not analysed.
+    factory: Callable[..., Any] | None = None
+    #: The parameters of the factory to inject, annotated like constructor parameters, e.g.
+    #: ``{"url": Annotated[str, SettingDetails("db.url")], "pool": ConnectionPool}``.
+    parameters: Mapping[str, Any] | None = None
+    #: The maximum number of instances of a pooled implementation.
+    pool_size: int = 8
+    #: The seconds ``Registry.lease()`` waits for an instance of a full pool, forever if None.
+    pool_timeout: float | None = None
+
+
+class PoolStatistics(NamedTuple):
+    #: The number of instances in the pool, leased or idle.
+    size: int
+    idle: int
+    leased: int
+    max_size: int
+    created: int
+    leases: int
+    #: The number of leases that had to wait for an instance to be returned.
+    waits: int
+    timeouts: int
+    wait_seconds: float
+
+
+class _SettingInjection(NamedTuple):
+    parameter_name: str
+    setting_type: type
+    setting_details: SettingDetails
+
+
+class _DependencyInjection(NamedTuple):
+    parameter_name: str
+    interface_cls: type
+    #: Parameters with a default value are left to their default if no interface is registered for their class.
+    has_default: bool = False
+
+
+class _InjectionPlan(NamedTuple):
+    settings: tuple[_SettingInjection, ...]
+    dependencies: tuple[_DependencyInjection, ...]
+    #: The implementation class or factory to call.
+    constructor: Callable[..., Any]
+    #: True if the instance can only be created by ``aget()`` or ``warm_up()``, because it defines an
+    #: ``async def __ainit__`` or the factory is a coroutine function.
+    async_init: bool = False
+    setting_requests: tuple[SettingRequest, ...] = ()
+    async_factory: bool = False
+
+
+class _ConstructionStep(NamedTuple):
+    name: str
+    dependencies: tuple[tuple[str, str], ...]
+    lazy: bool = False
 
 
 class _RegistryEntry(NamedTuple):
     interface_details: _InterfaceDetails
     implementation_details: ImplementationDetails | None
+    injection_plan: _InjectionPlan | None = None
+    #: The interface an additional implementation was added to with ``Registry.add_implementation``.
+    group: str | None = None
+    key: Hashable | None = None
+
+
+class RegistrySnapshot(NamedTuple):
+    """
+    The compiled state of a registry, created by ``Registry.snapshot()`` and restored by ``Registry.from_snapshot()``.
+
+    Snapshots can be pickled if all implementation classes, factories and setting values can be pickled. Classes
+    are pickled by their qualified name.
+    """
+
+    registry_cls: type
+    interfaces: dict[str, _RegistryEntry]
+    construction_orders: dict[str, tuple[_ConstructionStep, ...]]
+    #: The values of all injected settings by identifier and type, None if the settings were not captured.
+    settings: dict[tuple[str, type], Any] | None
+
+
+class _Indexes(NamedTuple):
+    names_by_interface: dict[type, tuple[str, ...]]
+    implementations: dict[str, tuple[str, ...]]
+    keyed_implementations: dict[str, dict[Hashable, str]]
+
+
+_MISSING = object()
+_implementation_ids = itertools.count()
+#: The number of ``Registry.use()`` blocks per instance, shared by all registries because children use the
+#: singletons of their parents.
+_in_flight: dict[int, int] = {}
+_in_flight_lock = threading.Lock()
+#: The registries created with ``fork_safe=True``, reset by a single hook in child processes.
+_fork_safe_registries: "weakref.WeakSet[Registry]" = weakref.WeakSet()
+
+
+class _Scope:
+    """
+    Holds the instances of scoped interfaces for a single ``Registry.scope()``.
+    """
+
+    def __init__(self) -> None:
+        self.instances: dict[str, Any] = {}
+
+
+class _Pool:
+    """
+    Holds the instances of a pooled interface.
+
+    The pool grows on demand up to its maximum size. Returned instances are handed out again, most recently used
+    first. A retired pool, whose binding was replaced or whose registry was closed, hands out no instances and does
+    not take them back.
+    """
+
+    def __init__(self, implementation_details: ImplementationDetails) -> None:
+        self.implementation_details = implementation_details
+        self.idle: list[Any] = []
+        self.size = 0
+        self.retired = False
+        self.condition = threading.Condition(threading.Lock())
+        self.created = 0
+        self.leases = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self, create: Callable[[], Any], timeout: float | None) -> Any:
+        """
+        Takes an idle instance or creates one if the pool is not full, otherwise waits for an instance.
+
+        :return: The instance, or ``_MISSING`` if the pool was retired.
+        :raises TimeoutError: If no instance became available within the timeout.
+        """
+        with self.condition:
+            if not self.idle and self.size >= self.implementation_details.pool_size:
+                self.waits += 1
+                start = time.perf_counter()
+                available = self.condition.wait_for(
+                    lambda: (
+                        self.retired
+                        or bool(self.idle)
+                        or self.size < self.implementation_details.pool_size
+                    ),
+                    timeout,
+                )
+                self.wait_seconds += time.perf_counter() - start
+                if not available:
+                    self.timeouts += 1
+                    raise TimeoutError
+            if self.retired:
+                return _MISSING
+            self.leases += 1
+            if self.idle:
+                return self.idle.pop()
+            self.size += 1
+        try:
+            instance = create()
+        except BaseException:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.created += 1
+        return instance
+
+    def release(self, instance: Any) -> bool:
+        """
+        Returns a leased instance to the pool.
+
+        :return: False if the pool was retired and the instance has to be disposed.
+        """
+        with self.condition:
+            if self.retired:
+                self.size -= 1
+                return False
+            self.idle.append(instance)
+            self.condition.notify()
+            return True
+
+    def retire(self) -> list[Any]:
+        """
+        Retires the pool and wakes all waiting leases.
+
+        :return: The idle instances, which have to be disposed.
+        """
+        with self.condition:
+            self.retired = True
+            idle = self.idle
+            self.idle = []
+            self.size -= len(idle)
+            self.condition.notify_all()
+            return idle
+
+    def get_statistics(self) -> PoolStatistics:
+        with self.condition:
+            return PoolStatistics(
+                self.size,
+                len(self.idle),
+                self.size - len(self.idle),
+                self.implementation_details.pool_size,
+                self.created,
+                self.leases,
+                self.waits,
+                self.timeouts,
+                self.wait_seconds,
+            )
 
 
 class Registry:
     """
     Registry provides an object, where you can register interfaces and corresponding implementations.
+
+    Registries are thread-safe. Reading an already created singleton does not acquire any lock, the constructor of a
+    singleton runs exactly once even if it is requested by many threads at the same time, and registering or
+    rebinding an interface is atomic. Instances of a rebound interface that are still under construction are not
+    cached. Scopes are bound to the thread that opened them.
+
+    Registries created with ``child()`` overlay the bindings of their parent. They store only the bindings
+    registered on them and reuse the parent's injection plans and singletons for everything they do not override.
     """
 
     settings_provider: Annotated[
-        SettingsProvider, ImplementationDetails(implementation_cls=EnvSettingsProvider)
+        SettingsProvider,
+        ImplementationDetails(
+            implementation_cls=EnvSettingsProvider, lifetime=Lifetime.SINGLETON
+        ),
     ]
 
-    def __init__(
-        self,
-    ) -> None:
-        super().__setattr__("_interfaces", {})
-        type_hints = get_type_hints(self.__class__, include_extras=True)
+    def __init__(self, *, eager: bool = False, fork_safe: bool = False) -> None:
+        """
+        :param eager: If True, all bindings are validated and all singletons are created on construction.
+        :param fork_safe: If True, ``reset_after_fork()`` is called in child processes created by ``os.fork()``.
+        :raises RegistryValidationError: If eager is set and the validation failed.
+        """
+        # The class table is copied rather than layered behind a ChainMap like the bindings of children. Copying
+        # the table is cheap, while ChainMap lookups slow down every resolution of the registry.
+        interfaces = dict(self.__get_declarative_interfaces())
+        self.__init_state(interfaces, interfaces, None)
+        if fork_safe:
+            _fork_safe_registries.add(self)
+        if eager:
+            self.validate(instantiate_singletons=True)
+
+    @classmethod
+    def __get_declarative_interfaces(cls) -> dict[str, _RegistryEntry]:
+        """
+        Returns the bindings declared as class annotations, analysed and validated once per registry class.
+
+        The analysis runs on the first instantiation instead of at class creation, so annotations may refer to
+        classes defined after the registry. Injection plans compiled by any instance are stored in the returned
+        dictionary, so following instances start with them.
+        """
+        interfaces: dict[str, _RegistryEntry] | None = cls.__dict__.get(
+            "_Registry__declarative_interfaces"
+        )
+        if interfaces is not None:
+            return interfaces
+        interfaces = {}
+        type_hints = get_type_hints(cls, include_extras=True)
         for name, annotation in type_hints.items():
             metadata: tuple[Any, ...] = getattr(annotation, "__metadata__", tuple())
             origin_class = getattr(annotation, "__origin__", None)
@@ -47,19 +335,66 @@ class Registry:
                 or not origin_class
             ):
                 continue
-            self.register_interface(
-                name, origin_class, implementation_details=metadata[0]
+            cls.__check_implementation(origin_class, metadata[0])
+            interfaces[name] = _RegistryEntry(
+                _InterfaceDetails(name, origin_class), metadata[0]
+            )
+        setattr(cls, "_Registry__declarative_interfaces", interfaces)
+        return interfaces
+
+    @staticmethod
+    def __check_implementation(
+        interface_cls: type, implementation_details: ImplementationDetails | None
+    ) -> None:
+        """
+        Checks that an implementation class subclasses its interface class. Import paths are checked once imported.
+        """
+        if (
+            implementation_details
+            and not isinstance(implementation_details.implementation_cls, str)
+            and not issubclass(implementation_details.implementation_cls, interface_cls)
+        ):
+            raise RegistryError(
+                f"The implementation class {implementation_details.implementation_cls} must be a subclass of the interface class {interface_cls}."
+            )
+        if implementation_details and implementation_details.pool_size < 1:
+            raise RegistryError(
+                f"The pool size of {implementation_details.implementation_cls} must be at least 1."
             )
 
+    def __init_state(
+        self,
+        own_interfaces: dict[str, _RegistryEntry],
+        interfaces: dict[str, _RegistryEntry] | ChainMap[str, _RegistryEntry],
+        parent: "Registry | None",
+    ) -> None:
+        super().__setattr__("_own_interfaces", own_interfaces)
+        super().__setattr__("_interfaces", interfaces)
+        super().__setattr__("_parent", parent)
+        super().__setattr__("_children", weakref.WeakSet())
+        super().__setattr__("_delegated", {})
+        super().__setattr__("_indexes", None)
+        super().__setattr__("_frozen", False)
+        super().__setattr__("_construction_orders", {})
+        super().__setattr__("_singletons", {})
+        super().__setattr__("_singleton_locks", {})
+        super().__setattr__("_singleton_futures", {})
+        super().__setattr__("_generation", 0)
+        super().__setattr__("_lock", threading.RLock())
+        super().__setattr__("_scopes", weakref.WeakSet())
+        super().__setattr__("_current_scope", threading.local())
+        super().__setattr__("_observers", ())
+        super().__setattr__("_retired", [])
+        super().__setattr__("_pools", {})
+        super().__setattr__("_frozen_registries", weakref.WeakSet())
+        super().__setattr__("_setting_values", {})
+
     def __getattr__(self, name: str) -> Any:
         if name not in self._interfaces:
             raise RegistryError(f"The attribute {name} could not be found.")
-        implementation_details = self._interfaces[name].implementation_details
-        if implementation_details is None:
-            raise RegistryError(f"The interface {name} has no implementation details.")
-        return self.__instantiate_interface_instance(
-            implementation_details.implementation_cls
-        )
+        if self._observers:
+            return self.__observe_resolution(name, self.__resolve)
+        return self.__resolve(name)
 
     def __setattr__(self, name: str, value: Any) -> None:
         if name in self._interfaces and isinstance(value, ImplementationDetails):
@@ -75,13 +410,494 @@ class Registry:
         else:
             super().__setattr__(name, value)
 
-    def __instantiate_interface_instance(self, cls_object: type) -> Any:
-        type_hints = get_type_hints(
-            getattr(cls_object, "__init__", None), include_extras=True
+    def __observe_resolution(self, name: str, resolve: Callable[[str], Any]) -> Any:
+        for observer in self._observers:
+            observer.on_resolve_start(name)
+        start = time.perf_counter()
+        cache_hit = self.__is_cached(name)
+        instance = resolve(name)
+        duration = time.perf_counter() - start
+        for observer in self._observers:
+            observer.on_resolve_end(name, duration, cache_hit)
+        return instance
+
+    def __resolve(self, name: str) -> Any:
+        """
+        Resolves an interface together with all interfaces it depends on in a single pass.
+
+        Dependencies are constructed in topological order. Every interface is constructed at most once per
+        resolution, cached singleton and scoped instances are reused. Interfaces a child registry shares with its
+        parent are resolved by the parent.
+        """
+        parent = self._parent
+        if parent is not None and self.__is_delegated(name):
+            return parent.__resolve(name)
+        construction_order = self.__get_construction_order(name)
+        instances: dict[str, Any] = {}
+        required = {name}
+        for step in reversed(construction_order):
+            if step.name not in required:
+                continue
+            if parent is not None and self.__is_delegated(step.name):
+                instances[step.name] = parent.__resolve(step.name)
+                continue
+            instance = self.__get_cached_instance(step.name)
+            if instance is not _MISSING:
+                instances[step.name] = instance
+            elif not step.lazy:
+                required.update(dependency for _, dependency in step.dependencies)
+        for step in construction_order:
+            if step.name in required and step.name not in instances:
+                instances[step.name] = self.__construct(step, instances)
+        return instances[name]
+
+    def __is_cached(self, name: str) -> bool:
+        """
+        Checks if an instance of an interface is cached by the registry that resolves it.
+        """
+        parent: Registry | None = self._parent
+        if parent is not None and self.__is_delegated(name):
+            return parent.__is_cached(name)
+        return self.__get_cached_instance(name) is not _MISSING
+
+    def __get_cached_instance(self, name: str) -> Any:
+        lifetime = self._interfaces[name].implementation_details.lifetime
+        if lifetime is Lifetime.SINGLETON:
+            return self._singletons.get(name, _MISSING)
+        if lifetime is Lifetime.SCOPED:
+            return self.__get_scope(name).instances.get(name, _MISSING)
+        return _MISSING
+
+    def __get_scope(self, name: str) -> _Scope:
+        scope: _Scope | None = getattr(self._current_scope, "scope", None)
+        if scope is None:
+            raise RegistryError(
+                f"The scoped interface {name} can only be accessed within a scope."
+            )
+        return scope
+
+    def __construct(self, step: _ConstructionStep, instances: dict[str, Any]) -> Any:
+        lifetime = self._interfaces[step.name].implementation_details.lifetime
+        if lifetime is Lifetime.SINGLETON:
+            implementation_details = self._interfaces[step.name].implementation_details
+            with self.__get_singleton_lock(step.name):
+                instance = self._singletons.get(step.name, _MISSING)
+                if instance is _MISSING:
+                    instance = self.__create_instance(step, instances)
+                    self.__cache_singleton(step.name, implementation_details, instance)
+                return instance
+        instance = self.__create_instance(step, instances)
+        if lifetime is Lifetime.SCOPED:
+            self.__get_scope(step.name).instances[step.name] = instance
+        return instance
+
+    def __create_instance(
+        self, step: _ConstructionStep, instances: dict[str, Any]
+    ) -> Any:
+        if (
+            self._interfaces[step.name].implementation_details.lifetime
+            is Lifetime.POOLED
+        ):
+            raise RegistryError(
+                f"The pooled interface {step.name} can only be used with lease()."
+            )
+        if self.__get_injection_plan(step.name).async_init:
+            raise RegistryError(
+                f"The interface {step.name} requires asynchronous initialization, use aget() or warm_up()."
+            )
+        if step.lazy:
+            return _LazyProxy(
+                self._interfaces[step.name].interface_details.interface_cls,
+                functools.partial(self.__create_with_dependencies, step),
+            )
+        return self.__call_constructor(step, instances)
+
+    def __create_with_dependencies(self, step: _ConstructionStep) -> Any:
+        instances = {
+            dependency: self.__resolve(dependency)
+            for _, dependency in step.dependencies
+        }
+        return self.__call_constructor(step, instances)
+
+    async def __acreate_instance(
+        self, step: _ConstructionStep, instances: dict[str, Any]
+    ) -> Any:
+        if (
+            self._interfaces[step.name].implementation_details.lifetime
+            is Lifetime.POOLED
+        ):
+            return self.__create_instance(step, instances)
+        instance = self.__call_constructor(step, instances)
+        if self.__get_injection_plan(step.name).async_factory:
+            instance = await instance
+            if not inspect.iscoroutinefunction(getattr(instance, "__ainit__", None)):
+                return instance
+        await instance.__ainit__()
+        return instance
+
+    async def __aconstruct(
+        self, step: _ConstructionStep, instances: dict[str, Any]
+    ) -> Any:
+        implementation_details = self._interfaces[step.name].implementation_details
+        if not self.__get_injection_plan(step.name).async_init:
+            return self.__construct(step, instances)
+        if implementation_details.lifetime is Lifetime.SINGLETON:
+            return await self.__aconstruct_singleton(
+                step, instances, implementation_details
+            )
+        instance = await self.__acreate_instance(step, instances)
+        if implementation_details.lifetime is Lifetime.SCOPED:
+            self.__get_scope(step.name).instances[step.name] = instance
+        return instance
+
+    async def __aconstruct_singleton(
+        self,
+        step: _ConstructionStep,
+        instances: dict[str, Any],
+        implementation_details: ImplementationDetails,
+    ) -> Any:
+        """
+        Constructs an asynchronously initialized singleton once.
+
+        Concurrent resolutions, also from other threads and event loops, await the construction in flight instead
+        of starting their own. If that construction is cancelled, a waiting resolution starts a new one.
+        """
+        while True:
+            with self._lock:
+                instance = self._singletons.get(step.name, _MISSING)
+                if instance is not _MISSING:
+                    return instance
+                future = self._singleton_futures.get(step.name)
+                if future is None:
+                    future = self._singleton_futures[step.name] = (
+                        concurrent.futures.Future()
+                    )
+                    break
+            instance = await asyncio.shield(asyncio.wrap_future(future))
+            if instance is not _MISSING:
+                return instance
+        try:
+            instance = await self.__acreate_instance(step, instances)
+            self.__cache_singleton(step.name, implementation_details, instance)
+        except BaseException as exc:
+            self.__forget_singleton_future(step.name, future)
+            if isinstance(exc, Exception):
+                future.set_exception(exc)
+            else:
+                future.set_result(_MISSING)
+            raise
+        self.__forget_singleton_future(step.name, future)
+        future.set_result(instance)
+        return instance
+
+    def __forget_singleton_future(
+        self, name: str, future: concurrent.futures.Future[Any]
+    ) -> None:
+        with self._lock:
+            if self._singleton_futures.get(name) is future:
+                del self._singleton_futures[name]
+
+    def __get_singleton_lock(self, name: str) -> threading.RLock:
+        try:
+            lock: threading.RLock = self._singleton_locks[name]
+            return lock
+        except KeyError:
+            with self._lock:
+                lock = self._singleton_locks.setdefault(name, threading.RLock())
+                return lock
+
+    def __cache_singleton(
+        self,
+        name: str,
+        implementation_details: ImplementationDetails,
+        instance: Any,
+    ) -> None:
+        """
+        Caches a singleton unless its binding changed while it was constructed.
+        """
+        with self._lock:
+            if self._interfaces[name].implementation_details is implementation_details:
+                self._singletons[name] = instance
+
+    async def __aresolve(self, names: list[str]) -> list[Any]:
+        """
+        Resolves the given interfaces asynchronously.
+
+        Every interface is built in its own task once all of its dependencies are available, so independent
+        asynchronous initializations run concurrently.
+        """
+        tasks: dict[str, asyncio.Future[Any]] = {}
+
+        def schedule(name: str) -> asyncio.Future[Any]:
+            if name not in tasks:
+                tasks[name] = asyncio.ensure_future(build(name))
+            return tasks[name]
+
+        async def build(name: str) -> Any:
+            if self._parent is not None and self.__is_delegated(name):
+                (instance,) = await self._parent.__aresolve([name])
+                return instance
+            step = self.__get_construction_order(name)[-1]
+            instance = self.__get_cached_instance(name)
+            if instance is not _MISSING:
+                return instance
+            dependency_names = (
+                [] if step.lazy else [dependency for _, dependency in step.dependencies]
+            )
+            dependencies = await asyncio.gather(*map(schedule, dependency_names))
+            return await self.__aconstruct(
+                step, dict(zip(dependency_names, dependencies))
+            )
+
+        return await asyncio.gather(*map(schedule, names))
+
+    def __call_constructor(
+        self, step: _ConstructionStep, instances: dict[str, Any]
+    ) -> Any:
+        injection_plan = self.__get_injection_plan(step.name)
+        kwargs = self.__get_setting_values(step.name, injection_plan)
+        for parameter_name, dependency in step.dependencies:
+            kwargs[parameter_name] = instances[dependency]
+        constructor = injection_plan.constructor
+        if not self._observers:
+            return constructor(**kwargs)
+        start = time.perf_counter()
+        instance = constructor(**kwargs)
+        duration = time.perf_counter() - start
+        for observer in self._observers:
+            observer.on_construct(step.name, duration)
+        return instance
+
+    def __get_injection_plan(self, name: str) -> _InjectionPlan:
+        parent: Registry | None = self._parent
+        if parent is not None and name not in self._own_interfaces:
+            return parent.__get_injection_plan(name)
+        entry: _RegistryEntry = self._interfaces[name]
+        if entry.implementation_details is None:
+            raise RegistryError(f"The interface {name} has no implementation details.")
+        if entry.injection_plan is not None:
+            return entry.injection_plan
+        injection_plan = self.__compile_injection_plan(
+            entry.interface_details.interface_cls, entry.implementation_details
         )
-        kwargs = {}
-        for setting_name, annotation in type_hints.items():
+        compiled_entry = entry._replace(injection_plan=injection_plan)
+        with self._lock:
+            if self._interfaces.get(name) is entry:
+                self._interfaces[name] = compiled_entry
+            declarative_interfaces = self.__get_declarative_interfaces()
+            if declarative_interfaces.get(name) is entry:
+                declarative_interfaces[name] = compiled_entry
+        return injection_plan
+
+    def __get_construction_order(self, name: str) -> tuple[_ConstructionStep, ...]:
+        try:
+            construction_order: tuple[_ConstructionStep, ...] = (
+                self._construction_orders[name]
+            )
+            return construction_order
+        except KeyError:
+            pass
+        generation = self._generation
+        construction_order = self.__compile_construction_order(name)
+        with self._lock:
+            if self._generation == generation:
+                self._construction_orders[name] = construction_order
+        return construction_order
+
+    def __get_indexes(self) -> _Indexes:
+        """
+        Returns the lookup tables of the current bindings, built once after every change of the bindings.
+        """
+        indexes: _Indexes | None = self._indexes
+        if indexes is not None:
+            return indexes
+        names_by_interface: dict[type, list[str]] = {}
+        implementations: dict[str, list[str]] = {}
+        keyed_implementations: dict[str, dict[Hashable, str]] = {}
+        with self._lock:
+            for name, entry in self._interfaces.items():
+                if entry.group is None:
+                    names_by_interface.setdefault(
+                        entry.interface_details.interface_cls, []
+                    ).append(name)
+                    continue
+                implementations.setdefault(entry.group, []).append(name)
+                if entry.key is not None:
+                    keyed_implementations.setdefault(entry.group, {})[entry.key] = name
+            indexes = _Indexes(
+                {cls: tuple(names) for cls, names in names_by_interface.items()},
+                {group: tuple(names) for group, names in implementations.items()},
+                keyed_implementations,
+            )
+            super().__setattr__("_indexes", indexes)
+        return indexes
+
+    def __is_delegated(self, name: str) -> bool:
+        """
+        Checks if a child registry can leave the resolution of an interface to its parent.
+        """
+        try:
+            delegated: bool = self._delegated[name]
+            return delegated
+        except KeyError:
+            pass
+        generation = self._generation
+        delegated = self.__check_delegation(name)
+        with self._lock:
+            if self._generation == generation:
+                self._delegated[name] = delegated
+        return delegated
+
+    def __check_delegation(self, name: str) -> bool:
+        """
+        An interface is delegated if its whole dependency graph is the same in the parent, i.e. no interface of the
+        graph is overridden, no dependency gains a new candidate, the settings provider is the same if settings are
+        injected, and no scoped interface is part of the graph.
+        """
+        parent = self._parent
+        own_interfaces = self._own_interfaces
+        if parent is None or name in own_interfaces:
+            return False
+        try:
+            construction_order = parent.__get_construction_order(name)
+        except PythecaError:
+            return False
+        own_interface_classes = {
+            entry.interface_details.interface_cls
+            for entry in own_interfaces.values()
+            if entry.group is None
+        }
+        for step in construction_order:
+            injection_plan = parent.__get_injection_plan(step.name)
+            if (
+                step.name in own_interfaces
+                or parent._interfaces[step.name].implementation_details.lifetime
+                is Lifetime.SCOPED
+                or (injection_plan.settings and "settings_provider" in own_interfaces)
+                or any(
+                    dependency.interface_cls in own_interface_classes
+                    for dependency in injection_plan.dependencies
+                )
+            ):
+                return False
+        return True
+
+    def __compile_construction_order(self, name: str) -> tuple[_ConstructionStep, ...]:
+        """
+        Builds the dependency graph of an interface and orders it topologically.
+
+        :param name: The name of the interface to build the graph for.
+        :return: The construction steps, dependencies before their dependents.
+        :raises RegistryError: If the graph contains a cycle or an interface without implementation.
+        """
+        interface_names = self.__get_indexes().names_by_interface
+        construction_order: list[_ConstructionStep] = []
+        visited: set[str] = set()
+        path: list[str] = []
+
+        def visit(current: str) -> None:
+            if current in path:
+                cycle = " -> ".join(path[path.index(current) :] + [current])
+                raise RegistryError(f"Circular dependency detected: {cycle}.")
+            if current in visited:
+                return
+            path.append(current)
+            injection_plan = self.__get_injection_plan(current)
+            dependencies = []
+            for (
+                parameter_name,
+                interface_cls,
+                has_default,
+            ) in injection_plan.dependencies:
+                candidates = interface_names.get(interface_cls, ())
+                if len(candidates) > 1:
+                    raise RegistryError(
+                        f"The dependency {parameter_name} of {current} is ambiguous, {interface_cls} is registered as {', '.join(candidates)}."
+                    )
+                if not candidates and not has_default:
+                    raise RegistryError(
+                        f"The dependency {parameter_name} of {current} cannot be resolved, no interface is registered for {interface_cls}."
+                    )
+                if candidates:
+                    visit(candidates[0])
+                    dependencies.append((parameter_name, candidates[0]))
+            path.pop()
+            visited.add(current)
+            construction_order.append(
+                _ConstructionStep(
+                    current,
+                    tuple(dependencies),
+                    self._interfaces[current].implementation_details.lazy,
+                )
+            )
+
+        visit(name)
+        return tuple(construction_order)
+
+    @classmethod
+    def __compile_injection_plan(
+        cls,
+        interface_cls: type,
+        implementation_details: ImplementationDetails,
+    ) -> _InjectionPlan:
+        """
+        Analyses the constructor of an implementation class once and returns the settings and dependencies to inject.
+
+        Implementation classes given as import path are imported and checked here. Factories are not analysed, their
+        declared parameters are used instead. Factories defined with ``async def`` are awaited like ``__ainit__``.
+
+        :param interface_cls: The interface class the implementation is registered for.
+        :param implementation_details: The implementation to analyse.
+        :return: The injection plan for the constructor or factory.
+        :raises RegistryError: If the implementation class cannot be imported or does not match the interface, or if
+            a lazy implementation requires asynchronous initialization.
+        """
+        cls_object = implementation_details.implementation_cls
+        if isinstance(cls_object, str):
+            cls_object = _import_class(cls_object)
+            cls.__check_implementation(
+                interface_cls,
+                implementation_details._replace(implementation_cls=cls_object),
+            )
+        if implementation_details.factory is not None:
+            type_hints = dict(implementation_details.parameters or {})
+        else:
+            try:
+                type_hints = get_type_hints(
+                    getattr(cls_object, "__init__", None), include_extras=True
+                )
+            except Exception as exc:
+                raise RegistryError(
+                    f"The constructor annotations of {cls_object} could not be resolved: {exc}"
+                ) from exc
+        constructor = implementation_details.factory or cls_object
+        try:
+            parameters: Mapping[str, inspect.Parameter] = inspect.signature(
+                constructor
+            ).parameters
+        except (TypeError, ValueError):
+            parameters = {}
+        settings = []
+        dependencies = []
+        for parameter_name, annotation in type_hints.items():
+            if parameter_name == "return" or (
+                parameter_name in parameters
+                and parameters[parameter_name].kind
+                in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD)
+            ):
+                continue
             metadata: tuple[Any, ...] = getattr(annotation, "__metadata__", tuple())
+            if len(metadata) == 0 and isinstance(annotation, type):
+                parameter = parameters.get(parameter_name)
+                dependencies.append(
+                    _DependencyInjection(
+                        parameter_name,
+                        annotation,
+                        parameter is not None
+                        and parameter.default is not inspect.Parameter.empty,
+                    )
+                )
+                continue
             setting_type = getattr(annotation, "__origin__", None)
             if (
                 len(metadata) == 0
@@ -89,11 +905,756 @@ class Registry:
                 or not setting_type
             ):
                 continue
-            setting_details: SettingDetails = metadata[0]
-            kwargs[setting_name] = self.settings_provider.get_setting_value(
-                setting_details.identifier, setting_type, setting_details.default_value
+            settings.append(
+                _SettingInjection(parameter_name, setting_type, metadata[0])
+            )
+        async_factory = inspect.iscoroutinefunction(implementation_details.factory)
+        async_init = async_factory or inspect.iscoroutinefunction(
+            getattr(cls_object, "__ainit__", None)
+        )
+        if async_init and implementation_details.lazy:
+            # A lazy proxy is created on first attribute access, where asynchronous initialization cannot be awaited.
+            raise RegistryError(
+                f"The implementation {cls_object} requires asynchronous initialization and cannot be lazy."
+            )
+        return _InjectionPlan(
+            tuple(settings),
+            tuple(dependencies),
+            constructor,
+            async_init,
+            tuple(
+                SettingRequest(
+                    setting_details.identifier,
+                    setting_type,
+                    setting_details.default_value,
+                    default_converters.get_converter(setting_type),
+                )
+                for _, setting_type, setting_details in settings
+            ),
+            async_factory,
+        )
+
+    def __get_setting_values(
+        self, name: str, injection_plan: _InjectionPlan
+    ) -> dict[str, Any]:
+        """
+        Retrieves all settings of an implementation with a single call to the settings provider.
+        """
+        if not injection_plan.settings:
+            return {}
+        settings_provider = self.__get_settings_provider()
+        if not self._observers:
+            values = settings_provider.get_setting_values(
+                injection_plan.setting_requests
+            )
+        else:
+            start = time.perf_counter()
+            values = settings_provider.get_setting_values(
+                injection_plan.setting_requests
+            )
+            duration = (time.perf_counter() - start) / len(values)
+            for request in injection_plan.setting_requests:
+                for observer in self._observers:
+                    observer.on_settings_lookup(
+                        name, request.setting_identifier, duration
+                    )
+        # Remembered for reload_settings(), which rebuilds only instances whose settings changed.
+        self._setting_values[name] = values
+        return {
+            setting.parameter_name: value
+            for setting, value in zip(injection_plan.settings, values)
+        }
+
+    def __get_settings_provider(self) -> SettingsProvider:
+        """
+        Returns the settings provider used for setting injection.
+
+        The settings provider is resolved once and reused for all setting lookups, independent of its lifetime.
+        """
+        try:
+            settings_provider: SettingsProvider = self._singletons["settings_provider"]
+            return settings_provider
+        except KeyError:
+            pass
+        parent: Registry | None = self._parent
+        if parent is not None and "settings_provider" not in self._own_interfaces:
+            return parent.__get_settings_provider()
+        with self.__get_singleton_lock("settings_provider"):
+            if "settings_provider" not in self._singletons:
+                self._singletons["settings_provider"] = self.__resolve(
+                    "settings_provider"
+                )
+            settings_provider = self._singletons["settings_provider"]
+            return settings_provider
+
+    def set_settings_provider(self, settings_provider: SettingsProvider) -> None:
+        """
+        Replaces the settings provider of the registry with an already created instance.
+
+        :param settings_provider: The settings provider instance to use for all following setting lookups.
+        :raises RegistryError: If the instance does not implement the registered settings provider interface.
+        """
+        with self._lock:
+            self.register_interface(
+                "settings_provider",
+                self._interfaces["settings_provider"].interface_details.interface_cls,
+                implementation_details=ImplementationDetails(
+                    type(settings_provider), lifetime=Lifetime.SINGLETON
+                ),
+            )
+            self._singletons["settings_provider"] = settings_provider
+
+    def snapshot(self, *, include_settings: bool = True) -> RegistrySnapshot:
+        """
+        Captures the compiled state of the registry, e.g. to start worker processes without analysing it again.
+
+        All bindings are compiled. Children are flattened, their snapshot contains the bindings of their parents.
+
+        :param include_settings: If True, the values of all injected settings are retrieved and restored registries
+            serve them instead of consulting their settings provider. Settings without a value are left out.
+        :return: The snapshot.
+        :raises RegistryError: If an interface has no implementation details or a dependency cannot be resolved.
+        """
+        construction_orders = {}
+        settings: dict[tuple[str, type], Any] | None = {} if include_settings else None
+        for name, entry in list(self._interfaces.items()):
+            if entry.implementation_details is None:
+                continue
+            construction_orders[name] = self.__get_construction_order(name)
+            for request in self.__get_injection_plan(name).setting_requests:
+                # The same setting can be injected with different types, every conversion is captured.
+                key = (request.setting_identifier, request.setting_type)
+                if settings is None or key in settings:
+                    continue
+                try:
+                    (settings[key],) = (
+                        self.__get_settings_provider().get_setting_values((request,))
+                    )
+                except PythecaError:
+                    pass
+        interfaces = {}
+        for name, entry in self._interfaces.items():
+            if name in construction_orders:
+                # Converters are closures and cannot be pickled, they are looked up again on restore.
+                injection_plan = self.__get_injection_plan(name)
+                entry = entry._replace(
+                    injection_plan=injection_plan._replace(
+                        setting_requests=tuple(
+                            request._replace(converter=None)
+                            for request in injection_plan.setting_requests
+                        )
+                    )
+                )
+            interfaces[name] = entry
+        return RegistrySnapshot(type(self), interfaces, construction_orders, settings)
+
+    @classmethod
+    def from_snapshot(
+        cls, snapshot: RegistrySnapshot, *, fork_safe: bool = False
+    ) -> "Registry":
+        """
+        Creates a registry from a snapshot without analysing its bindings again.
+
+        No instances are carried over. If the snapshot contains settings, they are served by a
+        ``StaticSettingsProvider``.
+
+        :param snapshot: The snapshot created by ``snapshot()``.
+        :param fork_safe: See ``Registry.__init__``.
+        :return: A registry of the class the snapshot was taken from, constructed without running its constructor.
+        :raises RegistryError: If the snapshot was taken from a registry class that is no subclass of this class.
+        """
+        if not issubclass(snapshot.registry_cls, cls):
+            raise RegistryError(
+                f"The snapshot of {snapshot.registry_cls} cannot be restored as {cls}."
+            )
+        interfaces = {}
+        for name, entry in snapshot.interfaces.items():
+            if entry.injection_plan is not None:
+                entry = entry._replace(
+                    injection_plan=entry.injection_plan._replace(
+                        setting_requests=tuple(
+                            request._replace(
+                                converter=default_converters.get_converter(
+                                    request.setting_type
+                                )
+                            )
+                            for request in entry.injection_plan.setting_requests
+                        )
+                    )
+                )
+            interfaces[name] = entry
+        registry: Registry = object.__new__(snapshot.registry_cls)
+        registry.__init_state(interfaces, interfaces, None)
+        if snapshot.settings is not None:
+            registry.set_settings_provider(StaticSettingsProvider(snapshot.settings))
+        registry._construction_orders.update(
+            (name, construction_order)
+            for name, construction_order in snapshot.construction_orders.items()
+            if name != "settings_provider"
+        )
+        if fork_safe:
+            _fork_safe_registries.add(registry)
+        return registry
+
+    def reset_after_fork(self) -> None:
+        """
+        Forgets all instances and replaces all locks, to be called in a child process after ``os.fork()``.
+
+        Instances created in the parent process, e.g. connections, must not be shared with the child. They are
+        discarded without being disposed, since disposing them could affect the parent. Only the settings provider
+        is kept. Children and frozen containers of the registry are reset as well. Registries created with
+        ``fork_safe=True`` are reset automatically.
+        """
+        global _in_flight_lock
+        _in_flight.clear()
+        _in_flight_lock = threading.Lock()
+        settings_provider = self._singletons.get("settings_provider", _MISSING)
+        super().__setattr__("_lock", threading.RLock())
+        super().__setattr__("_singletons", {})
+        if settings_provider is not _MISSING:
+            self._singletons["settings_provider"] = settings_provider
+        super().__setattr__("_singleton_locks", {})
+        super().__setattr__("_singleton_futures", {})
+        super().__setattr__("_scopes", weakref.WeakSet())
+        super().__setattr__("_current_scope", threading.local())
+        super().__setattr__("_retired", [])
+        super().__setattr__("_pools", {})
+        for frozen_registry in self._frozen_registries:
+            _forget_singletons(frozen_registry)
+        for child in self._children:
+            child.reset_after_fork()
+
+    def child(self) -> Self:
+        """
+        Creates a registry inheriting all bindings of this registry.
+
+        Bindings are not copied. The child stores only the bindings registered on it, every other binding is looked
+        up in this registry, including later changes. Interfaces whose dependency graph is not affected by the
+        child's bindings are resolved by this registry, so their singletons are shared. Observers are not inherited.
+
+        :return: The child registry, an instance of the same class without running its constructor.
+        """
+        own_interfaces: dict[str, _RegistryEntry] = {}
+        maps = (
+            self._interfaces.maps
+            if isinstance(self._interfaces, ChainMap)
+            else [self._interfaces]
+        )
+        child = object.__new__(type(self))
+        child.__init_state(own_interfaces, ChainMap(own_interfaces, *maps), self)
+        with self._lock:
+            self._children.add(child)
+        return child
+
+    @contextmanager
+    def scope(self) -> Iterator["Registry"]:
+        """
+        Opens a scope in which every scoped interface is instantiated at most once.
+
+        Scopes are bound to the current thread and may be nested; the innermost scope is used. The scoped instances
+        are disposed when the scope ends, instances that can only be closed asynchronously by ``aclose()``.
+
+        :return: A context manager yielding the registry itself.
+        """
+        scope = _Scope()
+        self._scopes.add(scope)
+        previous_scope = getattr(self._current_scope, "scope", None)
+        self._current_scope.scope = scope
+        try:
+            yield self
+        finally:
+            self._current_scope.scope = previous_scope
+            self._scopes.discard(scope)
+            remaining = self.__dispose(list(scope.instances.items()))
+            if remaining:
+                with self._lock:
+                    self._retired.extend(remaining)
+
+    def add_observer(self, observer: RegistryObserver) -> None:
+        """
+        Registers an observer receiving events about the resolution of interfaces.
+
+        Without observers no timing information is gathered.
+
+        :param observer: The observer to add.
+        """
+        with self._lock:
+            super().__setattr__("_observers", (*self._observers, observer))
+
+    def remove_observer(self, observer: RegistryObserver) -> None:
+        """
+        Removes a previously added observer.
+
+        :param observer: The observer to remove.
+        """
+        with self._lock:
+            super().__setattr__(
+                "_observers", tuple(o for o in self._observers if o is not observer)
+            )
+
+    def preload(
+        self, names: Iterable[str] | None = None, *, background: bool = False
+    ) -> threading.Thread | None:
+        """
+        Imports the implementation classes given as import path and analyses their constructors ahead of use.
+
+        :param names: The interfaces to preload, all interfaces if not set.
+        :param background: If True, the interfaces are preloaded in a daemon thread, so startup can continue
+            meanwhile. Errors are not raised in the thread but on resolution of the affected interfaces.
+        :return: The started thread if ``background`` is set.
+        :raises RegistryError: If an implementation class cannot be imported or does not match its interface.
+        """
+        names = list(self._interfaces if names is None else names)
+        for name in names:
+            if name not in self._interfaces:
+                raise RegistryError(f"The attribute {name} could not be found.")
+        names = [
+            name
+            for name in names
+            if self._interfaces[name].implementation_details is not None
+        ]
+        if not background:
+            for name in names:
+                self.__get_injection_plan(name)
+            return None
+
+        def preload_ignoring_errors() -> None:
+            for name in names:
+                try:
+                    self.__get_injection_plan(name)
+                except PythecaError:
+                    pass
+
+        thread = threading.Thread(
+            target=preload_ignoring_errors, name="pytheca-preload", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def validate(self, *, instantiate_singletons: bool = False) -> None:
+        """
+        Checks all bindings up front instead of on first access.
+
+        The dependency graphs of all interfaces are compiled and all injected settings are retrieved. All problems
+        are collected and reported at once.
+
+        :param instantiate_singletons: If True, all singletons are created after a successful validation.
+            Singletons requiring asynchronous initialization are skipped, use ``warm_up`` for them.
+        :raises RegistryValidationError: If any binding is invalid.
+        """
+        errors: list[PythecaError] = []
+        for name in list(self._interfaces):
+            try:
+                self.__get_construction_order(name)
+            except PythecaError as exc:
+                errors.append(exc)
+                continue
+            for request in self.__get_injection_plan(name).setting_requests:
+                try:
+                    self.__get_settings_provider().get_setting_values((request,))
+                except PythecaError as exc:
+                    errors.append(exc)
+        if errors:
+            raise RegistryValidationError(
+                "The registry is invalid:\n"
+                + "\n".join(f"- {error.message}" for error in errors),
+                errors,
             )
-        return cls_object(**kwargs)
+        if instantiate_singletons:
+            for name, entry in list(self._interfaces.items()):
+                if entry.implementation_details.lifetime is not Lifetime.SINGLETON:
+                    continue
+                if any(
+                    self.__get_injection_plan(step.name).async_init
+                    for step in self.__get_construction_order(name)
+                ):
+                    continue
+                self.__resolve(name)
+
+    async def aget(self, name: str) -> Any:
+        """
+        Resolves an interface asynchronously.
+
+        Implementations defining an ``async def __ainit__(self)`` method are awaited after construction, which is
+        only possible through this method or ``warm_up``.
+
+        :param name: The name of the interface to resolve.
+        :return: The instance of the interface.
+        :raises RegistryError: If the interface could not be found or resolved.
+        """
+        if name not in self._interfaces:
+            raise RegistryError(f"The attribute {name} could not be found.")
+        if not self._observers:
+            (instance,) = await self.__aresolve([name])
+            return instance
+        for observer in self._observers:
+            observer.on_resolve_start(name)
+        start = time.perf_counter()
+        cache_hit = self.__is_cached(name)
+        (instance,) = await self.__aresolve([name])
+        duration = time.perf_counter() - start
+        for observer in self._observers:
+            observer.on_resolve_end(name, duration, cache_hit)
+        return instance
+
+    async def warm_up(self) -> None:
+        """
+        Initializes all singletons concurrently, each one as soon as its dependencies are available.
+
+        :raises RegistryError: If a singleton could not be resolved.
+        """
+        await self.__aresolve(
+            [
+                name
+                for name, entry in self._interfaces.items()
+                if entry.implementation_details is not None
+                and entry.implementation_details.lifetime is Lifetime.SINGLETON
+            ]
+        )
+
+    @contextmanager
+    def lease(self, name: str, timeout: float | None = None) -> Iterator[Any]:
+        """
+        Takes an instance of a pooled interface for the duration of a block and returns it to the pool afterward.
+
+        The pool grows on demand up to the ``pool_size`` of the binding. If all instances are leased, the lease waits
+        until one is returned. Instances returned after their binding was replaced are disposed.
+
+        :param name: The name of the pooled interface.
+        :param timeout: The seconds to wait for an instance, the ``pool_timeout`` of the binding if not set.
+        :return: A context manager yielding the instance.
+        :raises RegistryError: If the interface is not pooled or no instance became available in time.
+        """
+        parent: Registry | None = self._parent
+        if parent is not None and self.__is_delegated(name):
+            with parent.lease(name, timeout) as instance:
+                yield instance
+            return
+        while True:
+            pool = self.__get_pool(name)
+            if timeout is None:
+                timeout = pool.implementation_details.pool_timeout
+            try:
+                instance = pool.acquire(
+                    functools.partial(self.__create_pooled_instance, name), timeout
+                )
+            except TimeoutError:
+                raise RegistryError(
+                    f"No instance of the pooled interface {name} became available within {timeout} seconds."
+                ) from None
+            if instance is not _MISSING:
+                break
+        try:
+            yield instance
+        finally:
+            if not pool.release(instance):
+                remaining = self.__dispose([(name, instance)])
+                if remaining:
+                    with self._lock:
+                        self._retired.extend(remaining)
+
+    def __get_pool(self, name: str) -> _Pool:
+        try:
+            pool: _Pool = self._pools[name]
+            return pool
+        except KeyError:
+            pass
+        if name not in self._interfaces:
+            raise RegistryError(f"The attribute {name} could not be found.")
+        implementation_details = self._interfaces[name].implementation_details
+        if (
+            implementation_details is None
+            or implementation_details.lifetime is not Lifetime.POOLED
+        ):
+            raise RegistryError(f"The interface {name} is not pooled.")
+        with self._lock:
+            pool = self._pools.get(name)
+            if pool is None or pool.retired:
+                pool = _Pool(implementation_details)
+                if (
+                    self._interfaces[name].implementation_details
+                    is implementation_details
+                ):
+                    self._pools[name] = pool
+            return pool
+
+    def __create_pooled_instance(self, name: str) -> Any:
+        if self.__get_injection_plan(name).async_init:
+            raise RegistryError(
+                f"The pooled interface {name} requires asynchronous initialization, which is not supported."
+            )
+        return self.__create_with_dependencies(self.__get_construction_order(name)[-1])
+
+    def get_pool_statistics(self, name: str) -> PoolStatistics:
+        """
+        Returns the statistics of the pool of a pooled interface since it was last bound.
+
+        :param name: The name of the pooled interface.
+        :return: The current pool statistics.
+        :raises RegistryError: If the interface is not pooled.
+        """
+        parent: Registry | None = self._parent
+        if parent is not None and self.__is_delegated(name):
+            return parent.get_pool_statistics(name)
+        return self.__get_pool(name).get_statistics()
+
+    @contextmanager
+    def use(self, name: str) -> Iterator[Any]:
+        """
+        Resolves an interface for the duration of a block.
+
+        An instance that is replaced by rebinding its interface while it is used is disposed only after all blocks
+        using it ended, so a binding can be swapped while requests are served.
+
+        :param name: The name of the interface.
+        :return: A context manager yielding the instance.
+        :raises RegistryError: If the interface could not be found.
+        """
+        while True:
+            generation = self._generation
+            instance = self.get(name)
+            key = id(instance)
+            with _in_flight_lock:
+                _in_flight[key] = _in_flight.get(key, 0) + 1
+            if self._generation == generation:
+                break
+            # The instance may have been replaced and disposed before it was marked as used.
+            self.__release(key)
+        try:
+            yield instance
+        finally:
+            self.__release(key)
+
+    def __release(self, key: int) -> None:
+        with _in_flight_lock:
+            count = _in_flight.pop(key) - 1
+            if count:
+                _in_flight[key] = count
+        registry: Registry | None = self
+        while registry is not None:
+            registry.__dispose_retired()
+            registry = registry._parent
+
+    def __dispose_retired(self) -> None:
+        """
+        Disposes replaced instances that are no longer used and can be closed synchronously.
+        """
+        if not self._retired:
+            return
+        with self._lock:
+            drained = [item for item in self._retired if id(item[1]) not in _in_flight]
+            self._retired[:] = [
+                item for item in self._retired if id(item[1]) in _in_flight
+            ]
+        remaining = self.__dispose(drained)
+        if remaining:
+            with self._lock:
+                self._retired.extend(remaining)
+
+    @staticmethod
+    def __dispose(instances: list[tuple[str, Any]]) -> list[tuple[str, Any]]:
+        """
+        Disposes instances in reverse order.
+
+        :return: The instances that can only be closed asynchronously.
+        """
+        remaining = []
+        with ExitStack() as stack:
+            for name, instance in instances:
+                if not _push_disposal(stack, instance):
+                    remaining.append((name, instance))
+        return remaining
+
+    def __take_instances(self) -> list[tuple[str, Any]]:
+        with self._lock:
+            instances = [*self._retired, *self._singletons.items()]
+            for name, pool in self._pools.items():
+                instances.extend((name, instance) for instance in pool.retire())
+            self._retired.clear()
+            self._singletons.clear()
+            self._pools.clear()
+            for frozen_registry in self._frozen_registries:
+                _forget_singletons(frozen_registry)
+        return instances
+
+    def close(self) -> None:
+        """
+        Disposes all cached instances in reverse creation order and removes them from the registry.
+
+        Dependencies are created before their dependents, so dependents are disposed first. Instances are disposed by
+        calling their ``close()`` method or, if not available, their ``__exit__`` method. Instances replaced by
+        rebinding are disposed as well, even if they are still used. Idle pooled instances are disposed right away,
+        leased ones when they are returned. Lazy instances that were never used are not created. If disposing an
+        instance fails, the remaining instances are still disposed.
+
+        :raises RegistryError: If instances can only be closed asynchronously, they are kept for ``aclose()``.
+        """
+        remaining = self.__dispose(self.__take_instances())
+        if remaining:
+            with self._lock:
+                self._retired.extend(remaining)
+            raise RegistryError(
+                f"The instances of {', '.join(name for name, _ in remaining)} can only be closed asynchronously, use aclose()."
+            )
+
+    async def aclose(self) -> None:
+        """
+        Disposes all cached instances in reverse creation order and removes them from the registry.
+
+        Like ``close()``, but instances are disposed by awaiting their ``aclose()`` or ``__aexit__`` method if
+        available.
+        """
+        async with AsyncExitStack() as stack:
+            for _, instance in self.__take_instances():
+                _push_disposal(stack, instance)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    def get(self, name: str, key: Hashable | None = None) -> Any:
+        """
+        Resolves an interface or one of its keyed implementations.
+
+        :param name: The name of the interface.
+        :param key: The key an implementation was added with, the registered implementation of the interface if
+            not set.
+        :return: The instance of the implementation.
+        :raises RegistryError: If the interface could not be found or has no implementation for the key.
+        """
+        if name not in self._interfaces:
+            raise RegistryError(f"The attribute {name} could not be found.")
+        if key is not None:
+            try:
+                name = self.__get_indexes().keyed_implementations[name][key]
+            except KeyError:
+                raise RegistryError(
+                    f"The interface {name} has no implementation for the key {key!r}."
+                ) from None
+        if self._observers:
+            return self.__observe_resolution(name, self.__resolve)
+        return self.__resolve(name)
+
+    def get_all(self, name: str) -> list[Any]:
+        """
+        Resolves all implementations of an interface.
+
+        :param name: The name of the interface.
+        :return: The instances of the registered implementation, if any, and of all added implementations in the
+            order they were added.
+        :raises RegistryError: If the interface could not be found.
+        """
+        if name not in self._interfaces:
+            raise RegistryError(f"The attribute {name} could not be found.")
+        names = self.__get_indexes().implementations.get(name, ())
+        if self._interfaces[name].implementation_details is not None:
+            names = (name, *names)
+        if self._observers:
+            return [
+                self.__observe_resolution(implementation_name, self.__resolve)
+                for implementation_name in names
+            ]
+        return [self.__resolve(implementation_name) for implementation_name in names]
+
+    def get_names(self, interface_cls: type) -> tuple[str, ...]:
+        """
+        Looks up the names an interface class is registered as.
+
+        :param interface_cls: The interface class.
+        :return: The names of all interfaces registered with exactly this class.
+        """
+        return self.__get_indexes().names_by_interface.get(interface_cls, ())
+
+    def add_implementation(
+        self,
+        name: str,
+        implementation_details: ImplementationDetails,
+        /,
+        *,
+        key: Hashable | None = None,
+    ) -> None:
+        """
+        Adds another implementation to a registered interface.
+
+        Added implementations are resolved with ``get_all`` and, if they have a key, with ``get``. They are not
+        candidates for dependency injection.
+
+        :param name: The name of the interface.
+        :param implementation_details: The implementation details of the additional implementation.
+        :param key: An optional key to look the implementation up with. An implementation added with the same key
+            before is replaced.
+        :raises RegistryError: If the interface could not be found or the implementation class does not match.
+        """
+        if self._frozen:
+            raise RegistryError("The registry is frozen and cannot be modified.")
+        entry = self._interfaces.get(name)
+        if entry is None or entry.group is not None:
+            raise RegistryError(f"The attribute {name} could not be found.")
+        interface_cls = entry.interface_details.interface_cls
+        self.__check_implementation(interface_cls, implementation_details)
+        implementation_name = (
+            f"{name}[#{next(_implementation_ids)}]"
+            if key is None
+            else f"{name}[{key!r}]"
+        )
+        with self._lock:
+            self._interfaces[implementation_name] = _RegistryEntry(
+                _InterfaceDetails(implementation_name, interface_cls),
+                implementation_details,
+                group=name,
+                key=key,
+            )
+        self.__invalidate(implementation_name, rebound_here=True)
+
+    def freeze(self) -> "FrozenRegistry":
+        """
+        Validates all bindings and returns an immutable container for fast interface access.
+
+        The dependency graphs of all interfaces are compiled up front. Afterward the registry can no longer be
+        modified. Singletons are stored as plain attributes of the container after their first access.
+
+        :return: The frozen container.
+        :raises RegistryError: If an interface has no implementation details, a dependency cannot be resolved or the
+            name of an interface is an attribute of ``FrozenRegistry``, e.g. ``get`` or ``close``.
+        """
+        colliding_names = [
+            name
+            for name, entry in self._interfaces.items()
+            if entry.group is None
+            and (
+                hasattr(FrozenRegistry, name) or name in FrozenRegistry.__annotations__
+            )
+        ]
+        if colliding_names:
+            raise RegistryError(
+                f"The interfaces {', '.join(colliding_names)} cannot be frozen, their names are attributes of "
+                "FrozenRegistry."
+            )
+        with self._lock:
+            for name in self._interfaces:
+                self.__get_construction_order(name)
+            super().__setattr__("_frozen", True)
+        namespace = {
+            name: _FrozenInterface(
+                name,
+                functools.partial(self.__resolve, name),
+                entry.implementation_details.lifetime is Lifetime.SINGLETON,
+            )
+            for name, entry in self._interfaces.items()
+            if entry.group is None
+        }
+        frozen_cls = type(f"Frozen{type(self).__name__}", (FrozenRegistry,), namespace)
+        frozen_registry: FrozenRegistry = frozen_cls(self)
+        self._frozen_registries.add(frozen_registry)
+        return frozen_registry
 
     def register_interface(
         self,
@@ -110,12 +1671,401 @@ class Registry:
         :param interface_cls: The interface class to register.
         :param implementation_details: An optional instance of implementation details.
         """
-        if implementation_details and not issubclass(
-            implementation_details.implementation_cls, interface_cls
-        ):
-            raise RegistryError(
-                f"The implementation class {implementation_details.implementation_cls} must be a subclass of the interface class {interface_cls}."
+        if self._frozen:
+            raise RegistryError("The registry is frozen and cannot be modified.")
+        self.__check_implementation(interface_cls, implementation_details)
+        with self._lock:
+            self._interfaces[name] = _RegistryEntry(
+                _InterfaceDetails(name, interface_cls), implementation_details
             )
-        self._interfaces[name] = _RegistryEntry(
-            _InterfaceDetails(name, interface_cls), implementation_details
+        self.__invalidate(name, rebound_here=True)
+
+    def __invalidate(self, name: str, rebound_here: bool) -> None:
+        """
+        Discards everything compiled or cached for a rebound interface, in this registry and all its children.
+        """
+        with self._lock:
+            previous_construction_orders = list(self._construction_orders.values())
+            super().__setattr__("_generation", self._generation + 1)
+            self._construction_orders.clear()
+            self._delegated.clear()
+            super().__setattr__("_indexes", None)
+            if rebound_here or name not in self._own_interfaces:
+                # Instances depending on the rebound interface hold its replaced instance, so they are replaced too.
+                for dependent in self.__get_cached_dependents(
+                    {name}, previous_construction_orders
+                ):
+                    self.__retire_instances(dependent)
+            children = list(self._children)
+        self.__dispose_retired()
+        for child in children:
+            child.__invalidate(name, rebound_here=False)
+
+    def __get_cached_dependents(
+        self,
+        names: set[str],
+        construction_orders: list[tuple[_ConstructionStep, ...]],
+    ) -> list[str]:
+        """
+        Returns the interfaces with cached instances that are one of the given interfaces or depend on one of them.
+
+        Singletons are returned in creation order, so retiring them in order disposes dependents first.
+
+        :param names: The interfaces whose instances are replaced.
+        :param construction_orders: Dependency graphs to consider in addition to the current graphs of the cached
+            interfaces, e.g. the graphs before a rebinding.
+        """
+        with self._lock:
+            cached_names = dict.fromkeys([*self._singletons, *self._pools])
+            for scope in self._scopes:
+                cached_names.update(dict.fromkeys(scope.instances))
+            construction_orders = list(construction_orders)
+            dependents = set(names)
+            for cached_name in cached_names:
+                try:
+                    construction_orders.append(
+                        self.__get_construction_order(cached_name)
+                    )
+                except PythecaError:
+                    # The graph is broken by the change, the instance cannot have been built by the current bindings.
+                    dependents.add(cached_name)
+        for construction_order in construction_orders:
+            for step in construction_order:
+                if any(dependency in dependents for _, dependency in step.dependencies):
+                    dependents.add(step.name)
+        return [name for name in cached_names if name in dependents]
+
+    def __retire_instances(self, name: str) -> None:
+        """
+        Removes the cached instances of an interface, to be disposed once they are no longer used.
+        """
+        instance = self._singletons.pop(name, _MISSING)
+        if instance is not _MISSING:
+            self._retired.append((name, instance))
+        for scope in self._scopes:
+            instance = scope.instances.pop(name, _MISSING)
+            if instance is not _MISSING:
+                self._retired.append((name, instance))
+        pool = self._pools.pop(name, None)
+        if pool is not None:
+            self._retired.extend((name, instance) for instance in pool.retire())
+        self._setting_values.pop(name, None)
+        for frozen_registry in self._frozen_registries:
+            frozen_registry.__dict__.pop(name, None)
+
+    def reload_settings(self, identifiers: Iterable[str] | None = None) -> set[str]:
+        """
+        Rebuilds the cached instances affected by changed settings, leaving all other instances in place.
+
+        The settings provider is refreshed first. An instance is affected if a setting injected into it or into one
+        of its dependencies changed. Affected singletons, scoped and pooled instances are removed and disposed
+        like rebound ones, and are created with the new values on their next access. Children of the registry are
+        reloaded as well. Call it when the settings source changed, e.g. from a watcher polling the ``has_changed()``
+        method of a ``FileSettingsProvider``.
+
+        :param identifiers: The identifiers of the changed settings. If not set, the settings of all created
+            instances are retrieved again and compared with the values they were created with.
+        :return: The names of the interfaces whose cached instances were removed.
+        """
+        return self.__reload_settings(
+            None if identifiers is None else set(identifiers), set()
         )
+
+    def __reload_settings(
+        self, changed: set[str] | None, parent_affected: set[str]
+    ) -> set[str]:
+        """
+        :param changed: The identifiers of the changed settings, None to compare all values.
+        :param parent_affected: The interfaces whose settings changed in the parent, which the dependency graphs
+            of this registry may refer to.
+        """
+        parent: Registry | None = self._parent
+        if parent is None or "settings_provider" in self._own_interfaces:
+            self.__get_settings_provider().refresh()
+        affected = set(parent_affected)
+        for name, values in list(self._setting_values.items()):
+            setting_requests = self.__get_injection_plan(name).setting_requests
+            if changed is not None:
+                if any(
+                    request.setting_identifier in changed
+                    for request in setting_requests
+                ):
+                    affected.add(name)
+                continue
+            try:
+                current_values = self.__get_settings_provider().get_setting_values(
+                    setting_requests
+                )
+            except PythecaError:
+                affected.add(name)
+                continue
+            if list(current_values) != list(values):
+                affected.add(name)
+        reloaded = set(self.__get_cached_dependents(affected, []))
+        if reloaded:
+            with self._lock:
+                super().__setattr__("_generation", self._generation + 1)
+                for name in reloaded:
+                    self.__retire_instances(name)
+            self.__dispose_retired()
+        for child in list(self._children):
+            reloaded.update(child.__reload_settings(changed, affected))
+        return reloaded
+
+
+def _reset_fork_safe_registries() -> None:
+    for registry in list(_fork_safe_registries):
+        registry.reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_fork_safe_registries)
+
+
+def _forget_singletons(frozen_registry: "FrozenRegistry") -> None:
+    """
+    Removes the singletons cached as attributes of a frozen registry.
+    """
+    for name in [name for name in frozen_registry.__dict__ if name != "_registry"]:
+        del frozen_registry.__dict__[name]
+
+
+def _import_class(path: str) -> type:
+    """
+    Imports a class by its import path, either ``package.module.Class`` or ``package.module:Class``.
+
+    :raises RegistryError: If the path cannot be imported or does not name a class.
+    """
+    if ":" in path:
+        module_name, _, qualified_name = path.partition(":")
+    else:
+        module_name, _, qualified_name = path.rpartition(".")
+    try:
+        cls_object: Any = importlib.import_module(module_name)
+        for attribute in qualified_name.split("."):
+            cls_object = getattr(cls_object, attribute)
+    except (ImportError, AttributeError, ValueError) as exc:
+        raise RegistryError(
+            f"The implementation class {path} could not be imported: {exc}"
+        ) from exc
+    if not isinstance(cls_object, type):
+        raise RegistryError(f"The implementation class {path} is not a class.")
+    return cls_object
+
+
+def _push_disposal(stack: ExitStack | AsyncExitStack, instance: Any) -> bool:
+    """
+    Registers the disposal of an instance created by a registry on an exit stack.
+
+    On asynchronous exit stacks ``aclose()`` and ``__aexit__`` are preferred, otherwise ``close()`` or ``__exit__`` is
+    used. Lazy proxies are only disposed if their instance was created.
+
+    :return: False if the instance can only be disposed asynchronously but the exit stack is synchronous.
+    """
+    if type(instance) is _LazyProxy:
+        instance = object.__getattribute__(instance, "_LazyProxy__instance")
+        if instance is _MISSING:
+            return True
+    aclose = getattr(instance, "aclose", None)
+    closes_asynchronously = inspect.iscoroutinefunction(aclose) or hasattr(
+        type(instance), "__aexit__"
+    )
+    if isinstance(stack, AsyncExitStack) and closes_asynchronously:
+        if inspect.iscoroutinefunction(aclose):
+            stack.push_async_callback(aclose)
+        else:
+            stack.push_async_exit(instance)
+        return True
+    close = getattr(instance, "close", None)
+    if callable(close) and not inspect.iscoroutinefunction(close):
+        stack.callback(close)
+    elif hasattr(type(instance), "__exit__"):
+        stack.push(instance)
+    else:
+        return not closes_asynchronously
+    return True
+
+
+class _LazyProxy:
+    """
+    Stands in for an instance of an interface until the instance is first used.
+
+    The instance is created exactly once on the first attribute access, all attribute reads and writes are
+    forwarded to it afterward. ``isinstance`` checks against the interface class succeed without creating the
+    instance. Special methods are not forwarded.
+    """
+
+    __slots__ = ("__interface_cls", "__factory", "__instance", "__lock")
+    __interface_cls: type
+    __factory: Callable[[], Any]
+    __instance: Any
+    __lock: threading.Lock
+
+    def __init__(self, interface_cls: type, factory: Callable[[], Any]) -> None:
+        object.__setattr__(self, "_LazyProxy__interface_cls", interface_cls)
+        object.__setattr__(self, "_LazyProxy__factory", factory)
+        object.__setattr__(self, "_LazyProxy__instance", _MISSING)
+        object.__setattr__(self, "_LazyProxy__lock", threading.Lock())
+
+    @property  # type: ignore[misc]
+    def __class__(self) -> type:
+        return self.__interface_cls
+
+    def __get_instance(self) -> Any:
+        instance = self.__instance
+        if instance is _MISSING:
+            with self.__lock:
+                instance = self.__instance
+                if instance is _MISSING:
+                    instance = self.__factory()
+                    object.__setattr__(self, "_LazyProxy__instance", instance)
+        return instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.__get_instance(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.__get_instance(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self.__get_instance(), name)
+
+    def __repr__(self) -> str:
+        if self.__instance is _MISSING:
+            return f"<lazy {self.__interface_cls.__qualname__}>"
+        return repr(self.__instance)
+
+
+class _FrozenInterface:
+    """
+    Descriptor providing an interface of a frozen registry.
+
+    Cached instances are stored in the instance dictionary, so following reads are plain attribute reads.
+    """
+
+    def __init__(self, name: str, resolve: Callable[[], Any], cache: bool) -> None:
+        self.name = name
+        self.resolve = resolve
+        self.cache = cache
+
+    def __get__(self, instance: "FrozenRegistry | None", owner: type) -> Any:
+        if instance is None:
+            return self
+        value = self.resolve()
+        if self.cache:
+            instance.__dict__[self.name] = value
+        return value
+
+
+class FrozenRegistry:
+    """
+    An immutable container created by ``Registry.freeze()``.
+
+    Every registered interface is available as an attribute. The container rejects any modification.
+    """
+
+    _registry: Registry
+
+    def __init__(self, registry: Registry) -> None:
+        object.__setattr__(self, "_registry", registry)
+
+    def __getattr__(self, name: str) -> Any:
+        raise RegistryError(f"The attribute {name} could not be found.")
+
+    def __setattr__(self, name: str, value: Any) -> NoReturn:
+        raise RegistryError("The registry is frozen and cannot be modified.")
+
+    def __delattr__(self, name: str) -> NoReturn:
+        raise RegistryError("The registry is frozen and cannot be modified.")
+
+    @contextmanager
+    def scope(self) -> Iterator["FrozenRegistry"]:
+        """
+        Opens a scope in which every scoped interface is instantiated at most once.
+
+        :return: A context manager yielding the frozen registry itself.
+        """
+        with self._registry.scope():
+            yield self
+
+    def get(self, name: str, key: Hashable | None = None) -> Any:
+        """
+        Resolves an interface or one of its keyed implementations, see ``Registry.get``.
+        """
+        if key is None:
+            return getattr(self, name)
+        return self._registry.get(name, key)
+
+    @contextmanager
+    def lease(self, name: str, timeout: float | None = None) -> Iterator[Any]:
+        """
+        Takes an instance of a pooled interface for the duration of a block, see ``Registry.lease``.
+        """
+        with self._registry.lease(name, timeout) as instance:
+            yield instance
+
+    def get_pool_statistics(self, name: str) -> PoolStatistics:
+        """
+        Returns the statistics of the pool of a pooled interface, see ``Registry.get_pool_statistics``.
+        """
+        return self._registry.get_pool_statistics(name)
+
+    def reload_settings(self, identifiers: Iterable[str] | None = None) -> set[str]:
+        """
+        Rebuilds the cached instances affected by changed settings, see ``Registry.reload_settings``.
+        """
+        return self._registry.reload_settings(identifiers)
+
+    def get_all(self, name: str) -> list[Any]:
+        """
+        Resolves all implementations of an interface, see ``Registry.get_all``.
+        """
+        return self._registry.get_all(name)
+
+    def get_names(self, interface_cls: type) -> tuple[str, ...]:
+        """
+        Looks up the names an interface class is registered as, see ``Registry.get_names``.
+        """
+        return self._registry.get_names(interface_cls)
+
+    def close(self) -> None:
+        """
+        Disposes all cached instances, see ``Registry.close``.
+        """
+        _forget_singletons(self)
+        self._registry.close()
+
+    async def aclose(self) -> None:
+        """
+        Disposes all cached instances asynchronously, see ``Registry.aclose``.
+        """
+        _forget_singletons(self)
+        await self._registry.aclose()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    def add_implementation(self, *args: Any, **kwargs: Any) -> NoReturn:
+        """
+        Frozen registries cannot be modified.
+
+        :raises RegistryError: Always.
+        """
+        raise RegistryError("The registry is frozen and cannot be modified.")
+
+    def register_interface(self, *args: Any, **kwargs: Any) -> NoReturn:
+        """
+        Frozen registries cannot be modified.
+
+        :raises RegistryError: Always.
+        """
+        raise RegistryError("The registry is frozen and cannot be modified.")
@@ -3,11 +3,19 @@
 #
 # SPDX-License-Identifier: MIT
 
+import configparser
+import json
 import os
+import time
+import tomllib
 from abc import ABC, abstractmethod
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from types import MappingProxyType
 from typing import Any, NamedTuple
 
-from .errors import SettingError
+from .converters import Converter, default_converters
+from .errors import SettingError, SettingsFileError
 
 
 class SettingDetails(NamedTuple):
@@ -15,6 +23,13 @@ class SettingDetails(NamedTuple):
     default_value: Any = None
 
 
+class SettingRequest(NamedTuple):
+    setting_identifier: str
+    setting_type: type
+    default_value: Any = None
+    converter: Converter | None = None
+
+
 class SettingsProvider(ABC):
     """
     An interface that provides a method to retrieve settings.
@@ -55,38 +70,475 @@ class SettingsProvider(ABC):
         - the value could not be cast to the desired type.
         """
 
+    def get_setting_values(self, requests: Sequence[SettingRequest]) -> list[Any]:
+        """
+        Method to retrieve the values for multiple settings at once.
+
+        The default implementation calls ``get_setting_value`` for every request. Providers that can serve
+        multiple settings more efficiently, e.g. with a single round trip, should override it.
+        :param requests: The settings to retrieve.
+        :return: The values of the settings in the order of the requests.
+        :raises SettingError: For the same reasons as ``get_setting_value``.
+        """
+        return [
+            self.get_setting_value(
+                request.setting_identifier, request.setting_type, request.default_value
+            )
+            for request in requests
+        ]
+
+    def refresh(self) -> None:
+        """
+        Method to discard cached values, so following lookups see changes of the underlying source.
+
+        Called by ``Registry.reload_settings``. Providers without caches do not need to override it.
+        """
+
 
 class EnvSettingsProvider(SettingsProvider):
     def convert_identifier(self, identifier: str) -> str:
         self.check_identifier(identifier)
         return identifier.upper().replace(".", "_")
 
+    def get_raw_value(self, setting_identifier: str) -> str | None:
+        """
+        Method to retrieve the unconverted value for a given setting identifier.
+        :param setting_identifier: The identifier to retrieve the value for.
+        :return: The raw value or None if no value could be found.
+        """
+        return os.getenv(self.convert_identifier(setting_identifier), None)
+
+    @staticmethod
+    def convert_value(
+        raw_value: Any,
+        setting_identifier: str,
+        setting_type: type,
+        converter: Converter | None = None,
+    ) -> Any:
+        """
+        Function to convert a raw value to the desired type.
+
+        The converter is looked up in ``pytheca.converters.default_converters`` unless it is given.
+        :param raw_value: The raw value to convert.
+        :param setting_identifier: The identifier the value belongs to.
+        :param setting_type: The python type the value should have.
+        :param converter: The converter for the type, if it was already resolved.
+        :return: The converted value.
+        :raises SettingError: If the type is not supported or the value could not be converted.
+        """
+        if converter is None:
+            converter = default_converters.get_converter(setting_type)
+        try:
+            if converter is not None:
+                return converter(raw_value)
+        except TypeError:
+            pass
+        except ValueError as exc:
+            raise SettingError(
+                f"Error converting {raw_value} to {setting_type} requested for {setting_identifier}.",
+                setting_identifier,
+                setting_type,
+            ) from exc
+        raise SettingError(
+            f"{setting_type} requested for {setting_identifier} not supported by SettingProvider.",
+            setting_identifier,
+            setting_type,
+        )
+
     def get_setting_value(
         self, setting_identifier: str, setting_type: type, default_value: Any = None
     ) -> Any:
-        raw_value = os.getenv(self.convert_identifier(setting_identifier), None)
+        raw_value = self.get_raw_value(setting_identifier)
         if raw_value is not None:
-            try:
-                if setting_type is int:
-                    return int(raw_value)
-                elif setting_type is str:
-                    return raw_value
-                elif setting_type is bool:
-                    return bool(raw_value)
-                elif setting_type is float:
-                    return float(raw_value)
-                else:
-                    raise SettingError(
-                        f"{setting_type} requested for {setting_identifier} not supported by SettingProvider.",
-                        setting_identifier,
-                        setting_type,
+            return self.convert_value(raw_value, setting_identifier, setting_type)
+        elif default_value is None:
+            raise SettingError(
+                f"No value for {setting_identifier} could be found.",
+                setting_identifier,
+                setting_type,
+            )
+        else:
+            return default_value
+
+    def get_setting_values(self, requests: Sequence[SettingRequest]) -> list[Any]:
+        values = []
+        for setting_identifier, setting_type, default_value, converter in requests:
+            raw_value = self.get_raw_value(setting_identifier)
+            if raw_value is not None:
+                values.append(
+                    self.convert_value(
+                        raw_value, setting_identifier, setting_type, converter
                     )
-            except ValueError as exc:
+                )
+            elif default_value is None:
                 raise SettingError(
-                    f"Error converting {raw_value} to {setting_type} requested for {setting_identifier}.",
+                    f"No value for {setting_identifier} could be found.",
                     setting_identifier,
                     setting_type,
-                ) from exc
+                )
+            else:
+                values.append(default_value)
+        return values
+
+
+_MISSING = object()
+
+
+class CachedEnvSettingsProvider(EnvSettingsProvider):
+    """
+    A settings provider that reads settings from a snapshot of the environment taken at creation.
+
+    Normalized identifiers and converted values are memoized, so repeated lookups of the same setting are a
+    single dictionary access. Call ``refresh`` to pick up changes of the environment.
+    """
+
+    def __init__(self, change_check_interval: float | None = None) -> None:
+        """
+        :param change_check_interval: If set, the environment is checked for changes at most once per given
+            number of seconds during lookups and the snapshot is refreshed when it changed.
+        """
+        super().__init__()
+        self.change_check_interval = change_check_interval
+        self._identifiers: dict[str, str] = {}
+        self._values: dict[tuple[str, type], Any] = {}
+        self._snapshot: Mapping[str, str] = MappingProxyType({})
+        self._last_change_check = 0.0
+        self.refresh()
+
+    @property
+    def snapshot(self) -> Mapping[str, str]:
+        """
+        The immutable snapshot of the environment settings are read from.
+        """
+        return self._snapshot
+
+    def refresh(self) -> None:
+        """
+        Takes a new snapshot of the environment and discards all memoized values.
+        """
+        self._snapshot = MappingProxyType(dict(os.environ))
+        self._values = {}
+        self._last_change_check = time.monotonic()
+
+    def has_changed(self) -> bool:
+        """
+        Checks if the environment differs from the current snapshot.
+        :return: True if the environment changed since the last refresh.
+        """
+        return os.environ != self._snapshot
+
+    def convert_identifier(self, identifier: str) -> str:
+        try:
+            return self._identifiers[identifier]
+        except KeyError:
+            converted_identifier = super().convert_identifier(identifier)
+            self._identifiers[identifier] = converted_identifier
+            return converted_identifier
+
+    def get_raw_value(self, setting_identifier: str) -> str | None:
+        return self._snapshot.get(self.convert_identifier(setting_identifier))
+
+    def get_setting_values(self, requests: Sequence[SettingRequest]) -> list[Any]:
+        # Converted values are memoized, so the lookups skip the converters of the requests.
+        return SettingsProvider.get_setting_values(self, requests)
+
+    def get_setting_value(
+        self, setting_identifier: str, setting_type: type, default_value: Any = None
+    ) -> Any:
+        if (
+            self.change_check_interval is not None
+            and time.monotonic() - self._last_change_check >= self.change_check_interval
+        ):
+            if self.has_changed():
+                self.refresh()
+            else:
+                self._last_change_check = time.monotonic()
+        key = (setting_identifier, setting_type)
+        value = self._values.get(key, _MISSING)
+        if value is _MISSING:
+            raw_value = self.get_raw_value(setting_identifier)
+            value = (
+                None
+                if raw_value is None
+                else self.convert_value(raw_value, setting_identifier, setting_type)
+            )
+            self._values[key] = value
+        if value is not None:
+            return value
+        elif default_value is None:
+            raise SettingError(
+                f"No value for {setting_identifier} could be found.",
+                setting_identifier,
+                setting_type,
+            )
+        else:
+            return default_value
+
+
+class FileSettingsProvider(SettingsProvider):
+    """
+    A settings provider that reads settings from TOML, JSON or INI files.
+
+    Every file is read and parsed once into a flat index of dotted identifiers, e.g. the TOML table ``[db]`` with
+    the key ``url`` provides the setting ``db.url``. Identifiers are case-insensitive. If multiple files are given,
+    values of later files override values of earlier files. INI files only contain strings, so boolean settings
+    read from them follow the rules of ``configparser``, e.g. ``false``, ``no``, ``off`` and ``0`` are False.
+    """
+
+    PARSERS = {".toml": "toml", ".json": "json", ".ini": "ini", ".cfg": "ini"}
+
+    def __init__(
+        self,
+        *paths: str | os.PathLike[str],
+        missing_ok: bool = False,
+        change_check_interval: float | None = None,
+    ) -> None:
+        """
+        :param paths: The files to read, in ascending precedence.
+        :param missing_ok: If True, files that do not exist are skipped instead of raising an error.
+        :param change_check_interval: If set, the files are checked for changes at most once per given number of
+            seconds during lookups and reloaded when they changed.
+        :raises SettingsFileError: If a file has an unsupported format, is missing or could not be parsed.
+        """
+        super().__init__()
+        self.paths = tuple(Path(path) for path in paths)
+        self.missing_ok = missing_ok
+        self.change_check_interval = change_check_interval
+        self._index: Mapping[str, Any] = MappingProxyType({})
+        self._ini_identifiers: frozenset[str] = frozenset()
+        self._values: dict[tuple[str, type], Any] = {}
+        self._file_states: tuple[tuple[int, int] | None, ...] = ()
+        self._last_change_check = 0.0
+        for path in self.paths:
+            if path.suffix.lower() not in self.PARSERS:
+                raise SettingsFileError(
+                    f"The settings file {path} has an unsupported format.", str(path)
+                )
+        self.refresh()
+
+    @property
+    def index(self) -> Mapping[str, Any]:
+        """
+        The immutable flat index of all settings, keyed by lower case identifiers.
+        """
+        return self._index
+
+    def refresh(self) -> None:
+        """
+        Reads and parses all files again and discards all memoized values.
+        """
+        index: dict[str, Any] = {}
+        ini_identifiers: set[str] = set()
+        file_states = self._get_file_states()
+        for path, file_state in zip(self.paths, file_states):
+            if file_state is None:
+                continue
+            values = self._parse_file(path)
+            index.update(values)
+            if self.PARSERS[path.suffix.lower()] == "ini":
+                ini_identifiers.update(values)
+            else:
+                ini_identifiers.difference_update(values)
+        self._index = MappingProxyType(index)
+        self._ini_identifiers = frozenset(ini_identifiers)
+        self._values = {}
+        self._file_states = file_states
+        self._last_change_check = time.monotonic()
+
+    def has_changed(self) -> bool:
+        """
+        Checks if any file was modified, created or removed based on its modification time and size.
+        :return: True if a file changed since the last refresh.
+        """
+        return self._get_file_states() != self._file_states
+
+    def _get_file_states(self) -> tuple[tuple[int, int] | None, ...]:
+        file_states: list[tuple[int, int] | None] = []
+        for path in self.paths:
+            try:
+                stat_result = path.stat()
+            except FileNotFoundError:
+                if not self.missing_ok:
+                    raise SettingsFileError(
+                        f"The settings file {path} does not exist.", str(path)
+                    ) from None
+                file_states.append(None)
+            else:
+                file_states.append((stat_result.st_mtime_ns, stat_result.st_size))
+        return tuple(file_states)
+
+    def _parse_file(self, path: Path) -> dict[str, Any]:
+        parser = self.PARSERS[path.suffix.lower()]
+        try:
+            if parser == "toml":
+                with path.open("rb") as toml_file:
+                    return self._flatten(tomllib.load(toml_file))
+            if parser == "json":
+                with path.open("rb") as json_file:
+                    return self._flatten(json.load(json_file))
+            config_parser = configparser.ConfigParser(interpolation=None)
+            with path.open() as ini_file:
+                config_parser.read_file(ini_file)
+            data: dict[str, Any] = dict(config_parser.defaults())
+            for section in config_parser.sections():
+                data[section] = dict(config_parser.items(section))
+            return self._flatten(data)
+        except (ValueError, configparser.Error) as exc:
+            raise SettingsFileError(
+                f"The settings file {path} could not be parsed: {exc}", str(path)
+            ) from exc
+
+    @classmethod
+    def _flatten(cls, data: Any, prefix: str = "") -> dict[str, Any]:
+        if not isinstance(data, dict):
+            raise ValueError("The top level of a settings file must be a mapping.")
+        index = {}
+        for key, value in data.items():
+            identifier = f"{prefix}{key}".lower()
+            if isinstance(value, dict):
+                index.update(cls._flatten(value, f"{identifier}."))
+            else:
+                index[identifier] = value
+        return index
+
+    @staticmethod
+    def _convert_ini_boolean(raw_value: str, setting_identifier: str) -> bool:
+        try:
+            return configparser.ConfigParser.BOOLEAN_STATES[raw_value.lower()]
+        except KeyError:
+            raise SettingError(
+                f"Error converting {raw_value} to {bool} requested for {setting_identifier}.",
+                setting_identifier,
+                bool,
+            ) from None
+
+    def get_setting_value(
+        self, setting_identifier: str, setting_type: type, default_value: Any = None
+    ) -> Any:
+        if (
+            self.change_check_interval is not None
+            and time.monotonic() - self._last_change_check >= self.change_check_interval
+        ):
+            if self.has_changed():
+                self.refresh()
+            else:
+                self._last_change_check = time.monotonic()
+        key = (setting_identifier, setting_type)
+        value = self._values.get(key, _MISSING)
+        if value is _MISSING:
+            self.check_identifier(setting_identifier)
+            raw_value = self._index.get(setting_identifier.lower())
+            if raw_value is None:
+                value = None
+            elif (
+                setting_type is bool
+                and setting_identifier.lower() in self._ini_identifiers
+            ):
+                value = self._convert_ini_boolean(raw_value, setting_identifier)
+            else:
+                value = EnvSettingsProvider.convert_value(
+                    raw_value, setting_identifier, setting_type
+                )
+            self._values[key] = value
+        if value is not None:
+            return value
+        elif default_value is None:
+            raise SettingError(
+                f"No value for {setting_identifier} could be found.",
+                setting_identifier,
+                setting_type,
+            )
+        else:
+            return default_value
+
+
+class ChainedSettingsProvider(SettingsProvider):
+    """
+    A settings provider consulting an ordered list of settings providers.
+
+    Like ``collections.ChainMap`` the first provider that has a value for an identifier wins. The provider that
+    answered an identifier is remembered, so repeated lookups go straight to it instead of walking all layers.
+    Misses are not remembered, so a value that appears in any layer later is found. Layers are probed with a
+    sentinel default value, so misses do not raise exceptions.
+    """
+
+    def __init__(self, *providers: SettingsProvider) -> None:
+        """
+        :param providers: The providers to consult, in descending precedence.
+        """
+        super().__init__()
+        self.providers = providers
+        self._layers: dict[str, SettingsProvider] = {}
+
+    def clear_cache(self) -> None:
+        """
+        Forgets which provider answered which identifier, e.g. after the providers were refreshed.
+        """
+        self._layers = {}
+
+    def refresh(self) -> None:
+        """
+        Refreshes all providers and forgets which provider answered which identifier.
+        """
+        for provider in self.providers:
+            provider.refresh()
+        self.clear_cache()
+
+    def _find_value(self, setting_identifier: str, setting_type: type) -> Any:
+        self.check_identifier(setting_identifier)
+        for provider in self.providers:
+            value = provider.get_setting_value(
+                setting_identifier, setting_type, _MISSING
+            )
+            if value is not _MISSING:
+                self._layers[setting_identifier] = provider
+                return value
+        return _MISSING
+
+    def get_setting_value(
+        self, setting_identifier: str, setting_type: type, default_value: Any = None
+    ) -> Any:
+        value = _MISSING
+        provider = self._layers.get(setting_identifier)
+        if provider is not None:
+            value = provider.get_setting_value(
+                setting_identifier, setting_type, _MISSING
+            )
+        if value is _MISSING:
+            value = self._find_value(setting_identifier, setting_type)
+        if value is not _MISSING:
+            return value
+        elif default_value is None:
+            raise SettingError(
+                f"No value for {setting_identifier} could be found.",
+                setting_identifier,
+                setting_type,
+            )
+        else:
+            return default_value
+
+
+class StaticSettingsProvider(SettingsProvider):
+    """
+    A settings provider serving fixed values, e.g. the values captured by ``Registry.snapshot()``.
+
+    The values are returned as they are, without conversion. A setting injected with different types has a value
+    for each type.
+    """
+
+    def __init__(self, values: Mapping[tuple[str, type], Any]) -> None:
+        """
+        :param values: The setting values by identifier and type.
+        """
+        super().__init__()
+        self.values = dict(values)
+
+    def get_setting_value(
+        self, setting_identifier: str, setting_type: type, default_value: Any = None
+    ) -> Any:
+        value = self.values.get((setting_identifier, setting_type), _MISSING)
+        if value is not _MISSING:
+            return value
         elif default_value is None:
             raise SettingError(
                 f"No value for {setting_identifier} could be found.",
@@ -0,0 +1,58 @@
+# SPDX-FileCopyrightText: 2025 SamuelYaron <samuel.yaron@oxur.de>
+# SPDX-FileCopyrightText: [year] [copyright holder] <[email address]>
+#
+# SPDX-License-Identifier: MIT
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+from pytheca.bench import (
+    BENCHMARKS,
+    BenchmarkResult,
+    compare,
+    main,
+    run_benchmarks,
+    to_json,
+)
+
+
+def test_run_all_benchmarks() -> None:
+    results = run_benchmarks(iterations=2)
+    assert [result.name for result in results] == list(BENCHMARKS)
+    assert all(result.iterations == 2 for result in results)
+    assert all(result.total_seconds > 0 for result in results)
+
+
+def test_to_json_and_compare() -> None:
+    results = [BenchmarkResult("foo", 10, 1e-6), BenchmarkResult("bar", 10, 1e-6)]
+    baseline = to_json([BenchmarkResult("foo", 10, 2e-6)])
+    assert baseline == {
+        "foo": {
+            "iterations": 10,
+            "total_seconds": 2e-6,
+            "nanoseconds_per_call": pytest.approx(200.0),
+        }
+    }
+    assert compare(results, baseline) == {"foo": pytest.approx(0.5)}
+
+
+def test_main(tmp_path: Path, capsys: Any) -> None:
+    output = tmp_path / "results.json"
+    assert (
+        main(["--iterations", "2", "--output", str(output), "resolve_transient"]) == 0
+    )
+    assert set(json.loads(output.read_text())) == {"resolve_transient"}
+    assert (
+        main(["--iterations", "2", "--baseline", str(output), "resolve_transient"]) == 0
+    )
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith("resolve_transient")
+    assert lines[1].endswith("x baseline")
+
+
+def test_main_unknown_benchmark(capsys: Any) -> None:
+    with pytest.raises(SystemExit):
+        main(["foo"])
+    assert "unknown benchmarks: foo" in capsys.readouterr().err
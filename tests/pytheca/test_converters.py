@@ -0,0 +1,176 @@
+# SPDX-FileCopyrightText: 2025 SamuelYaron <samuel.yaron@oxur.de>
+# SPDX-FileCopyrightText: [year] [copyright holder] <[email address]>
+#
+# SPDX-License-Identifier: MIT
+
+import dataclasses
+import enum
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Literal, Optional
+
+import pytest
+from pytheca.converters import ByteSize, ConverterRegistry, default_converters
+
+
+class Color(enum.Enum):
+    RED = "red"
+    GREEN = 2
+
+
+@dataclasses.dataclass
+class Endpoint:
+    host: str
+    port: int = 80
+    tags: list[str] = dataclasses.field(default_factory=list)
+    url: str = dataclasses.field(init=False, default="")
+
+
+@dataclasses.dataclass
+class Unresolvable:
+    value: "UndefinedType"  # type: ignore[name-defined]  # noqa: F821
+
+
+@dataclasses.dataclass
+class Unsupported:
+    value: object
+
+
+def convert(setting_type: Any, raw_value: Any) -> Any:
+    converter = default_converters.get_converter(setting_type)
+    assert converter is not None
+    return converter(raw_value)
+
+
+class TestDefaultConverters:
+    @pytest.mark.parametrize(
+        "setting_type,raw_value,expected_value",
+        [
+            (int, "5", 5),
+            (int, 5, 5),
+            (str, 5, "5"),
+            (bool, False, False),
+            (float, "1.5", 1.5),
+            (Path, "/tmp/x", Path("/tmp/x")),
+            (list[int], "1, 2,3", [1, 2, 3]),
+            (list[int], "[1, 2]", [1, 2]),
+            (list[int], [1, "2"], [1, 2]),
+            (list[str], "", []),
+            (list, "a,b", ["a", "b"]),
+            (tuple[int, ...], "1,2", (1, 2)),
+            (tuple[str, int], "a,1", ("a", 1)),
+            (set[int], "1,1,2", {1, 2}),
+            (frozenset[str], ["a"], frozenset({"a"})),
+            (dict[str, int], "a=1, b=2", {"a": 1, "b": 2}),
+            (dict[str, int], '{"a": 1}', {"a": 1}),
+            (dict[str, list[int]], {"a": [1, 2]}, {"a": [1, 2]}),
+            (dict, "", {}),
+            (Literal["fast", "slow"], "slow", "slow"),
+            (Literal[1, 2], "2", 2),
+            (Color, "RED", Color.RED),
+            (Color, "red", Color.RED),
+            (Color, "2", Color.GREEN),
+            (Optional[int], "3", 3),
+            (int | None, "3", 3),
+            (timedelta, "90", timedelta(seconds=90)),
+            (timedelta, 1.5, timedelta(seconds=1.5)),
+            (timedelta, "1h30m", timedelta(hours=1, minutes=30)),
+            (timedelta, "250ms", timedelta(milliseconds=250)),
+            (ByteSize, "512", 512),
+            (ByteSize, "10KB", 10000),
+            (ByteSize, "1.5 KiB", 1536),
+            (Endpoint, "host=example.org", Endpoint("example.org")),
+            (
+                Endpoint,
+                '{"host": "example.org", "port": "8080", "tags": "a,b"}',
+                Endpoint("example.org", 8080, ["a", "b"]),
+            ),
+            (Endpoint, Endpoint("example.org"), Endpoint("example.org")),
+        ],
+    )
+    def test_conversion(
+        self, setting_type: Any, raw_value: Any, expected_value: Any
+    ) -> None:
+        assert convert(setting_type, raw_value) == expected_value
+
+    def test_byte_size_type(self) -> None:
+        assert type(convert(ByteSize, "1MiB")) is ByteSize
+
+    @pytest.mark.parametrize(
+        "setting_type,raw_value",
+        [
+            (int, "1.0"),
+            (list[int], "[1, 2"),
+            (tuple[str, int], "a"),
+            (dict[str, int], "a"),
+            (dict[str, int], "[1]"),
+            (Literal["fast", "slow"], "medium"),
+            (Color, "BLUE"),
+            (timedelta, "1 hour"),
+            (timedelta, "h"),
+            (ByteSize, "10XB"),
+            (ByteSize, "KB"),
+            (Endpoint, "host=example.org,path=/"),
+        ],
+    )
+    def test_invalid_value(self, setting_type: Any, raw_value: Any) -> None:
+        with pytest.raises(ValueError):
+            convert(setting_type, raw_value)
+
+    @pytest.mark.parametrize(
+        "setting_type,raw_value",
+        [(int, [1]), (str, {"a": 1}), (list[int], 5), (dict[str, int], 5)],
+    )
+    def test_invalid_shape(self, setting_type: Any, raw_value: Any) -> None:
+        with pytest.raises(TypeError):
+            convert(setting_type, raw_value)
+
+    @pytest.mark.parametrize(
+        "setting_type",
+        [
+            object,
+            list[object],
+            tuple[int, object],
+            dict[str, object],
+            int | str,
+            Unresolvable,
+            Unsupported,
+        ],
+    )
+    def test_unsupported_type(self, setting_type: Any) -> None:
+        assert default_converters.get_converter(setting_type) is None
+
+    def test_converter_cached(self) -> None:
+        assert default_converters.get_converter(
+            list[int]
+        ) is default_converters.get_converter(list[int])
+
+
+class TestConverterRegistry:
+    def test_register(self) -> None:
+        converters = ConverterRegistry()
+        assert converters.get_converter(int) is None
+        converters.register(int, int)
+        assert converters.get_converter(int) is int
+
+    def test_register_replaces_cached_converter(self) -> None:
+        converters = ConverterRegistry()
+        converters.register(int, int)
+        assert converters.get_converter(int) is int
+        converters.register(int, float)
+        assert converters.get_converter(int) is float
+
+    def test_factories_registered_later_asked_first(self) -> None:
+        converters = ConverterRegistry()
+        converters.register_factory(lambda setting_type, _: int)
+        assert converters.get_converter(list[str]) is int
+        converters.register_factory(lambda setting_type, _: str)
+        assert converters.get_converter(list[str]) is str
+
+    def test_unhashable_type(self) -> None:
+        converters = ConverterRegistry()
+        converters.register_factory(
+            lambda setting_type, _: len if setting_type == ["sized"] else None
+        )
+        assert converters.get_converter(["sized"]) is len
+        assert converters.get_converter(["other"]) is None
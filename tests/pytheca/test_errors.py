@@ -3,7 +3,12 @@
 #
 # SPDX-License-Identifier: MIT
 
-from pytheca.errors import SettingError, RegistryError
+from pytheca.errors import (
+    RegistryError,
+    RegistryValidationError,
+    SettingError,
+    SettingsFileError,
+)
 import pytest
 
 
@@ -17,3 +22,17 @@ def test_setting_error() -> None:
         raise SettingError("MESSAGE", "identifier", int)
     assert exc_info.value.setting_type is int
     assert exc_info.value.setting_identifier == "identifier"
+
+
+def test_registry_validation_error() -> None:
+    errors = [RegistryError("FIRST"), SettingError("SECOND", "identifier")]
+    with pytest.raises(RegistryValidationError, match="MESSAGE") as exc_info:
+        raise RegistryValidationError("MESSAGE", errors)
+    assert isinstance(exc_info.value, RegistryError)
+    assert exc_info.value.errors == errors
+
+
+def test_settings_file_error() -> None:
+    with pytest.raises(SettingsFileError, match="MESSAGE") as exc_info:
+        raise SettingsFileError("MESSAGE", "settings.toml")
+    assert exc_info.value.path == "settings.toml"
@@ -0,0 +1,150 @@
+# SPDX-FileCopyrightText: 2025 SamuelYaron <samuel.yaron@oxur.de>
+# SPDX-FileCopyrightText: [year] [copyright holder] <[email address]>
+#
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from typing import Annotated, Any
+
+import pytest
+from pytheca.instrumentation import RegistryObserver, StatisticsCollector
+from pytheca.registry import ImplementationDetails, Lifetime, Registry
+from pytheca.settings import SettingDetails
+
+
+class Configured:
+    def __init__(self, value: Annotated[int, SettingDetails("foo.value", 5)]) -> None:
+        self.value = value
+
+
+class RecordingObserver(RegistryObserver):
+    def __init__(self) -> None:
+        self.events: list[tuple[Any, ...]] = []
+
+    def on_resolve_start(self, name: str) -> None:
+        self.events.append(("resolve_start", name))
+
+    def on_resolve_end(self, name: str, duration: float, cache_hit: bool) -> None:
+        self.events.append(("resolve_end", name, cache_hit))
+
+    def on_settings_lookup(
+        self, name: str, setting_identifier: str, duration: float
+    ) -> None:
+        self.events.append(("settings_lookup", name, setting_identifier))
+
+    def on_construct(self, name: str, duration: float) -> None:
+        self.events.append(("construct", name))
+
+
+@pytest.fixture
+def observed_registry(registry_instance: Registry) -> Registry:
+    registry_instance.register_interface(
+        "configured",
+        Configured,
+        implementation_details=ImplementationDetails(
+            Configured, lifetime=Lifetime.SINGLETON
+        ),
+    )
+    registry_instance.register_interface(
+        "transient", object, implementation_details=ImplementationDetails(object)
+    )
+    return registry_instance
+
+
+class TestRegistryObserver:
+    def test_default_methods(self) -> None:
+        observer = RegistryObserver()
+        observer.on_resolve_start("foo")
+        observer.on_resolve_end("foo", 0.0, False)
+        observer.on_settings_lookup("foo", "foo.bar", 0.0)
+        observer.on_construct("foo", 0.0)
+
+    def test_events(self, observed_registry: Registry) -> None:
+        observer = RecordingObserver()
+        observed_registry.add_observer(observer)
+        observed_registry.configured
+        observed_registry.configured
+        assert observer.events == [
+            ("resolve_start", "configured"),
+            ("construct", "settings_provider"),
+            ("settings_lookup", "configured", "foo.value"),
+            ("construct", "configured"),
+            ("resolve_end", "configured", False),
+            ("resolve_start", "configured"),
+            ("resolve_end", "configured", True),
+        ]
+
+    def test_async_events(self, observed_registry: Registry) -> None:
+        observer = RecordingObserver()
+        observed_registry.add_observer(observer)
+        asyncio.run(observed_registry.aget("transient"))
+        assert observer.events == [
+            ("resolve_start", "transient"),
+            ("construct", "transient"),
+            ("resolve_end", "transient", False),
+        ]
+
+    def test_delegated_cache_hit(self, observed_registry: Registry) -> None:
+        observed_registry.configured
+        child = observed_registry.child()
+        observer = RecordingObserver()
+        child.add_observer(observer)
+        child.configured
+        asyncio.run(child.aget("configured"))
+        assert (
+            observer.events
+            == [
+                ("resolve_start", "configured"),
+                ("resolve_end", "configured", True),
+            ]
+            * 2
+        )
+
+    def test_remove_observer(self, observed_registry: Registry) -> None:
+        observer = RecordingObserver()
+        observed_registry.add_observer(observer)
+        observed_registry.remove_observer(observer)
+        observed_registry.transient
+        asyncio.run(observed_registry.aget("transient"))
+        assert observer.events == []
+
+
+class TestStatisticsCollector:
+    def test_statistics(self, observed_registry: Registry) -> None:
+        collector = StatisticsCollector()
+        observed_registry.add_observer(collector)
+        for _ in range(3):
+            observed_registry.configured
+            observed_registry.transient
+        statistics = collector.as_dict()
+        assert statistics["configured"]["resolutions"] == 3
+        assert statistics["configured"]["cache_hits"] == 2
+        assert statistics["configured"]["cache_hit_ratio"] == pytest.approx(2 / 3)
+        assert statistics["configured"]["constructions"] == 1
+        assert statistics["configured"]["settings_lookups"] == 1
+        assert statistics["configured"]["settings_lookup_seconds"] >= 0
+        assert statistics["transient"]["constructions"] == 3
+        assert statistics["transient"]["cache_hit_ratio"] == 0
+        assert statistics["transient"]["construction_p99_seconds"] >= 0
+        assert statistics["settings_provider"]["resolutions"] == 0
+        assert statistics["settings_provider"]["cache_hit_ratio"] is None
+
+    def test_p99(self) -> None:
+        collector = StatisticsCollector(max_samples=100)
+        for duration in range(200):
+            collector.on_construct("foo", float(duration))
+        statistics = collector.as_dict()["foo"]
+        assert statistics["constructions"] == 200
+        assert statistics["construction_seconds"] == sum(range(200))
+        assert statistics["construction_p99_seconds"] == 198.0
+
+    def test_no_constructions(self) -> None:
+        collector = StatisticsCollector()
+        collector.on_resolve_end("foo", 0.0, True)
+        assert collector.as_dict()["foo"]["construction_p99_seconds"] is None
+
+    def test_reset(self) -> None:
+        collector = StatisticsCollector()
+        collector.on_construct("foo", 1.0)
+        collector.reset()
+        assert collector.as_dict() == {}
@@ -3,17 +3,63 @@
 #
 # SPDX-License-Identifier: MIT
 
-from typing import Annotated
+import asyncio
+from abc import ABC, abstractmethod
+import gc
+import os
+import pickle
+import sys
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Annotated, Any, get_type_hints
+from unittest import mock
 
 import pytest
-from pytheca.errors import RegistryError
+from pytheca.converters import default_converters
+from pytheca.errors import RegistryError, RegistryValidationError, SettingError
+from pytheca.instrumentation import StatisticsCollector
 from pytheca.registry import (
     Registry,
     _RegistryEntry,
+    _DependencyInjection,
+    _InjectionPlan,
     _InterfaceDetails,
+    _SettingInjection,
+    _fork_safe_registries,
+    _reset_fork_safe_registries,
+    FrozenRegistry,
     ImplementationDetails,
+    Lifetime,
+    PoolStatistics,
 )
-from pytheca.settings import SettingsProvider, EnvSettingsProvider
+from pytheca.settings import (
+    CachedEnvSettingsProvider,
+    ChainedSettingsProvider,
+    SettingsProvider,
+    EnvSettingsProvider,
+    SettingDetails,
+    SettingRequest,
+    StaticSettingsProvider,
+)
+
+
+def uncompiled_bindings(registry: Registry) -> dict[str, _RegistryEntry]:
+    # Injection plans compiled by other instances of the same registry class are shared.
+    return {
+        name: entry._replace(injection_plan=None)
+        for name, entry in registry._interfaces.items()
+    }
+
+
+class CycleFirst:
+    def __init__(self, second: "CycleSecond") -> None: ...
+
+
+class CycleSecond:
+    def __init__(self, first: CycleFirst) -> None: ...
 
 
 class TestRegistry:
@@ -25,11 +71,13 @@ class TestRegistry:
         self, registry_instance: Registry, simple_interface: tuple[type, type]
     ) -> None:
         registry_instance.register_interface("foo", simple_interface[0])
-        assert registry_instance._interfaces == {
+        assert uncompiled_bindings(registry_instance) == {
             "foo": _RegistryEntry(_InterfaceDetails("foo", simple_interface[0]), None),
             "settings_provider": _RegistryEntry(
                 _InterfaceDetails("settings_provider", SettingsProvider),
-                ImplementationDetails(implementation_cls=EnvSettingsProvider),
+                ImplementationDetails(
+                    implementation_cls=EnvSettingsProvider, lifetime=Lifetime.SINGLETON
+                ),
             ),
         }
 
@@ -41,14 +89,16 @@ class TestRegistry:
             simple_interface[0],
             implementation_details=ImplementationDetails(simple_interface[1]),
         )
-        assert registry_instance._interfaces == {
+        assert uncompiled_bindings(registry_instance) == {
             "foo": _RegistryEntry(
                 _InterfaceDetails("foo", simple_interface[0]),
                 ImplementationDetails(simple_interface[1]),
             ),
             "settings_provider": _RegistryEntry(
                 _InterfaceDetails("settings_provider", SettingsProvider),
-                ImplementationDetails(implementation_cls=EnvSettingsProvider),
+                ImplementationDetails(
+                    implementation_cls=EnvSettingsProvider, lifetime=Lifetime.SINGLETON
+                ),
             ),
         }
 
@@ -59,11 +109,13 @@ class TestRegistry:
 
         registry_instance.register_interface("foo", simple_interface[0])
         registry_instance.register_interface("foo", OtherInterface)
-        assert registry_instance._interfaces == {
+        assert uncompiled_bindings(registry_instance) == {
             "foo": _RegistryEntry(_InterfaceDetails("foo", OtherInterface), None),
             "settings_provider": _RegistryEntry(
                 _InterfaceDetails("settings_provider", SettingsProvider),
-                ImplementationDetails(implementation_cls=EnvSettingsProvider),
+                ImplementationDetails(
+                    implementation_cls=EnvSettingsProvider, lifetime=Lifetime.SINGLETON
+                ),
             ),
         }
 
@@ -137,42 +189,2642 @@ class TestRegistry:
         assert registry_instance.foo == 5
 
 
-class TestRegistryDeclarative:
-    def test_definition(self) -> None:
-        class SimpleInterface:
-            pass
+class TestInjectionPlan:
+    class SettingImplementation:
+        def __init__(
+            self,
+            number: Annotated[int, SettingDetails("foo.number", 5)],
+            other: str = "",
+        ) -> None:
+            self.number = number
 
-        class SimpleImplementation(SimpleInterface):
-            pass
+    def test_plan_compiled_on_first_access(self, registry_instance: Registry) -> None:
+        registry_instance.register_interface(
+            "foo",
+            object,
+            implementation_details=ImplementationDetails(self.SettingImplementation),
+        )
+        assert registry_instance._interfaces["foo"].injection_plan is None
+        assert registry_instance.foo.number == 5
+        assert registry_instance._interfaces["foo"].injection_plan == _InjectionPlan(
+            (_SettingInjection("number", int, SettingDetails("foo.number", 5)),),
+            (_DependencyInjection("other", str, has_default=True),),
+            self.SettingImplementation,
+            setting_requests=(
+                SettingRequest(
+                    "foo.number", int, 5, default_converters.get_converter(int)
+                ),
+            ),
+        )
 
-        class MyRegistry(Registry):
-            my_interface: Annotated[
-                SimpleInterface, ImplementationDetails(SimpleImplementation)
-            ]
+    def test_plan_compiled_once(self, registry_instance: Registry) -> None:
+        registry_instance.register_interface(
+            "foo",
+            object,
+            implementation_details=ImplementationDetails(self.SettingImplementation),
+        )
+        with mock.patch(
+            "pytheca.registry.get_type_hints", wraps=get_type_hints
+        ) as type_hints_mock:
+            registry_instance.foo
+            registry_instance.foo
+        init_calls = [
+            call
+            for call in type_hints_mock.call_args_list
+            if call.args[0] is self.SettingImplementation.__init__
+        ]
+        assert len(init_calls) == 1
 
-        registry = MyRegistry()
-        assert isinstance(registry.my_interface, SimpleImplementation)
+    def test_plan_invalidated_on_rebind(
+        self, registry_instance: Registry, simple_interface: tuple[type, type]
+    ) -> None:
+        registry_instance.register_interface(
+            "foo",
+            object,
+            implementation_details=ImplementationDetails(self.SettingImplementation),
+        )
+        registry_instance.foo
+        registry_instance.foo = ImplementationDetails(simple_interface[1])
+        assert registry_instance._interfaces["foo"].injection_plan is None
+        assert isinstance(registry_instance.foo, simple_interface[1])
+        assert registry_instance._interfaces["foo"].injection_plan == _InjectionPlan(
+            (), (), simple_interface[1]
+        )
 
-    def test_arbitrary_cls_attributes(self) -> None:
-        class MyRegistry(Registry):
-            typed_default: int = 5
-            untyped_default = ""
-            typed: str
-            annotated: Annotated[int, "some metadata"] = 5
 
-        MyRegistry()
+class TestDependencyInjection:
+    class Database:
+        def __init__(
+            self, url: Annotated[str, SettingDetails("db.url", "sqlite://")]
+        ) -> None:
+            self.url = url
 
-    def test_wrong_implementation_cls(self) -> None:
-        class SimpleInterface:
+    class Repository:
+        def __init__(self, database: "TestDependencyInjection.Database") -> None:
+            self.database = database
+
+    class Service:
+        def __init__(
+            self,
+            repository: "TestDependencyInjection.Repository",
+            database: "TestDependencyInjection.Database",
+        ) -> None:
+            self.repository = repository
+            self.database = database
+
+    @pytest.fixture
+    def graph_registry(self, registry_instance: Registry) -> Registry:
+        for name, cls in [
+            ("service", self.Service),
+            ("repository", self.Repository),
+            ("database", self.Database),
+        ]:
+            registry_instance.register_interface(
+                name, cls, implementation_details=ImplementationDetails(cls)
+            )
+        return registry_instance
+
+    def test_dependencies_injected(self, graph_registry: Registry) -> None:
+        service = graph_registry.service
+        assert isinstance(service.repository, self.Repository)
+        assert service.database.url == "sqlite://"
+
+    def test_transient_dependency_shared_within_resolution(
+        self, graph_registry: Registry
+    ) -> None:
+        service = graph_registry.service
+        assert service.repository.database is service.database
+        assert graph_registry.service.database is not service.database
+
+    def test_singleton_dependency_reused(self, graph_registry: Registry) -> None:
+        graph_registry.database = ImplementationDetails(
+            self.Database, lifetime=Lifetime.SINGLETON
+        )
+        assert graph_registry.service.database is graph_registry.repository.database
+
+    def test_cached_singleton_subgraph_skipped(self, graph_registry: Registry) -> None:
+        graph_registry.repository = ImplementationDetails(
+            self.Repository, lifetime=Lifetime.SINGLETON
+        )
+        repository = graph_registry.repository
+        assert graph_registry.repository is repository
+        service = graph_registry.service
+        assert service.repository is repository
+        assert service.database is not repository.database
+
+    def test_rebind_dependency(self, graph_registry: Registry) -> None:
+        class OtherDatabase(TestDependencyInjection.Database):
             pass
 
-        class OtherImpl: ...
+        graph_registry.service
+        graph_registry.database = ImplementationDetails(OtherDatabase)
+        assert isinstance(graph_registry.service.database, OtherDatabase)
 
-        class MyRegistry(Registry):
-            my_interface: Annotated[SimpleInterface, ImplementationDetails(OtherImpl)]
+    def test_unregistered_dependency_type_ignored(
+        self, registry_instance: Registry
+    ) -> None:
+        class Implementation:
+            def __init__(self, value: int = 5, values: list[int] | None = None) -> None:
+                self.value = value
+
+        registry_instance.register_interface(
+            "foo", object, implementation_details=ImplementationDetails(Implementation)
+        )
+        assert registry_instance.foo.value == 5
+
+    def test_unregistered_required_dependency(
+        self, registry_instance: Registry
+    ) -> None:
+        class Implementation:
+            def __init__(self, value: int) -> None:
+                self.value = value
 
+        registry_instance.register_interface(
+            "foo", object, implementation_details=ImplementationDetails(Implementation)
+        )
         with pytest.raises(
             RegistryError,
-            match=f"The implementation class {OtherImpl} must be a subclass of the interface class {SimpleInterface}.",
+            match="The dependency value of foo cannot be resolved, no interface is registered for <class 'int'>.",
         ):
-            MyRegistry()
+            registry_instance.foo
+
+    def test_variadic_parameters_ignored(self, registry_instance: Registry) -> None:
+        class Implementation:
+            def __init__(self, *args: Any, **kwargs: ChildCache) -> None:
+                self.args = args
+                self.kwargs = kwargs
+
+        registry_instance.register_interface(
+            "cache",
+            ChildCache,
+            implementation_details=ImplementationDetails(ChildCache),
+        )
+        registry_instance.register_interface(
+            "foo", object, implementation_details=ImplementationDetails(Implementation)
+        )
+        assert registry_instance.foo.args == ()
+        assert registry_instance.foo.kwargs == {}
+
+    def test_chained_settings_provider(self, registry_instance: Registry) -> None:
+        registry_instance.register_interface(
+            "settings_provider",
+            SettingsProvider,
+            implementation_details=ImplementationDetails(
+                ChainedSettingsProvider, lifetime=Lifetime.SINGLETON
+            ),
+        )
+        settings_provider = registry_instance.settings_provider
+        assert isinstance(settings_provider, ChainedSettingsProvider)
+        assert settings_provider.providers == ()
+
+    def test_factory_dependency_defaults(self, registry_instance: Registry) -> None:
+        def create(cache: ChildCache | None = None) -> ChildService:
+            return ChildService(cache or ChildCache())
+
+        registry_instance.register_interface(
+            "service",
+            ChildService,
+            implementation_details=ImplementationDetails(
+                ChildService, factory=create, parameters={"cache": ChildCache}
+            ),
+        )
+        assert isinstance(registry_instance.service.cache, ChildCache)
+        registry_instance.service = ImplementationDetails(
+            ChildService, factory=ChildService, parameters={"other": ChildCache}
+        )
+        with pytest.raises(RegistryError, match="The dependency other of service"):
+            registry_instance.service
+
+    def test_constructor_without_signature(self, registry_instance: Registry) -> None:
+        registry_instance.register_interface(
+            "service",
+            object,
+            implementation_details=ImplementationDetails(
+                object, factory=print, parameters={"file": ChildCache}
+            ),
+        )
+        with (
+            mock.patch("pytheca.registry.inspect.signature", side_effect=ValueError),
+            pytest.raises(RegistryError, match="The dependency file of service"),
+        ):
+            registry_instance.service
+
+    def test_dependency_without_implementation(self, graph_registry: Registry) -> None:
+        graph_registry.register_interface("database", self.Database)
+        with pytest.raises(
+            RegistryError, match="The interface database has no implementation details."
+        ):
+            graph_registry.service
+
+    def test_ambiguous_dependency(self, graph_registry: Registry) -> None:
+        graph_registry.register_interface(
+            "other_database",
+            self.Database,
+            implementation_details=ImplementationDetails(self.Database),
+        )
+        with pytest.raises(
+            RegistryError,
+            match="The dependency database of repository is ambiguous",
+        ):
+            graph_registry.repository
+
+    def test_cycle_detected(self, registry_instance: Registry) -> None:
+        for name, cls in [("first", CycleFirst), ("second", CycleSecond)]:
+            registry_instance.register_interface(
+                name, cls, implementation_details=ImplementationDetails(cls)
+            )
+        with pytest.raises(
+            RegistryError,
+            match="Circular dependency detected: first -> second -> first.",
+        ):
+            registry_instance.first
+
+
+class TestSettingsProviderResolution:
+    class CountingSettingsProvider(EnvSettingsProvider):
+        instances = 0
+
+        def __init__(self) -> None:
+            super().__init__()
+            TestSettingsProviderResolution.CountingSettingsProvider.instances += 1
+
+    class ManySettings:
+        def __init__(
+            self,
+            first: Annotated[int, SettingDetails("foo.first", 1)],
+            second: Annotated[int, SettingDetails("foo.second", 2)],
+            third: Annotated[int, SettingDetails("foo.third", 3)],
+        ) -> None:
+            self.values = (first, second, third)
+
+    @pytest.fixture
+    def counting_registry(self, registry_instance: Registry) -> Registry:
+        self.CountingSettingsProvider.instances = 0
+        registry_instance.register_interface(
+            "settings_provider",
+            SettingsProvider,
+            implementation_details=ImplementationDetails(self.CountingSettingsProvider),
+        )
+        registry_instance.register_interface(
+            "many",
+            object,
+            implementation_details=ImplementationDetails(self.ManySettings),
+        )
+        return registry_instance
+
+    def test_settings_provider_is_singleton(self, registry_instance: Registry) -> None:
+        assert (
+            registry_instance.settings_provider is registry_instance.settings_provider
+        )
+
+    def test_settings_provider_reused(self, counting_registry: Registry) -> None:
+        assert counting_registry.many.values == (1, 2, 3)
+        assert counting_registry.many.values == (1, 2, 3)
+        assert self.CountingSettingsProvider.instances == 1
+
+    def test_set_settings_provider(
+        self, counting_registry: Registry, monkeypatch: Any
+    ) -> None:
+        provider = EnvSettingsProvider()
+        counting_registry.set_settings_provider(provider)
+        monkeypatch.setenv("FOO_FIRST", "10")
+        assert counting_registry.settings_provider is provider
+        assert counting_registry.many.values == (10, 2, 3)
+        assert self.CountingSettingsProvider.instances == 0
+
+    def test_set_settings_provider_wrong_class(
+        self, registry_instance: Registry
+    ) -> None:
+        class OtherProvider: ...
+
+        with pytest.raises(
+            RegistryError,
+            match=f"The implementation class {OtherProvider} must be a subclass of the interface class {SettingsProvider}.",
+        ):
+            registry_instance.set_settings_provider(OtherProvider())  # type: ignore[arg-type]
+
+    def test_settings_retrieved_in_bulk(self, counting_registry: Registry) -> None:
+        provider = EnvSettingsProvider()
+        counting_registry.set_settings_provider(provider)
+        with (
+            mock.patch.object(
+                provider, "get_setting_values", wraps=provider.get_setting_values
+            ) as get_setting_values,
+            mock.patch.object(
+                provider, "get_setting_value", wraps=provider.get_setting_value
+            ),
+        ):
+            assert counting_registry.many.values == (1, 2, 3)
+        get_setting_values.assert_called_once()
+        assert [request[:3] for request in get_setting_values.call_args.args[0]] == [
+            ("foo.first", int, 1),
+            ("foo.second", int, 2),
+            ("foo.third", int, 3),
+        ]
+
+    def test_composite_setting_types(
+        self, registry_instance: Registry, monkeypatch: Any
+    ) -> None:
+        class Service:
+            def __init__(
+                self,
+                ports: Annotated[list[int], SettingDetails("service.ports")],
+                timeout: Annotated[timedelta, SettingDetails("service.timeout")],
+            ) -> None:
+                self.ports = ports
+                self.timeout = timeout
+
+        registry_instance.register_interface(
+            "service", Service, implementation_details=ImplementationDetails(Service)
+        )
+        monkeypatch.setenv("SERVICE_PORTS", "80,443")
+        monkeypatch.setenv("SERVICE_TIMEOUT", "1m30s")
+        assert registry_instance.service.ports == [80, 443]
+        assert registry_instance.service.timeout == timedelta(seconds=90)
+
+    def test_bulk_override_used(self, counting_registry: Registry) -> None:
+        class BulkSettingsProvider(EnvSettingsProvider):
+            def get_setting_values(
+                self, requests: Sequence[SettingRequest]
+            ) -> list[Any]:
+                return [request.default_value * 10 for request in requests]
+
+        counting_registry.set_settings_provider(BulkSettingsProvider())
+        assert counting_registry.many.values == (10, 20, 30)
+
+
+class TestLifetime:
+    @pytest.fixture
+    def lifetime_registry(
+        self, registry_instance: Registry, simple_interface: tuple[type, type]
+    ) -> Registry:
+        for lifetime in Lifetime:
+            registry_instance.register_interface(
+                lifetime.value,
+                simple_interface[0],
+                implementation_details=ImplementationDetails(
+                    simple_interface[1], lifetime=lifetime
+                ),
+            )
+        return registry_instance
+
+    def test_transient_is_default(self, simple_interface: tuple[type, type]) -> None:
+        assert ImplementationDetails(simple_interface[1]).lifetime is Lifetime.TRANSIENT
+
+    def test_transient(self, lifetime_registry: Registry) -> None:
+        assert lifetime_registry.transient is not lifetime_registry.transient
+
+    def test_singleton(self, lifetime_registry: Registry) -> None:
+        assert lifetime_registry.singleton is lifetime_registry.singleton
+
+    def test_singleton_invalidated_on_rebind(
+        self, lifetime_registry: Registry, simple_interface: tuple[type, type]
+    ) -> None:
+        instance = lifetime_registry.singleton
+        lifetime_registry.singleton = ImplementationDetails(
+            simple_interface[1], lifetime=Lifetime.SINGLETON
+        )
+        assert lifetime_registry.singleton is not instance
+
+    def test_singleton_created_once_concurrently(
+        self, registry_instance: Registry
+    ) -> None:
+        created = []
+
+        class SlowImplementation:
+            def __init__(self) -> None:
+                created.append(self)
+                time.sleep(0.01)
+
+        registry_instance.register_interface(
+            "slow",
+            object,
+            implementation_details=ImplementationDetails(
+                SlowImplementation, lifetime=Lifetime.SINGLETON
+            ),
+        )
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: registry_instance.slow, range(16)))
+        assert len(created) == 1
+        assert all(result is created[0] for result in results)
+
+    def test_scoped(self, lifetime_registry: Registry) -> None:
+        with lifetime_registry.scope() as registry:
+            first = registry.scoped
+            assert registry.scoped is first
+        with lifetime_registry.scope():
+            assert lifetime_registry.scoped is not first
+
+    def test_nested_scopes(self, lifetime_registry: Registry) -> None:
+        with lifetime_registry.scope():
+            outer = lifetime_registry.scoped
+            with lifetime_registry.scope():
+                assert lifetime_registry.scoped is not outer
+            assert lifetime_registry.scoped is outer
+
+    def test_scoped_invalidated_on_rebind(
+        self, lifetime_registry: Registry, simple_interface: tuple[type, type]
+    ) -> None:
+        with lifetime_registry.scope():
+            instance = lifetime_registry.scoped
+            lifetime_registry.scoped = ImplementationDetails(
+                simple_interface[1], lifetime=Lifetime.SCOPED
+            )
+            assert lifetime_registry.scoped is not instance
+
+    def test_scoped_outside_scope(self, lifetime_registry: Registry) -> None:
+        with pytest.raises(
+            RegistryError,
+            match="The scoped interface scoped can only be accessed within a scope.",
+        ):
+            lifetime_registry.scoped
+
+
+class HeavyInterface(ABC):
+    @abstractmethod
+    def compute(self) -> int: ...
+
+
+class HeavyDependency:
+    created = 0
+
+    def __init__(self) -> None:
+        HeavyDependency.created += 1
+
+
+class HeavyService(HeavyInterface):
+    created = 0
+
+    def __init__(self, dependency: HeavyDependency) -> None:
+        HeavyService.created += 1
+        self.dependency = dependency
+        self.value = 5
+
+    def compute(self) -> int:
+        return self.value
+
+
+class TestLazy:
+    @pytest.fixture
+    def lazy_registry(self, registry_instance: Registry) -> Registry:
+        HeavyDependency.created = 0
+        HeavyService.created = 0
+        registry_instance.register_interface(
+            "dependency",
+            HeavyDependency,
+            implementation_details=ImplementationDetails(HeavyDependency),
+        )
+        registry_instance.register_interface(
+            "heavy",
+            HeavyInterface,
+            implementation_details=ImplementationDetails(
+                HeavyService, lifetime=Lifetime.SINGLETON, lazy=True
+            ),
+        )
+        return registry_instance
+
+    def test_not_constructed_before_use(self, lazy_registry: Registry) -> None:
+        heavy = lazy_registry.heavy
+        assert isinstance(heavy, HeavyInterface)
+        assert repr(heavy) == "<lazy HeavyInterface>"
+        assert HeavyService.created == 0
+        assert HeavyDependency.created == 0
+
+    def test_constructed_on_first_use(self, lazy_registry: Registry) -> None:
+        heavy = lazy_registry.heavy
+        assert heavy.compute() == 5
+        assert heavy.compute() == 5
+        assert HeavyService.created == 1
+        assert HeavyDependency.created == 1
+        assert "HeavyService object" in repr(heavy)
+
+    def test_singleton_proxy_reused(self, lazy_registry: Registry) -> None:
+        assert lazy_registry.heavy is lazy_registry.heavy
+
+    def test_attribute_forwarding(self, lazy_registry: Registry) -> None:
+        heavy = lazy_registry.heavy
+        heavy.value = 7
+        assert heavy.compute() == 7
+        del heavy.value
+        with pytest.raises(AttributeError):
+            heavy.compute()
+
+    def test_dependent_receives_proxy(self, lazy_registry: Registry) -> None:
+        class Consumer:
+            def __init__(self, heavy: HeavyInterface) -> None:
+                self.heavy = heavy
+
+        lazy_registry.register_interface(
+            "consumer", Consumer, implementation_details=ImplementationDetails(Consumer)
+        )
+        consumer = lazy_registry.consumer
+        assert consumer.heavy is lazy_registry.heavy
+        assert HeavyService.created == 0
+
+    def test_constructed_once_concurrently(self, lazy_registry: Registry) -> None:
+        heavy = lazy_registry.heavy
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: heavy.compute(), range(32)))
+        assert results == [5] * 32
+        assert HeavyService.created == 1
+
+    def test_aget(self, lazy_registry: Registry) -> None:
+        heavy = asyncio.run(lazy_registry.aget("heavy"))
+        assert HeavyService.created == 0
+        assert heavy.compute() == 5
+
+
+class Parser:
+    events: list[str] = []
+
+    def __init__(self, resource: "Resource") -> None:
+        self.resource = resource
+
+    def close(self) -> None:
+        Parser.events.append(f"close {type(self).__name__}")
+
+
+class OtherParser(Parser):
+    pass
+
+
+class FailingParser(Parser):
+    def __init__(self) -> None:
+        raise ValueError("parser failed")
+
+
+class AsyncParser(Parser):
+    async def __ainit__(self) -> None:
+        pass
+
+
+class TestPooled:
+    @pytest.fixture
+    def pooled_registry(self, registry_instance: Registry) -> Registry:
+        Parser.events = []
+        Resource.events = []
+        registry_instance.register_interface(
+            "resource",
+            Resource,
+            implementation_details=ImplementationDetails(
+                Resource, lifetime=Lifetime.SINGLETON
+            ),
+        )
+        registry_instance.register_interface(
+            "parser",
+            Parser,
+            implementation_details=ImplementationDetails(
+                Parser, lifetime=Lifetime.POOLED, pool_size=2
+            ),
+        )
+        return registry_instance
+
+    def test_lease_reuses_instances(self, pooled_registry: Registry) -> None:
+        with pooled_registry.lease("parser") as parser:
+            assert parser.resource is pooled_registry.resource
+        with pooled_registry.lease("parser") as same_parser:
+            assert same_parser is parser
+            with pooled_registry.lease("parser") as other_parser:
+                assert other_parser is not parser
+        assert pooled_registry.get_pool_statistics("parser") == PoolStatistics(
+            size=2,
+            idle=2,
+            leased=0,
+            max_size=2,
+            created=2,
+            leases=3,
+            waits=0,
+            timeouts=0,
+            wait_seconds=0.0,
+        )
+
+    def test_access_without_lease_rejected(self, pooled_registry: Registry) -> None:
+        with pytest.raises(
+            RegistryError,
+            match=r"The pooled interface parser can only be used with lease\(\).",
+        ):
+            pooled_registry.parser
+        with pytest.raises(RegistryError, match="can only be used with lease"):
+            asyncio.run(pooled_registry.aget("parser"))
+        pooled_registry.register_interface(
+            "client", Pool, implementation_details=ImplementationDetails(Pool)
+        )
+        pooled_registry.register_interface(
+            "resource",
+            Resource,
+            implementation_details=ImplementationDetails(
+                Resource, lifetime=Lifetime.POOLED
+            ),
+        )
+        with pytest.raises(
+            RegistryError,
+            match=r"The pooled interface resource can only be used with lease\(\).",
+        ):
+            pooled_registry.client
+
+    def test_lease_waits_for_returned_instance(self, pooled_registry: Registry) -> None:
+        leased = threading.Barrier(3)
+        returned = threading.Event()
+        results = []
+
+        def lease_and_hold() -> None:
+            with pooled_registry.lease("parser") as parser:
+                leased.wait()
+                returned.wait()
+                results.append(parser)
+
+        holders = [threading.Thread(target=lease_and_hold) for _ in range(2)]
+        for holder in holders:
+            holder.start()
+        leased.wait()
+        threading.Timer(0.05, returned.set).start()
+        with pooled_registry.lease("parser") as parser:
+            assert parser in results
+        for holder in holders:
+            holder.join()
+        statistics = pooled_registry.get_pool_statistics("parser")
+        assert statistics.created == 2
+        assert statistics.waits == 1
+        assert statistics.wait_seconds > 0
+
+    def test_lease_timeout(self, pooled_registry: Registry) -> None:
+        pooled_registry.parser = ImplementationDetails(
+            Parser, lifetime=Lifetime.POOLED, pool_size=1, pool_timeout=0.01
+        )
+        with pooled_registry.lease("parser"):
+            with pytest.raises(
+                RegistryError,
+                match="No instance of the pooled interface parser became available within 0.01 seconds.",
+            ):
+                with pooled_registry.lease("parser"):
+                    pass  # pragma: no cover
+            with pytest.raises(RegistryError, match="within 0 seconds"):
+                with pooled_registry.lease("parser", timeout=0):
+                    pass  # pragma: no cover
+        assert pooled_registry.get_pool_statistics("parser").timeouts == 2
+
+    def test_failed_creation_frees_slot(self, pooled_registry: Registry) -> None:
+        pooled_registry.parser = ImplementationDetails(
+            FailingParser, lifetime=Lifetime.POOLED, pool_size=1, pool_timeout=0
+        )
+        for _ in range(2):
+            with pytest.raises(ValueError, match="parser failed"):
+                with pooled_registry.lease("parser"):
+                    pass  # pragma: no cover
+        assert pooled_registry.get_pool_statistics("parser").size == 0
+
+    def test_rebinding_retires_pool(self, pooled_registry: Registry) -> None:
+        with pooled_registry.lease("parser"):
+            with pooled_registry.lease("parser"):
+                pass
+            pooled_registry.parser = ImplementationDetails(
+                OtherParser, lifetime=Lifetime.POOLED
+            )
+            assert Parser.events == ["close Parser"]
+            with pooled_registry.lease("parser") as other_parser:
+                assert type(other_parser) is OtherParser
+        assert Parser.events == ["close Parser", "close Parser"]
+        assert pooled_registry.get_pool_statistics("parser").idle == 1
+
+    def test_waiting_lease_uses_new_pool(self, pooled_registry: Registry) -> None:
+        pooled_registry.parser = ImplementationDetails(
+            Parser, lifetime=Lifetime.POOLED, pool_size=1
+        )
+        results = []
+        with pooled_registry.lease("parser"):
+            waiter = threading.Thread(
+                target=lambda: results.append(
+                    pooled_registry.lease("parser").__enter__()
+                )
+            )
+            waiter.start()
+            while not pooled_registry.get_pool_statistics("parser").waits:
+                time.sleep(0.001)
+            pooled_registry.parser = ImplementationDetails(
+                OtherParser, lifetime=Lifetime.POOLED, pool_size=1
+            )
+            waiter.join()
+        assert type(results[0]) is OtherParser
+
+    def test_close(self, pooled_registry: Registry) -> None:
+        with pooled_registry.lease("parser"):
+            with pooled_registry.lease("parser"):
+                pass
+            pooled_registry.close()
+            assert Parser.events == ["close Parser"]
+            assert Resource.events == ["close Resource"]
+        assert Parser.events == ["close Parser", "close Parser"]
+
+    def test_async_only_instances_kept_for_aclose(
+        self, pooled_registry: Registry
+    ) -> None:
+        pooled_registry.register_interface(
+            "connection",
+            AsyncResource,
+            implementation_details=ImplementationDetails(
+                AsyncResource, lifetime=Lifetime.POOLED
+            ),
+        )
+        with pooled_registry.lease("connection"):
+            pooled_registry.close()
+        assert Resource.events == []
+        asyncio.run(pooled_registry.aclose())
+        assert Resource.events == ["aclose AsyncResource"]
+
+    def test_not_pooled(self, pooled_registry: Registry) -> None:
+        with pytest.raises(
+            RegistryError, match="The interface resource is not pooled."
+        ):
+            with pooled_registry.lease("resource"):
+                pass  # pragma: no cover
+        with pytest.raises(
+            RegistryError, match="The attribute foo could not be found."
+        ):
+            pooled_registry.get_pool_statistics("foo")
+
+    def test_async_initialization_rejected(self, pooled_registry: Registry) -> None:
+        pooled_registry.parser = ImplementationDetails(
+            AsyncParser, lifetime=Lifetime.POOLED
+        )
+        with pytest.raises(
+            RegistryError,
+            match="The pooled interface parser requires asynchronous initialization, which is not supported.",
+        ):
+            with pooled_registry.lease("parser"):
+                pass  # pragma: no cover
+
+    def test_invalid_pool_size(self, pooled_registry: Registry) -> None:
+        with pytest.raises(RegistryError, match="must be at least 1"):
+            pooled_registry.parser = ImplementationDetails(
+                Parser, lifetime=Lifetime.POOLED, pool_size=0
+            )
+
+    def test_child_shares_pool(self, pooled_registry: Registry) -> None:
+        child = pooled_registry.child()
+        with child.lease("parser") as parser:
+            pass
+        with pooled_registry.lease("parser") as same_parser:
+            assert same_parser is parser
+        assert child.get_pool_statistics("parser").leases == 2
+
+    def test_frozen_registry(self, pooled_registry: Registry) -> None:
+        frozen_registry = pooled_registry.freeze()
+        with frozen_registry.lease("parser") as parser:
+            assert isinstance(parser, Parser)
+        assert frozen_registry.get_pool_statistics("parser").leases == 1
+
+
+class TestFrozenRegistry:
+    @pytest.fixture
+    def frozen_registry(
+        self, registry_instance: Registry, simple_interface: tuple[type, type]
+    ) -> FrozenRegistry:
+        for lifetime in Lifetime:
+            registry_instance.register_interface(
+                lifetime.value,
+                simple_interface[0],
+                implementation_details=ImplementationDetails(
+                    simple_interface[1], lifetime=lifetime
+                ),
+            )
+        return registry_instance.freeze()
+
+    def test_singleton_is_plain_attribute(
+        self, frozen_registry: FrozenRegistry, simple_interface: tuple[type, type]
+    ) -> None:
+        instance = frozen_registry.singleton
+        assert isinstance(instance, simple_interface[1])
+        assert vars(frozen_registry)["singleton"] is instance
+        assert frozen_registry.singleton is instance
+
+    def test_transient(self, frozen_registry: FrozenRegistry) -> None:
+        assert frozen_registry.transient is not frozen_registry.transient
+        assert "transient" not in vars(frozen_registry)
+
+    def test_scoped(self, frozen_registry: FrozenRegistry) -> None:
+        with frozen_registry.scope() as registry:
+            assert registry.scoped is frozen_registry.scoped
+
+    def test_settings_provider(self, frozen_registry: FrozenRegistry) -> None:
+        assert isinstance(frozen_registry.settings_provider, EnvSettingsProvider)
+
+    def test_unknown_attribute(self, frozen_registry: FrozenRegistry) -> None:
+        with pytest.raises(
+            RegistryError, match="The attribute foo could not be found."
+        ):
+            frozen_registry.foo
+
+    def test_descriptor_on_class(self, frozen_registry: FrozenRegistry) -> None:
+        assert type(frozen_registry).__name__ == "FrozenRegistry"
+        assert getattr(type(frozen_registry), "singleton").name == "singleton"
+
+    def test_modification_rejected(
+        self, frozen_registry: FrozenRegistry, simple_interface: tuple[type, type]
+    ) -> None:
+        message = "The registry is frozen and cannot be modified."
+        with pytest.raises(RegistryError, match=message):
+            frozen_registry.transient = ImplementationDetails(simple_interface[1])
+        with pytest.raises(RegistryError, match=message):
+            del frozen_registry.transient
+        with pytest.raises(RegistryError, match=message):
+            frozen_registry.register_interface("foo", simple_interface[0])
+
+    def test_source_registry_rejects_modification(
+        self, registry_instance: Registry, simple_interface: tuple[type, type]
+    ) -> None:
+        registry_instance.freeze()
+        with pytest.raises(
+            RegistryError, match="The registry is frozen and cannot be modified."
+        ):
+            registry_instance.register_interface("foo", simple_interface[0])
+
+    def test_missing_implementation(
+        self, registry_instance: Registry, simple_interface: tuple[type, type]
+    ) -> None:
+        registry_instance.register_interface("foo", simple_interface[0])
+        with pytest.raises(
+            RegistryError, match="The interface foo has no implementation details."
+        ):
+            registry_instance.freeze()
+        registry_instance.register_interface("foo", simple_interface[0])
+
+    def test_colliding_names_rejected(
+        self, registry_instance: Registry, simple_interface: tuple[type, type]
+    ) -> None:
+        for name in ("get", "close", "_registry"):
+            registry_instance.register_interface(
+                name,
+                simple_interface[0],
+                implementation_details=ImplementationDetails(simple_interface[1]),
+            )
+        with pytest.raises(
+            RegistryError,
+            match="The interfaces get, close, _registry cannot be frozen, their names are attributes of FrozenRegistry.",
+        ):
+            registry_instance.freeze()
+        registry_instance.register_interface("foo", simple_interface[0])
+
+    def test_declarative_registry(self, simple_interface: tuple[type, type]) -> None:
+        class MyRegistry(Registry):
+            my_interface: Annotated[
+                simple_interface[0],  # type: ignore[valid-type]
+                ImplementationDetails(simple_interface[1]),
+            ]
+
+        frozen_registry = MyRegistry().freeze()
+        assert type(frozen_registry).__name__ == "FrozenMyRegistry"
+        assert isinstance(frozen_registry.my_interface, simple_interface[1])
+
+
+class TestThreadSafety:
+    THREADS = 16
+    ITERATIONS = 200
+
+    def test_singleton_constructed_once_per_binding(
+        self, registry_instance: Registry
+    ) -> None:
+        created: list[str] = []
+        barrier = threading.Barrier(self.THREADS)
+
+        def make_implementation(name: str) -> type:
+            class SlowImplementation:
+                def __init__(self) -> None:
+                    created.append(name)
+                    time.sleep(0.001)
+
+            return SlowImplementation
+
+        names = [f"service{index}" for index in range(8)]
+        for name in names:
+            registry_instance.register_interface(
+                name,
+                object,
+                implementation_details=ImplementationDetails(
+                    make_implementation(name), lifetime=Lifetime.SINGLETON
+                ),
+            )
+
+        def worker(_: int) -> list[Any]:
+            barrier.wait()
+            return [getattr(registry_instance, name) for name in names]
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            results = list(executor.map(worker, range(self.THREADS)))
+        assert sorted(created) == sorted(names)
+        assert all(result == results[0] for result in results)
+
+    def test_concurrent_resolution_and_rebinding(
+        self, registry_instance: Registry, simple_interface: tuple[type, type]
+    ) -> None:
+        class OtherImplementation(simple_interface[0]):  # type: ignore[misc, valid-type]
+            pass
+
+        implementations = [simple_interface[1], OtherImplementation]
+        for lifetime in Lifetime:
+            registry_instance.register_interface(
+                lifetime.value,
+                simple_interface[0],
+                implementation_details=ImplementationDetails(
+                    simple_interface[1], lifetime=lifetime
+                ),
+            )
+        errors: list[BaseException] = []
+
+        def reader() -> None:
+            try:
+                for _ in range(self.ITERATIONS):
+                    with registry_instance.scope():
+                        for lifetime in Lifetime:
+                            if lifetime is Lifetime.POOLED:
+                                with registry_instance.lease("pooled") as instance:
+                                    assert isinstance(instance, simple_interface[0])
+                                continue
+                            instance = getattr(registry_instance, lifetime.value)
+                            assert isinstance(instance, simple_interface[0])
+            except BaseException as exc:  # pragma: no cover
+                errors.append(exc)
+
+        def writer() -> None:
+            for index in range(self.ITERATIONS):
+                for lifetime in Lifetime:
+                    setattr(
+                        registry_instance,
+                        lifetime.value,
+                        ImplementationDetails(
+                            implementations[index % 2], lifetime=lifetime
+                        ),
+                    )
+
+        threads = [threading.Thread(target=reader) for _ in range(self.THREADS)]
+        threads.append(threading.Thread(target=writer))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        registry_instance.singleton = ImplementationDetails(
+            OtherImplementation, lifetime=Lifetime.SINGLETON
+        )
+        assert isinstance(registry_instance.singleton, OtherImplementation)
+        assert registry_instance.singleton is registry_instance.singleton
+
+    def test_rebinding_during_construction_not_cached(
+        self, registry_instance: Registry
+    ) -> None:
+        started = threading.Event()
+        proceed = threading.Event()
+
+        class Slow:
+            def __init__(self) -> None:
+                started.set()
+                proceed.wait()
+
+        class Fast:
+            pass
+
+        registry_instance.register_interface(
+            "foo",
+            object,
+            implementation_details=ImplementationDetails(
+                Slow, lifetime=Lifetime.SINGLETON
+            ),
+        )
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(lambda: registry_instance.foo)
+            started.wait()
+            registry_instance.foo = ImplementationDetails(
+                Fast, lifetime=Lifetime.SINGLETON
+            )
+            proceed.set()
+            assert isinstance(future.result(), Slow)
+        assert isinstance(registry_instance.foo, Fast)
+
+    def test_scopes_are_thread_bound(self, registry_instance: Registry) -> None:
+        registry_instance.register_interface(
+            "foo",
+            object,
+            implementation_details=ImplementationDetails(
+                object, lifetime=Lifetime.SCOPED
+            ),
+        )
+        with registry_instance.scope():
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                with pytest.raises(
+                    RegistryError, match="can only be accessed within a scope"
+                ):
+                    executor.submit(lambda: registry_instance.foo).result()
+
+
+class AsyncConnection:
+    events: list[str] = []
+
+    def __init__(self) -> None:
+        self.ready = False
+
+    async def __ainit__(self) -> None:
+        AsyncConnection.events.append(f"start {type(self).__name__}")
+        await asyncio.sleep(0.01)
+        AsyncConnection.events.append(f"end {type(self).__name__}")
+        self.ready = True
+
+    async def aclose(self) -> None:
+        AsyncConnection.events.append(f"aclose {type(self).__name__}")
+
+
+class OtherAsyncConnection(AsyncConnection):
+    pass
+
+
+class AsyncClient:
+    def __init__(
+        self, connection: AsyncConnection, other: OtherAsyncConnection
+    ) -> None:
+        self.connection = connection
+        self.other = other
+
+    def close(self) -> None:
+        AsyncConnection.events.append("close AsyncClient")
+
+
+class TestAsyncRegistry:
+    @pytest.fixture
+    def async_registry(self, registry_instance: Registry) -> Registry:
+        AsyncConnection.events = []
+        for name, cls in [
+            ("connection", AsyncConnection),
+            ("other", OtherAsyncConnection),
+            ("client", AsyncClient),
+        ]:
+            registry_instance.register_interface(
+                name,
+                cls,
+                implementation_details=ImplementationDetails(
+                    cls, lifetime=Lifetime.SINGLETON
+                ),
+            )
+        return registry_instance
+
+    def test_sync_access_rejected(self, async_registry: Registry) -> None:
+        with pytest.raises(
+            RegistryError,
+            match=r"The interface connection requires asynchronous initialization, use aget\(\) or warm_up\(\).",
+        ):
+            async_registry.connection
+
+    def test_aget(self, async_registry: Registry) -> None:
+        client = asyncio.run(async_registry.aget("client"))
+        assert client.connection.ready
+        assert client.other.ready
+        assert async_registry.client is client
+        assert asyncio.run(async_registry.aget("connection")) is client.connection
+
+    def test_concurrent_aget_singleton(self, async_registry: Registry) -> None:
+        async def resolve_twice() -> tuple[Any, Any]:
+            return await asyncio.gather(
+                async_registry.aget("connection"), async_registry.aget("connection")
+            )
+
+        first, second = asyncio.run(resolve_twice())
+        assert first is second
+
+    def test_singleton_initialized_once(self, async_registry: Registry) -> None:
+        async def resolve() -> tuple[Any, Any, None, Any]:
+            return await asyncio.gather(
+                async_registry.aget("connection"),
+                async_registry.aget("connection"),
+                async_registry.warm_up(),
+                asyncio.to_thread(asyncio.run, async_registry.aget("connection")),
+            )
+
+        first, second, _, third = asyncio.run(resolve())
+        assert first is second is third is async_registry.connection
+        assert AsyncConnection.events.count("start AsyncConnection") == 1
+        assert async_registry._singleton_futures == {}
+
+    def test_singleton_initialized_after_dependency(
+        self, async_registry: Registry
+    ) -> None:
+        class Dependent:
+            initializations = 0
+
+            def __init__(self, connection: AsyncConnection) -> None:
+                self.connection = connection
+
+            async def __ainit__(self) -> None:
+                Dependent.initializations += 1
+
+        async_registry.register_interface(
+            "dependent",
+            Dependent,
+            implementation_details=ImplementationDetails(
+                Dependent, lifetime=Lifetime.SINGLETON
+            ),
+        )
+
+        async def resolve_twice() -> tuple[Any, Any]:
+            return await asyncio.gather(
+                async_registry.aget("dependent"), async_registry.aget("dependent")
+            )
+
+        first, second = asyncio.run(resolve_twice())
+        assert first is second
+        assert Dependent.initializations == 1
+
+    def test_failed_singleton_initialization_shared(
+        self, registry_instance: Registry
+    ) -> None:
+        class FailingConnection(AsyncConnection):
+            async def __ainit__(self) -> None:
+                await super().__ainit__()
+                raise RuntimeError("connection failed")
+
+        registry_instance.register_interface(
+            "connection",
+            FailingConnection,
+            implementation_details=ImplementationDetails(
+                FailingConnection, lifetime=Lifetime.SINGLETON
+            ),
+        )
+        AsyncConnection.events = []
+
+        async def resolve_twice() -> tuple[Any, Any]:
+            return await asyncio.gather(
+                registry_instance.aget("connection"),
+                registry_instance.aget("connection"),
+                return_exceptions=True,
+            )
+
+        first, second = asyncio.run(resolve_twice())
+        assert isinstance(first, RuntimeError)
+        assert second is first
+        assert AsyncConnection.events.count("start FailingConnection") == 1
+        assert registry_instance._singleton_futures == {}
+
+    def test_cancelled_singleton_initialization_restarted(
+        self, async_registry: Registry
+    ) -> None:
+        async def resolve() -> tuple[Any, Any]:
+            first = asyncio.ensure_future(async_registry.aget("connection"))
+            await asyncio.sleep(0.001)
+            second = asyncio.ensure_future(async_registry.aget("connection"))
+            await asyncio.sleep(0.001)
+            first.cancel()
+            return await asyncio.gather(first, second, return_exceptions=True)
+
+        first, second = asyncio.run(resolve())
+        assert isinstance(first, asyncio.CancelledError)
+        assert second is async_registry.connection
+        assert AsyncConnection.events.count("start AsyncConnection") == 2
+
+    def test_aget_pooled_async(self, registry_instance: Registry) -> None:
+        registry_instance.register_interface(
+            "connection",
+            AsyncConnection,
+            implementation_details=ImplementationDetails(
+                AsyncConnection, lifetime=Lifetime.POOLED
+            ),
+        )
+        with pytest.raises(RegistryError, match="can only be used with lease()"):
+            asyncio.run(registry_instance.aget("connection"))
+
+    def test_lazy_async_rejected(self, async_registry: Registry) -> None:
+        class LazyService:
+            def __init__(self, connection: AsyncConnection) -> None:
+                self.connection = connection
+
+            async def __ainit__(self) -> None:
+                pass
+
+        async_registry.register_interface(
+            "service",
+            LazyService,
+            implementation_details=ImplementationDetails(
+                LazyService, lifetime=Lifetime.SINGLETON, lazy=True
+            ),
+        )
+        for resolve in (lambda: async_registry.aget("service"), async_registry.warm_up):
+            with pytest.raises(
+                RegistryError,
+                match="requires asynchronous initialization and cannot be lazy",
+            ):
+                asyncio.run(resolve())
+
+    def test_aget_transient(self, registry_instance: Registry) -> None:
+        registry_instance.register_interface(
+            "connection",
+            AsyncConnection,
+            implementation_details=ImplementationDetails(AsyncConnection),
+        )
+        first = asyncio.run(registry_instance.aget("connection"))
+        assert first.ready
+        assert asyncio.run(registry_instance.aget("connection")) is not first
+
+    def test_aget_scoped(self, registry_instance: Registry) -> None:
+        registry_instance.register_interface(
+            "connection",
+            AsyncConnection,
+            implementation_details=ImplementationDetails(
+                AsyncConnection, lifetime=Lifetime.SCOPED
+            ),
+        )
+        with registry_instance.scope():
+            connection = asyncio.run(registry_instance.aget("connection"))
+            assert registry_instance.connection is connection
+
+    def test_aget_unknown(self, registry_instance: Registry) -> None:
+        with pytest.raises(
+            RegistryError, match="The attribute foo could not be found."
+        ):
+            asyncio.run(registry_instance.aget("foo"))
+
+    def test_warm_up_concurrent(self, async_registry: Registry) -> None:
+        asyncio.run(async_registry.warm_up())
+        assert AsyncConnection.events[:2] == [
+            "start AsyncConnection",
+            "start OtherAsyncConnection",
+        ]
+        assert async_registry.client.connection is async_registry.connection
+
+    def test_aclose(self, async_registry: Registry) -> None:
+        asyncio.run(async_registry.warm_up())
+        client = async_registry.client
+        AsyncConnection.events = []
+        asyncio.run(async_registry.aclose())
+        assert AsyncConnection.events == [
+            "close AsyncClient",
+            "aclose OtherAsyncConnection",
+            "aclose AsyncConnection",
+        ]
+        assert async_registry._singletons == {}
+        assert asyncio.run(async_registry.aget("client")) is not client
+
+
+class TestValidation:
+    class Configured:
+        def __init__(
+            self, port: Annotated[int, SettingDetails("validation.port")]
+        ) -> None:
+            self.port = port
+
+    class BrokenAnnotation:
+        def __init__(self, value: "UndefinedType") -> None:  # type: ignore[name-defined]  # noqa: F821
+            pass
+
+    class Unresolvable:
+        def __init__(self, cache: "ChildCache") -> None:
+            self.cache = cache
+
+    def test_valid(self, simple_registry_instance: Registry, monkeypatch: Any) -> None:
+        simple_registry_instance.validate()
+        assert simple_registry_instance._singletons == {}
+
+    def test_all_errors_reported(
+        self, registry_instance: Registry, simple_interface: tuple[type, type]
+    ) -> None:
+        registry_instance.register_interface("missing", simple_interface[0])
+        for name, cls in [
+            ("configured", self.Configured),
+            ("broken", self.BrokenAnnotation),
+            ("unresolvable", self.Unresolvable),
+        ]:
+            registry_instance.register_interface(
+                name, cls, implementation_details=ImplementationDetails(cls)
+            )
+        with pytest.raises(RegistryValidationError) as exc_info:
+            registry_instance.validate()
+        assert [error.message for error in exc_info.value.errors] == [
+            "The interface missing has no implementation details.",
+            "No value for validation.port could be found.",
+            f"The constructor annotations of {self.BrokenAnnotation} could not be resolved: name 'UndefinedType' is not defined",
+            f"The dependency cache of unresolvable cannot be resolved, no interface is registered for {ChildCache}.",
+        ]
+        assert exc_info.value.message.startswith("The registry is invalid:\n- ")
+
+    def test_instantiate_singletons(
+        self, registry_instance: Registry, monkeypatch: Any
+    ) -> None:
+        monkeypatch.setenv("VALIDATION_PORT", "80")
+        for name, cls in [
+            ("configured", self.Configured),
+            ("connection", AsyncConnection),
+        ]:
+            registry_instance.register_interface(
+                name,
+                cls,
+                implementation_details=ImplementationDetails(
+                    cls, lifetime=Lifetime.SINGLETON
+                ),
+            )
+        registry_instance.register_interface(
+            "transient", object, implementation_details=ImplementationDetails(object)
+        )
+        registry_instance.validate(instantiate_singletons=True)
+        assert set(registry_instance._singletons) == {
+            "configured",
+            "settings_provider",
+        }
+        assert registry_instance._singletons["configured"].port == 80
+
+    def test_eager_declarative_registry(self, monkeypatch: Any) -> None:
+        class MyRegistry(Registry):
+            configured: Annotated[
+                TestValidation.Configured,
+                ImplementationDetails(
+                    TestValidation.Configured, lifetime=Lifetime.SINGLETON
+                ),
+            ]
+
+        with pytest.raises(
+            RegistryValidationError,
+            match="No value for validation.port could be found.",
+        ):
+            MyRegistry(eager=True)
+        monkeypatch.setenv("VALIDATION_PORT", "80")
+        registry = MyRegistry(eager=True)
+        assert "configured" in registry._singletons
+
+    def test_eager_unresolvable_dependency(self) -> None:
+        class MyRegistry(Registry):
+            unresolvable: Annotated[
+                TestValidation.Unresolvable,
+                ImplementationDetails(
+                    TestValidation.Unresolvable, lifetime=Lifetime.SINGLETON
+                ),
+            ]
+
+        with pytest.raises(RegistryValidationError) as exc_info:
+            MyRegistry(eager=True)
+        assert [error.message for error in exc_info.value.errors] == [
+            f"The dependency cache of unresolvable cannot be resolved, no interface is registered for {ChildCache}."
+        ]
+
+
+class TestRegistryDeclarative:
+    def test_definition(self) -> None:
+        class SimpleInterface:
+            pass
+
+        class SimpleImplementation(SimpleInterface):
+            pass
+
+        class MyRegistry(Registry):
+            my_interface: Annotated[
+                SimpleInterface, ImplementationDetails(SimpleImplementation)
+            ]
+
+        registry = MyRegistry()
+        assert isinstance(registry.my_interface, SimpleImplementation)
+
+    def test_arbitrary_cls_attributes(self) -> None:
+        class MyRegistry(Registry):
+            typed_default: int = 5
+            untyped_default = ""
+            typed: str
+            annotated: Annotated[int, "some metadata"] = 5
+
+        MyRegistry()
+
+    def test_wrong_implementation_cls(self) -> None:
+        class SimpleInterface:
+            pass
+
+        class OtherImpl: ...
+
+        class MyRegistry(Registry):
+            my_interface: Annotated[SimpleInterface, ImplementationDetails(OtherImpl)]
+
+        with pytest.raises(
+            RegistryError,
+            match=f"The implementation class {OtherImpl} must be a subclass of the interface class {SimpleInterface}.",
+        ):
+            MyRegistry()
+        with pytest.raises(RegistryError):
+            MyRegistry()
+
+    def test_class_analysed_once(self) -> None:
+        class MyRegistry(Registry):
+            cache: Annotated[ChildCache, ImplementationDetails(ChildCache)]
+
+        with mock.patch(
+            "pytheca.registry.get_type_hints", wraps=get_type_hints
+        ) as type_hints_mock:
+            first = MyRegistry()
+            second = MyRegistry()
+        assert type_hints_mock.call_count == 1
+        assert first._interfaces is not second._interfaces
+        assert isinstance(second.cache, ChildCache)
+
+    def test_subclass_analysed_separately(self) -> None:
+        class MyRegistry(Registry):
+            cache: Annotated[ChildCache, ImplementationDetails(ChildCache)]
+
+        class ExtendedRegistry(MyRegistry):
+            service: Annotated[ChildService, ImplementationDetails(ChildService)]
+
+        MyRegistry()
+        assert isinstance(ExtendedRegistry().service.cache, ChildCache)
+        with pytest.raises(RegistryError, match="The attribute service"):
+            MyRegistry().service
+
+    def test_instances_independent(self) -> None:
+        class MyRegistry(Registry):
+            cache: Annotated[ChildCache, ImplementationDetails(ChildCache)]
+
+        first = MyRegistry()
+        first.register_interface(
+            "cache",
+            ChildCache,
+            implementation_details=ImplementationDetails(OtherChildCache),
+        )
+        assert type(first.cache) is OtherChildCache
+        assert type(MyRegistry().cache) is ChildCache
+
+    def test_injection_plans_shared(self) -> None:
+        class MyRegistry(Registry):
+            cache: Annotated[ChildCache, ImplementationDetails(ChildCache)]
+            service: Annotated[ChildService, ImplementationDetails(ChildService)]
+
+        MyRegistry().validate()
+        assert MyRegistry()._interfaces["service"].injection_plan == _InjectionPlan(
+            (), (_DependencyInjection("cache", ChildCache),), ChildService
+        )
+
+
+class ChildCache:
+    pass
+
+
+class OtherChildCache(ChildCache):
+    pass
+
+
+class ChildService:
+    def __init__(self, cache: ChildCache) -> None:
+        self.cache = cache
+
+
+class ChildSettingsService:
+    def __init__(self, name: Annotated[str, SettingDetails("child.name", "parent")]):
+        self.name = name
+
+
+class TestChildRegistry:
+    @pytest.fixture
+    def parent(self, registry_instance: Registry) -> Registry:
+        for name, interface_cls, implementation_cls in [
+            ("cache", ChildCache, ChildCache),
+            ("service", ChildService, ChildService),
+            ("named", ChildSettingsService, ChildSettingsService),
+        ]:
+            registry_instance.register_interface(
+                name,
+                interface_cls,
+                implementation_details=ImplementationDetails(
+                    implementation_cls, lifetime=Lifetime.SINGLETON
+                ),
+            )
+        return registry_instance
+
+    def test_bindings_inherited_without_copy(self, parent: Registry) -> None:
+        child = parent.child()
+        assert type(child) is type(parent)
+        assert child._own_interfaces == {}
+        assert isinstance(child.service, ChildService)
+
+    def test_singletons_shared(self, parent: Registry) -> None:
+        child = parent.child()
+        assert child.service is parent.service
+        assert child.named is parent.named
+        assert child.settings_provider is parent.settings_provider
+
+    def test_injection_plans_shared(self, parent: Registry) -> None:
+        child = parent.child()
+        child.cache = ImplementationDetails(OtherChildCache)
+        assert isinstance(child.service.cache, OtherChildCache)
+        assert "service" not in child._own_interfaces
+        assert parent._interfaces["service"].injection_plan is not None
+
+    def test_override(self, parent: Registry) -> None:
+        child = parent.child()
+        child.cache = ImplementationDetails(
+            OtherChildCache, lifetime=Lifetime.SINGLETON
+        )
+        assert isinstance(child.cache, OtherChildCache)
+        assert type(parent.cache) is ChildCache
+
+    def test_override_with_shared_dependency(self, parent: Registry) -> None:
+        child = parent.child()
+        child.service = ImplementationDetails(ChildService)
+        child.named = ImplementationDetails(ChildSettingsService)
+        assert child.service.cache is parent.cache
+        assert child.named.name == "parent"
+        assert child.named is not parent.named
+
+    def test_dependent_singleton_rebuilt(self, parent: Registry) -> None:
+        parent_service = parent.service
+        child = parent.child()
+        child.cache = ImplementationDetails(
+            OtherChildCache, lifetime=Lifetime.SINGLETON
+        )
+        assert child.service is not parent_service
+        assert child.service is child.service
+        assert child.service.cache is child.cache
+        assert parent.service is parent_service
+
+    def test_new_dependency_candidate(self, registry_instance: Registry) -> None:
+        registry_instance.register_interface(
+            "service",
+            ChildService,
+            implementation_details=ImplementationDetails(ChildService),
+        )
+        with pytest.raises(RegistryError, match="cannot be resolved"):
+            registry_instance.service
+        child = registry_instance.child()
+        child.register_interface(
+            "cache",
+            ChildCache,
+            implementation_details=ImplementationDetails(ChildCache),
+        )
+        assert isinstance(child.service.cache, ChildCache)
+
+    def test_settings_provider_override(
+        self, parent: Registry, monkeypatch: Any
+    ) -> None:
+        assert parent.named.name == "parent"
+        child = parent.child()
+        monkeypatch.setenv("CHILD_NAME", "child")
+        child.set_settings_provider(EnvSettingsProvider())
+        assert child.named.name == "child"
+        assert parent.named.name == "parent"
+        assert child.service is parent.service
+
+    def test_parent_rebinding_visible(self, parent: Registry) -> None:
+        child = parent.child()
+        child.cache = ImplementationDetails(OtherChildCache)
+        assert type(child.service.cache) is OtherChildCache
+        grandchild = child.child()
+        assert type(grandchild.service.cache) is OtherChildCache
+        named = grandchild.named
+        parent.service = ImplementationDetails(ChildService)
+        parent.named = ImplementationDetails(
+            ChildSettingsService, lifetime=Lifetime.SINGLETON
+        )
+        assert child.service is not child.service
+        assert grandchild.service is not grandchild.service
+        assert grandchild.named is not named
+        assert grandchild.named is grandchild.named
+
+    def test_override_unaffected_by_parent_rebinding(self, parent: Registry) -> None:
+        child = parent.child()
+        child.cache = ImplementationDetails(
+            OtherChildCache, lifetime=Lifetime.SINGLETON
+        )
+        cache = child.cache
+        parent.cache = ImplementationDetails(ChildCache, lifetime=Lifetime.SINGLETON)
+        assert child.cache is cache
+
+    def test_grandchild(self, parent: Registry) -> None:
+        child = parent.child()
+        child.cache = ImplementationDetails(
+            OtherChildCache, lifetime=Lifetime.SINGLETON
+        )
+        grandchild = child.child()
+        assert grandchild.cache is child.cache
+        assert grandchild.service is child.service
+        assert grandchild.named is parent.named
+
+    def test_scoped_not_delegated(self, registry_instance: Registry) -> None:
+        registry_instance.register_interface(
+            "cache",
+            ChildCache,
+            implementation_details=ImplementationDetails(
+                ChildCache, lifetime=Lifetime.SCOPED
+            ),
+        )
+        registry_instance.register_interface(
+            "service",
+            ChildService,
+            implementation_details=ImplementationDetails(ChildService),
+        )
+        child = registry_instance.child()
+        with child.scope():
+            assert child.service.cache is child.cache
+
+    def test_broken_parent_graph(self, registry_instance: Registry) -> None:
+        for name, cls in [("first", CycleFirst), ("second", CycleSecond)]:
+            registry_instance.register_interface(
+                name, cls, implementation_details=ImplementationDetails(cls)
+            )
+
+        class AcyclicSecond(CycleSecond):
+            def __init__(self) -> None: ...
+
+        child = registry_instance.child()
+        child.second = ImplementationDetails(AcyclicSecond)
+        assert isinstance(child.first, CycleFirst)
+
+    def test_aget_delegated(self, parent: Registry) -> None:
+        child = parent.child()
+        assert asyncio.run(child.aget("service")) is parent.service
+
+
+class Handler:
+    pass
+
+
+class JsonHandler(Handler):
+    pass
+
+
+class XmlHandler(Handler):
+    pass
+
+
+class HandlerUser:
+    def __init__(self, handler: Handler) -> None:
+        self.handler = handler
+
+
+class TestMultiBinding:
+    @pytest.fixture
+    def handler_registry(self, registry_instance: Registry) -> Registry:
+        registry_instance.register_interface(
+            "handler", Handler, implementation_details=ImplementationDetails(Handler)
+        )
+        registry_instance.add_implementation(
+            "handler", ImplementationDetails(JsonHandler), key="json"
+        )
+        registry_instance.add_implementation(
+            "handler",
+            ImplementationDetails(XmlHandler, lifetime=Lifetime.SINGLETON),
+            key="xml",
+        )
+        registry_instance.add_implementation("handler", ImplementationDetails(Handler))
+        return registry_instance
+
+    def test_get_all(self, handler_registry: Registry) -> None:
+        assert [type(handler) for handler in handler_registry.get_all("handler")] == [
+            Handler,
+            JsonHandler,
+            XmlHandler,
+            Handler,
+        ]
+
+    def test_get_all_without_registered_implementation(
+        self, registry_instance: Registry
+    ) -> None:
+        registry_instance.register_interface("handler", Handler)
+        assert registry_instance.get_all("handler") == []
+        registry_instance.add_implementation(
+            "handler", ImplementationDetails(JsonHandler)
+        )
+        assert [type(h) for h in registry_instance.get_all("handler")] == [JsonHandler]
+
+    def test_get(self, handler_registry: Registry) -> None:
+        assert type(handler_registry.get("handler")) is Handler
+        assert type(handler_registry.get("handler", "json")) is JsonHandler
+        assert handler_registry.get("handler", key="xml") is handler_registry.get(
+            "handler", key="xml"
+        )
+
+    def test_get_unknown_key(self, handler_registry: Registry) -> None:
+        with pytest.raises(
+            RegistryError,
+            match="The interface handler has no implementation for the key 'yaml'.",
+        ):
+            handler_registry.get("handler", "yaml")
+
+    def test_unknown_interface(self, registry_instance: Registry) -> None:
+        with pytest.raises(
+            RegistryError, match="The attribute foo could not be found."
+        ):
+            registry_instance.get("foo")
+        with pytest.raises(
+            RegistryError, match="The attribute foo could not be found."
+        ):
+            registry_instance.get_all("foo")
+        with pytest.raises(
+            RegistryError, match="The attribute foo could not be found."
+        ):
+            registry_instance.add_implementation("foo", ImplementationDetails(Handler))
+
+    def test_add_to_added_implementation(self, handler_registry: Registry) -> None:
+        with pytest.raises(RegistryError, match="could not be found."):
+            handler_registry.add_implementation(
+                "handler['json']", ImplementationDetails(Handler)
+            )
+
+    def test_wrong_implementation_cls(self, handler_registry: Registry) -> None:
+        with pytest.raises(RegistryError, match="must be a subclass"):
+            handler_registry.add_implementation(
+                "handler", ImplementationDetails(HandlerUser)
+            )
+
+    def test_replace_keyed_implementation(self, handler_registry: Registry) -> None:
+        xml_handler = handler_registry.get("handler", "xml")
+        handler_registry.add_implementation(
+            "handler", ImplementationDetails(JsonHandler), key="xml"
+        )
+        assert type(handler_registry.get("handler", "xml")) is JsonHandler
+        assert xml_handler not in handler_registry.get_all("handler")
+        assert len(handler_registry.get_all("handler")) == 4
+
+    def test_not_dependency_candidates(self, handler_registry: Registry) -> None:
+        handler_registry.register_interface(
+            "user",
+            HandlerUser,
+            implementation_details=ImplementationDetails(HandlerUser),
+        )
+        assert type(handler_registry.user.handler) is Handler
+
+    def test_get_names(self, handler_registry: Registry) -> None:
+        handler_registry.register_interface("other_handler", Handler)
+        assert handler_registry.get_names(Handler) == ("handler", "other_handler")
+        assert handler_registry.get_names(SettingsProvider) == ("settings_provider",)
+        assert handler_registry.get_names(HandlerUser) == ()
+
+    def test_observed(self, handler_registry: Registry) -> None:
+        collector = StatisticsCollector()
+        handler_registry.add_observer(collector)
+        handler_registry.get_all("handler")
+        handler_registry.get("handler", "json")
+        statistics = collector.as_dict()
+        assert statistics["handler"]["resolutions"] == 1
+        assert statistics["handler['json']"]["resolutions"] == 2
+
+    def test_frozen(self, handler_registry: Registry) -> None:
+        frozen_registry = handler_registry.freeze()
+        assert frozen_registry.get("handler") is not frozen_registry.get("handler")
+        assert type(frozen_registry.get("handler", "json")) is JsonHandler
+        assert len(frozen_registry.get_all("handler")) == 4
+        assert frozen_registry.get_names(Handler) == ("handler",)
+        assert "handler['json']" not in vars(type(frozen_registry))
+        with pytest.raises(RegistryError, match="frozen"):
+            frozen_registry.add_implementation(
+                "handler", ImplementationDetails(Handler)
+            )
+        with pytest.raises(RegistryError, match="frozen"):
+            handler_registry.add_implementation(
+                "handler", ImplementationDetails(Handler)
+            )
+
+    def test_child(self, handler_registry: Registry) -> None:
+        child = handler_registry.child()
+        child.add_implementation("handler", ImplementationDetails(Handler), key="yaml")
+        assert child.get("handler", "xml") is handler_registry.get("handler", "xml")
+        assert type(child.get("handler", "yaml")) is Handler
+        assert len(child.get_all("handler")) == 5
+        assert len(handler_registry.get_all("handler")) == 4
+
+
+class FactoryService:
+    def __init__(self, label: str, cache: ChildCache | None = None) -> None:
+        self.label = label
+        self.cache = cache
+
+    @classmethod
+    def create(cls, prefix: str) -> "FactoryService":
+        return cls(f"{prefix}-classmethod")
+
+
+class TestFactoryBindings:
+    def test_factory_with_parameters(
+        self, registry_instance: Registry, monkeypatch: Any
+    ) -> None:
+        def create_service(label: str, cache: ChildCache) -> FactoryService:
+            return FactoryService(label.upper(), cache)
+
+        registry_instance.register_interface(
+            "cache",
+            ChildCache,
+            implementation_details=ImplementationDetails(ChildCache),
+        )
+        registry_instance.register_interface(
+            "service",
+            FactoryService,
+            implementation_details=ImplementationDetails(
+                FactoryService,
+                factory=create_service,
+                parameters={
+                    "label": Annotated[str, SettingDetails("service.label")],
+                    "cache": ChildCache,
+                },
+            ),
+        )
+        monkeypatch.setenv("SERVICE_LABEL", "fast")
+        with mock.patch(
+            "pytheca.registry.get_type_hints", wraps=get_type_hints
+        ) as type_hints_mock:
+            service = registry_instance.service
+        analysed = [call.args[0] for call in type_hints_mock.call_args_list]
+        assert create_service not in analysed
+        assert FactoryService.__init__ not in analysed
+        assert service.label == "FAST"
+        assert isinstance(service.cache, ChildCache)
+
+    def test_classmethod_factory(self, registry_instance: Registry) -> None:
+        registry_instance.register_interface(
+            "service",
+            FactoryService,
+            implementation_details=ImplementationDetails(
+                FactoryService,
+                factory=FactoryService.create,
+                parameters={"prefix": Annotated[str, SettingDetails("prefix", "x")]},
+            ),
+        )
+        assert registry_instance.service.label == "x-classmethod"
+
+    def test_factory_without_parameters(self, registry_instance: Registry) -> None:
+        registry_instance.register_interface(
+            "cache",
+            ChildCache,
+            implementation_details=ImplementationDetails(ChildCache),
+        )
+        registry_instance.register_interface(
+            "service",
+            FactoryService,
+            implementation_details=ImplementationDetails(
+                FactoryService,
+                lifetime=Lifetime.SINGLETON,
+                factory=lambda: FactoryService("plain"),
+            ),
+        )
+        assert registry_instance.service.cache is None
+        assert registry_instance.service is registry_instance.service
+
+    @pytest.mark.filterwarnings("error::RuntimeWarning")
+    def test_async_factory(self, registry_instance: Registry) -> None:
+        async def create_service(cache: ChildCache) -> FactoryService:
+            await asyncio.sleep(0)
+            return FactoryService("async", cache)
+
+        registry_instance.register_interface(
+            "cache",
+            ChildCache,
+            implementation_details=ImplementationDetails(ChildCache),
+        )
+        registry_instance.register_interface(
+            "service",
+            FactoryService,
+            implementation_details=ImplementationDetails(
+                FactoryService,
+                lifetime=Lifetime.SINGLETON,
+                factory=create_service,
+                parameters={"cache": ChildCache},
+            ),
+        )
+        with pytest.raises(
+            RegistryError,
+            match=r"The interface service requires asynchronous initialization, use aget\(\) or warm_up\(\).",
+        ):
+            registry_instance.service
+        service = asyncio.run(registry_instance.aget("service"))
+        assert service.label == "async"
+        assert isinstance(service.cache, ChildCache)
+        assert registry_instance.service is service
+
+    def test_async_factory_with_async_init(self, registry_instance: Registry) -> None:
+        async def create_connection() -> AsyncConnection:
+            await asyncio.sleep(0)
+            return AsyncConnection()
+
+        registry_instance.register_interface(
+            "connection",
+            AsyncConnection,
+            implementation_details=ImplementationDetails(
+                AsyncConnection,
+                lifetime=Lifetime.SINGLETON,
+                factory=create_connection,
+            ),
+        )
+        asyncio.run(registry_instance.warm_up())
+        assert registry_instance.connection.ready
+
+    def test_factory_validated(self, registry_instance: Registry) -> None:
+        registry_instance.register_interface(
+            "service",
+            FactoryService,
+            implementation_details=ImplementationDetails(
+                FactoryService,
+                factory=FactoryService.create,
+                parameters={"prefix": Annotated[str, SettingDetails("missing.prefix")]},
+            ),
+        )
+        with pytest.raises(
+            RegistryValidationError, match="No value for missing.prefix could be found."
+        ):
+            registry_instance.validate()
+
+
+class Resource:
+    events: list[str] = []
+
+    def close(self) -> None:
+        Resource.events.append(f"close {type(self).__name__}")
+
+
+class Pool(Resource):
+    def __init__(self, resource: Resource) -> None:
+        self.resource = resource
+
+
+class OtherResource(Resource):
+    pass
+
+
+class ContextResource:
+    def __enter__(self) -> "ContextResource":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        Resource.events.append("exit ContextResource")
+
+
+class AsyncContextResource:
+    async def __aenter__(self) -> "AsyncContextResource":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        Resource.events.append("aexit AsyncContextResource")
+
+
+class AsyncResource:
+    async def aclose(self) -> None:
+        Resource.events.append("aclose AsyncResource")
+
+
+class FailingResource(Resource):
+    def close(self) -> None:
+        raise OSError("close failed")
+
+
+class TestDisposal:
+    @pytest.fixture(autouse=True)
+    def clear_events(self) -> None:
+        Resource.events = []
+
+    @staticmethod
+    def register(
+        registry: Registry,
+        name: str,
+        cls: type,
+        lifetime: Lifetime = Lifetime.SINGLETON,
+        lazy: bool = False,
+    ) -> None:
+        registry.register_interface(
+            name,
+            cls,
+            implementation_details=ImplementationDetails(
+                cls, lifetime=lifetime, lazy=lazy
+            ),
+        )
+
+    def test_close_in_reverse_dependency_order(
+        self, registry_instance: Registry
+    ) -> None:
+        self.register(registry_instance, "resource", Resource)
+        self.register(registry_instance, "pool", Pool)
+        self.register(registry_instance, "context", ContextResource)
+        self.register(registry_instance, "plain", CycleFirst, Lifetime.TRANSIENT)
+        pool = registry_instance.pool
+        registry_instance.context
+        with registry_instance as registry:
+            assert registry is registry_instance
+        assert Resource.events == [
+            "exit ContextResource",
+            "close Pool",
+            "close Resource",
+        ]
+        assert registry_instance._singletons == {}
+        assert registry_instance.pool is not pool
+
+    def test_close_continues_after_failure(self, registry_instance: Registry) -> None:
+        self.register(registry_instance, "resource", Resource)
+        self.register(registry_instance, "failing", FailingResource)
+        registry_instance.resource
+        registry_instance.failing
+        with pytest.raises(OSError, match="close failed"):
+            registry_instance.close()
+        assert Resource.events == ["close Resource"]
+        assert registry_instance._singletons == {}
+
+    def test_close_rejects_async_only_instances(
+        self, registry_instance: Registry
+    ) -> None:
+        self.register(registry_instance, "resource", Resource)
+        self.register(registry_instance, "connection", AsyncResource)
+        self.register(registry_instance, "context", AsyncContextResource)
+        registry_instance.resource
+        registry_instance.connection
+        registry_instance.context
+        with pytest.raises(
+            RegistryError,
+            match=r"The instances of connection, context can only be closed asynchronously, use aclose\(\).",
+        ):
+            registry_instance.close()
+        assert Resource.events == ["close Resource"]
+        asyncio.run(registry_instance.aclose())
+        assert Resource.events == [
+            "close Resource",
+            "aexit AsyncContextResource",
+            "aclose AsyncResource",
+        ]
+
+    def test_async_context_manager(self, registry_instance: Registry) -> None:
+        self.register(registry_instance, "resource", Resource)
+        self.register(registry_instance, "connection", AsyncResource)
+
+        async def use_registry() -> None:
+            async with registry_instance as registry:
+                assert registry is registry_instance
+                registry.resource
+                registry.connection
+
+        asyncio.run(use_registry())
+        assert Resource.events == ["aclose AsyncResource", "close Resource"]
+
+    def test_rebinding_disposes_replaced_singleton(
+        self, registry_instance: Registry
+    ) -> None:
+        self.register(registry_instance, "resource", Resource)
+        registry_instance.resource
+        registry_instance.resource = ImplementationDetails(
+            OtherResource, lifetime=Lifetime.SINGLETON
+        )
+        assert Resource.events == ["close Resource"]
+        registry_instance.resource
+        registry_instance.close()
+        assert Resource.events == ["close Resource", "close OtherResource"]
+
+    def test_rebinding_replaces_dependents(self, registry_instance: Registry) -> None:
+        self.register(registry_instance, "resource", Resource)
+        self.register(registry_instance, "pool", Pool)
+        self.register(registry_instance, "context", ContextResource)
+        pool = registry_instance.pool
+        context = registry_instance.context
+        registry_instance.resource = ImplementationDetails(
+            OtherResource, lifetime=Lifetime.SINGLETON
+        )
+        assert Resource.events == ["close Pool", "close Resource"]
+        assert registry_instance.pool is not pool
+        assert type(registry_instance.pool.resource) is OtherResource
+        assert registry_instance.context is context
+
+    def test_rebinding_replaces_dependents_of_earlier_graphs(
+        self, registry_instance: Registry
+    ) -> None:
+        self.register(registry_instance, "resource", Resource)
+        self.register(registry_instance, "pool", Pool)
+        pool = registry_instance.pool
+        # Rebinding an unrelated interface discards the compiled graphs, not the cached instances.
+        self.register(registry_instance, "context", ContextResource)
+        registry_instance.resource = ImplementationDetails(
+            OtherResource, lifetime=Lifetime.SINGLETON
+        )
+        assert Resource.events == ["close Pool", "close Resource"]
+        assert registry_instance.pool is not pool
+
+    def test_rebinding_replaces_dependents_with_broken_graph(
+        self, registry_instance: Registry
+    ) -> None:
+        self.register(registry_instance, "resource", Resource)
+        self.register(registry_instance, "pool", Pool)
+        registry_instance.pool
+        self.register(registry_instance, "other", Resource)
+        assert Resource.events == ["close Pool"]
+        with pytest.raises(RegistryError, match="is ambiguous"):
+            registry_instance.pool
+
+    def test_rebinding_keeps_async_only_instances(
+        self, registry_instance: Registry
+    ) -> None:
+        self.register(registry_instance, "connection", AsyncResource)
+        registry_instance.connection
+        registry_instance.connection = ImplementationDetails(AsyncResource)
+        assert Resource.events == []
+        asyncio.run(registry_instance.aclose())
+        assert Resource.events == ["aclose AsyncResource"]
+
+    def test_rebinding_drains_users(self, registry_instance: Registry) -> None:
+        self.register(registry_instance, "resource", Resource)
+        with registry_instance.use("resource") as resource:
+            with registry_instance.use("resource") as same_resource:
+                assert same_resource is resource
+                registry_instance.resource = ImplementationDetails(
+                    OtherResource, lifetime=Lifetime.SINGLETON
+                )
+                assert type(registry_instance.resource) is OtherResource
+            assert Resource.events == []
+        assert Resource.events == ["close Resource"]
+
+    def test_use_retries_after_concurrent_rebinding(
+        self, registry_instance: Registry
+    ) -> None:
+        self.register(registry_instance, "resource", Resource)
+        get = Registry.get
+
+        def get_and_rebind(registry: Registry, name: str) -> Any:
+            instance = get(registry, name)
+            if type(instance) is Resource:
+                registry.resource = ImplementationDetails(
+                    OtherResource, lifetime=Lifetime.SINGLETON
+                )
+            return instance
+
+        with mock.patch.object(
+            Registry, "get", autospec=True, side_effect=get_and_rebind
+        ):
+            with registry_instance.use("resource") as resource:
+                assert type(resource) is OtherResource
+                assert Resource.events == ["close Resource"]
+
+    def test_child_users_drained(self, registry_instance: Registry) -> None:
+        self.register(registry_instance, "resource", Resource)
+        child = registry_instance.child()
+        with child.use("resource") as resource:
+            assert resource is registry_instance.resource
+            registry_instance.resource = ImplementationDetails(
+                OtherResource, lifetime=Lifetime.SINGLETON
+            )
+            assert Resource.events == []
+        assert Resource.events == ["close Resource"]
+
+    def test_scope_disposes_scoped_instances(self, registry_instance: Registry) -> None:
+        self.register(registry_instance, "resource", Resource, Lifetime.SCOPED)
+        self.register(registry_instance, "connection", AsyncResource, Lifetime.SCOPED)
+        with registry_instance.scope():
+            registry_instance.resource
+            registry_instance.connection
+            assert Resource.events == []
+        assert Resource.events == ["close Resource"]
+        asyncio.run(registry_instance.aclose())
+        assert Resource.events == ["close Resource", "aclose AsyncResource"]
+
+    def test_lazy_instances_disposed_only_if_created(
+        self, registry_instance: Registry
+    ) -> None:
+        self.register(registry_instance, "resource", Resource, lazy=True)
+        self.register(registry_instance, "other", OtherResource, lazy=True)
+        registry_instance.resource.close
+        registry_instance.other
+        registry_instance.close()
+        assert Resource.events == ["close Resource"]
+
+    def test_registry_close_clears_frozen_registry(
+        self, registry_instance: Registry
+    ) -> None:
+        self.register(registry_instance, "resource", Resource)
+        frozen_registry = registry_instance.freeze()
+        resource = frozen_registry.resource
+        registry_instance.close()
+        assert frozen_registry.resource is not resource
+        asyncio.run(registry_instance.aclose())
+        assert frozen_registry.resource is registry_instance.resource
+
+    def test_frozen_registry(self, registry_instance: Registry) -> None:
+        self.register(registry_instance, "resource", Resource)
+        self.register(registry_instance, "connection", AsyncResource)
+        with registry_instance.freeze() as frozen_registry:
+            resource = frozen_registry.resource
+        assert Resource.events == ["close Resource"]
+        assert frozen_registry.resource is not resource
+
+        async def use_frozen_registry() -> None:
+            async with frozen_registry as registry:
+                registry.connection
+
+        asyncio.run(use_frozen_registry())
+        assert Resource.events == [
+            "close Resource",
+            "aclose AsyncResource",
+            "close Resource",
+        ]
+
+
+class LazyPrinter:
+    pass
+
+
+class TestImportPaths:
+    MODULE = "pytheca_lazy_printers"
+
+    @pytest.fixture(autouse=True)
+    def printers_module(
+        self, tmp_path: Any, monkeypatch: pytest.MonkeyPatch
+    ) -> Iterator[None]:
+        (tmp_path / f"{self.MODULE}.py").write_text(
+            f"from {__name__} import LazyPrinter\n"
+            "class UpperPrinter(LazyPrinter):\n"
+            "    class Nested(LazyPrinter):\n"
+            "        pass\n"
+            "not_a_class = 5\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+        yield
+        sys.modules.pop(self.MODULE, None)
+
+    def test_imported_on_first_resolution(self) -> None:
+        class MyRegistry(Registry):
+            printer: Annotated[
+                LazyPrinter, ImplementationDetails(f"{self.MODULE}.UpperPrinter")
+            ]
+
+        registry = MyRegistry()
+        assert self.MODULE not in sys.modules
+        printer = registry.printer
+        assert type(printer).__qualname__ == "UpperPrinter"
+        injection_plan = registry._interfaces["printer"].injection_plan
+        assert injection_plan.constructor is type(printer)
+
+    def test_colon_path(self, registry_instance: Registry) -> None:
+        registry_instance.register_interface(
+            "printer",
+            LazyPrinter,
+            implementation_details=ImplementationDetails(
+                f"{self.MODULE}:UpperPrinter.Nested", lifetime=Lifetime.SINGLETON
+            ),
+        )
+        assert type(registry_instance.printer).__qualname__ == "UpperPrinter.Nested"
+
+    @pytest.mark.parametrize(
+        "path,message",
+        [
+            ("pytheca_missing_module.Printer", "could not be imported"),
+            (f"{MODULE}.MissingPrinter", "could not be imported"),
+            ("Printer", "could not be imported"),
+            (f"{MODULE}.not_a_class", "is not a class"),
+        ],
+    )
+    def test_invalid_path(
+        self, registry_instance: Registry, path: str, message: str
+    ) -> None:
+        registry_instance.register_interface(
+            "printer", LazyPrinter, implementation_details=ImplementationDetails(path)
+        )
+        with pytest.raises(RegistryError, match=message):
+            registry_instance.printer
+
+    def test_interface_checked_on_import(self, registry_instance: Registry) -> None:
+        registry_instance.register_interface(
+            "printer",
+            ChildCache,
+            implementation_details=ImplementationDetails(f"{self.MODULE}.UpperPrinter"),
+        )
+        with pytest.raises(RegistryError, match="must be a subclass"):
+            registry_instance.printer
+
+    def test_preload(self, registry_instance: Registry) -> None:
+        registry_instance.register_interface(
+            "printer",
+            LazyPrinter,
+            implementation_details=ImplementationDetails(f"{self.MODULE}.UpperPrinter"),
+        )
+        registry_instance.register_interface("unbound", LazyPrinter)
+        assert registry_instance.preload(["printer", "unbound"]) is None
+        assert self.MODULE in sys.modules
+        assert registry_instance._interfaces["printer"].injection_plan is not None
+        with pytest.raises(
+            RegistryError, match="The attribute foo could not be found."
+        ):
+            registry_instance.preload(["foo"])
+
+    def test_preload_in_background(self, registry_instance: Registry) -> None:
+        registry_instance.register_interface(
+            "broken",
+            LazyPrinter,
+            implementation_details=ImplementationDetails("pytheca_missing.Printer"),
+        )
+        registry_instance.register_interface(
+            "printer",
+            LazyPrinter,
+            implementation_details=ImplementationDetails(f"{self.MODULE}.UpperPrinter"),
+        )
+        thread = registry_instance.preload(background=True)
+        assert thread is not None
+        thread.join()
+        assert self.MODULE in sys.modules
+        assert registry_instance._interfaces["printer"].injection_plan is not None
+        with pytest.raises(RegistryError, match="could not be imported"):
+            registry_instance.broken
+
+
+class SnapshotService:
+    def __init__(
+        self,
+        cache: ChildCache,
+        ports: Annotated[list[int], SettingDetails("snapshot.ports", [80])],
+        name: Annotated[str, SettingDetails("snapshot.name")],
+    ) -> None:
+        self.cache = cache
+        self.ports = ports
+        self.name = name
+
+
+class SnapshotNames:
+    def __init__(
+        self, names: Annotated[list[str], SettingDetails("snapshot.ports")]
+    ) -> None:
+        self.names = names
+
+
+class SnapshotRegistry(Registry):
+    cache: Annotated[
+        ChildCache, ImplementationDetails(ChildCache, lifetime=Lifetime.SINGLETON)
+    ]
+    service: Annotated[SnapshotService, ImplementationDetails(SnapshotService)]
+
+
+class TestSnapshot:
+    @pytest.fixture
+    def registry(self, monkeypatch: pytest.MonkeyPatch) -> SnapshotRegistry:
+        monkeypatch.setenv("SNAPSHOT_PORTS", "1,2")
+        monkeypatch.setenv("SNAPSHOT_NAME", "parent")
+        return SnapshotRegistry()
+
+    def test_restore(
+        self, registry: SnapshotRegistry, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        registry.add_implementation(
+            "cache", ImplementationDetails(OtherChildCache), key="other"
+        )
+        registry.cache
+        snapshot = pickle.loads(pickle.dumps(registry.snapshot()))
+        monkeypatch.setenv("SNAPSHOT_PORTS", "3")
+        with mock.patch(
+            "pytheca.registry.get_type_hints", wraps=get_type_hints
+        ) as type_hints_mock:
+            restored = Registry.from_snapshot(snapshot)
+            service = restored.service
+        type_hints_mock.assert_not_called()
+        assert type(restored) is SnapshotRegistry
+        assert service.ports == [1, 2]
+        assert service.name == "parent"
+        assert service.cache is restored.cache
+        assert service.cache is not registry.cache
+        assert type(restored.get("cache", "other")) is OtherChildCache
+        assert isinstance(restored.settings_provider, StaticSettingsProvider)
+
+    def test_without_settings(
+        self, registry: SnapshotRegistry, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        snapshot = registry.snapshot(include_settings=False)
+        assert snapshot.settings is None
+        monkeypatch.setenv("SNAPSHOT_PORTS", "3")
+        restored = SnapshotRegistry.from_snapshot(snapshot)
+        assert restored.service.ports == [3]
+        assert type(restored.settings_provider) is EnvSettingsProvider
+
+    def test_missing_settings_left_out(
+        self, registry: SnapshotRegistry, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.delenv("SNAPSHOT_PORTS")
+        monkeypatch.delenv("SNAPSHOT_NAME")
+        snapshot = registry.snapshot()
+        assert snapshot.settings == {("snapshot.ports", list[int]): [80]}
+        with pytest.raises(
+            SettingError, match="No value for snapshot.name could be found."
+        ):
+            Registry.from_snapshot(snapshot).service
+
+    def test_setting_injected_with_different_types(
+        self, registry: SnapshotRegistry, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        registry.register_interface(
+            "names",
+            SnapshotNames,
+            implementation_details=ImplementationDetails(SnapshotNames),
+        )
+        snapshot = pickle.loads(pickle.dumps(registry.snapshot()))
+        monkeypatch.setenv("SNAPSHOT_PORTS", "3")
+        restored = Registry.from_snapshot(snapshot)
+        assert restored.service.ports == [1, 2]
+        assert restored.names.names == ["1", "2"]
+
+    def test_child_flattened(self, registry: SnapshotRegistry) -> None:
+        child = registry.child()
+        child.register_interface(
+            "cache",
+            ChildCache,
+            implementation_details=ImplementationDetails(OtherChildCache),
+        )
+        restored = Registry.from_snapshot(child.snapshot())
+        assert restored._parent is None
+        assert type(restored.service.cache) is OtherChildCache
+
+    def test_unbound_interface(self, registry_instance: Registry) -> None:
+        registry_instance.register_interface("cache", ChildCache)
+        restored = Registry.from_snapshot(registry_instance.snapshot())
+        with pytest.raises(
+            RegistryError, match="The interface cache has no implementation details."
+        ):
+            restored.cache
+
+    def test_registry_class_checked(self, registry_instance: Registry) -> None:
+        with pytest.raises(RegistryError, match="cannot be restored as"):
+            SnapshotRegistry.from_snapshot(registry_instance.snapshot())
+
+
+class TestForkSafety:
+    def test_reset_after_fork(self, registry_instance: Registry) -> None:
+        registry_instance.register_interface(
+            "cache",
+            ChildCache,
+            implementation_details=ImplementationDetails(
+                ChildCache, lifetime=Lifetime.SINGLETON
+            ),
+        )
+        registry_instance.register_interface(
+            "pooled",
+            ChildCache,
+            implementation_details=ImplementationDetails(
+                OtherChildCache, lifetime=Lifetime.POOLED
+            ),
+        )
+        child = registry_instance.child()
+        child.cache = ImplementationDetails(
+            OtherChildCache, lifetime=Lifetime.SINGLETON
+        )
+        cache = registry_instance.cache
+        child_cache = child.cache
+        settings_provider = registry_instance.settings_provider
+        frozen_registry = registry_instance.freeze()
+        assert frozen_registry.cache is cache
+        with registry_instance.lease("pooled") as pooled:
+            pass
+        lock = registry_instance._lock
+        registry_instance.reset_after_fork()
+        assert registry_instance._lock is not lock
+        assert registry_instance.cache is not cache
+        assert frozen_registry.cache is registry_instance.cache
+        assert child.cache is not child_cache
+        assert registry_instance.settings_provider is settings_provider
+        with registry_instance.lease("pooled") as new_pooled:
+            assert new_pooled is not pooled
+
+    def test_fork_safe(self) -> None:
+        registries = [
+            SnapshotRegistry(fork_safe=True),
+            Registry.from_snapshot(Registry().snapshot(), fork_safe=True),
+        ]
+        assert set(registries) <= set(_fork_safe_registries)
+        assert SnapshotRegistry() not in _fork_safe_registries
+        cache = registries[0].cache
+        _reset_fork_safe_registries()
+        assert registries[0].cache is not cache
+        del registries
+        gc.collect()
+        assert not any(
+            isinstance(registry, SnapshotRegistry) for registry in _fork_safe_registries
+        )
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork()")
+    def test_reset_in_forked_child(self) -> None:
+        registry = SnapshotRegistry(fork_safe=True)
+        cache = registry.cache
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            os._exit(0 if registry.cache is not cache else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert registry.cache is cache
+
+
+class ReloadConfig:
+    def __init__(
+        self, name: Annotated[str, SettingDetails("reload.name", "default")]
+    ) -> None:
+        self.name = name
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class ReloadConsumer:
+    def __init__(self, config: ReloadConfig) -> None:
+        self.config = config
+
+
+class TestReloadSettings:
+    @pytest.fixture
+    def reload_registry(
+        self, registry_instance: Registry, monkeypatch: pytest.MonkeyPatch
+    ) -> Registry:
+        monkeypatch.setenv("RELOAD_NAME", "first")
+        registry_instance.set_settings_provider(CachedEnvSettingsProvider())
+        for name, cls, lifetime in [
+            ("config", ReloadConfig, Lifetime.SINGLETON),
+            ("consumer", ReloadConsumer, Lifetime.SINGLETON),
+            ("cache", ChildCache, Lifetime.SINGLETON),
+        ]:
+            registry_instance.register_interface(
+                name,
+                cls,
+                implementation_details=ImplementationDetails(cls, lifetime=lifetime),
+            )
+        return registry_instance
+
+    def test_changed_settings_rebuilt(
+        self, reload_registry: Registry, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        consumer = reload_registry.consumer
+        cache = reload_registry.cache
+        monkeypatch.setenv("RELOAD_NAME", "second")
+        assert reload_registry.reload_settings() == {"config", "consumer"}
+        assert consumer.config.closed
+        assert reload_registry.consumer is not consumer
+        assert reload_registry.consumer.config.name == "second"
+        assert reload_registry.cache is cache
+
+    def test_unchanged_settings_kept(self, reload_registry: Registry) -> None:
+        consumer = reload_registry.consumer
+        assert reload_registry.reload_settings() == set()
+        assert reload_registry.consumer is consumer
+
+    def test_removed_setting(
+        self, reload_registry: Registry, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        reload_registry.register_interface(
+            "named",
+            SnapshotService,
+            implementation_details=ImplementationDetails(
+                SnapshotService, lifetime=Lifetime.SINGLETON
+            ),
+        )
+        monkeypatch.setenv("SNAPSHOT_NAME", "snapshot")
+        assert reload_registry.reload_settings() == set()
+        reload_registry.named
+        monkeypatch.delenv("SNAPSHOT_NAME")
+        assert reload_registry.reload_settings() == {"named"}
+
+    def test_identifiers(self, reload_registry: Registry) -> None:
+        consumer = reload_registry.consumer
+        assert reload_registry.reload_settings(["other.name"]) == set()
+        assert reload_registry.consumer is consumer
+        assert reload_registry.reload_settings(["reload.name"]) == {
+            "config",
+            "consumer",
+        }
+        assert reload_registry.consumer is not consumer
+
+    def test_transient_dependency(
+        self, reload_registry: Registry, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        reload_registry.config = ImplementationDetails(ReloadConfig)
+        consumer = reload_registry.consumer
+        monkeypatch.setenv("RELOAD_NAME", "second")
+        assert reload_registry.reload_settings() == {"consumer"}
+        assert reload_registry.consumer.config.name == "second"
+        assert not consumer.config.closed
+
+    def test_scoped_and_pooled(
+        self, reload_registry: Registry, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        reload_registry.config = ImplementationDetails(
+            ReloadConfig, lifetime=Lifetime.POOLED
+        )
+        reload_registry.consumer = ImplementationDetails(
+            ReloadConsumer, lifetime=Lifetime.SCOPED
+        )
+        with reload_registry.lease("config") as config:
+            pass
+        monkeypatch.setenv("RELOAD_NAME", "second")
+        with reload_registry.scope():
+            with pytest.raises(RegistryError, match="can only be used with lease"):
+                reload_registry.consumer
+            assert reload_registry.reload_settings() == {"config"}
+        assert config.closed
+        with reload_registry.lease("config") as config:
+            assert config.name == "second"
+
+    def test_children(
+        self, reload_registry: Registry, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        child = reload_registry.child()
+        child.register_interface(
+            "consumer",
+            ReloadConsumer,
+            implementation_details=ImplementationDetails(
+                ReloadConsumer, lifetime=Lifetime.SINGLETON
+            ),
+        )
+        own_provider_child = reload_registry.child()
+        own_provider_child.set_settings_provider(CachedEnvSettingsProvider())
+        child_consumer = child.consumer
+        own_provider_config = own_provider_child.config
+        monkeypatch.setenv("RELOAD_NAME", "second")
+        assert reload_registry.reload_settings() == {"consumer", "config"}
+        assert child.consumer is not child_consumer
+        assert child.consumer.config.name == "second"
+        assert own_provider_child.config is not own_provider_config
+        assert own_provider_child.config.name == "second"
+
+    def test_frozen_registry(
+        self, reload_registry: Registry, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        frozen_registry = reload_registry.freeze()
+        config = frozen_registry.config
+        monkeypatch.setenv("RELOAD_NAME", "second")
+        assert frozen_registry.reload_settings() == {"config"}
+        assert frozen_registry.config is not config
+        assert frozen_registry.config.name == "second"
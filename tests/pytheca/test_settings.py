@@ -3,11 +3,23 @@
 #
 # SPDX-License-Identifier: MIT
 
+import os
+from datetime import timedelta
+from pathlib import Path
 from typing import Any
 
 import pytest
-from pytheca.errors import SettingError
-from pytheca.settings import EnvSettingsProvider, SettingsProvider
+from pytheca.converters import ByteSize
+from pytheca.errors import SettingError, SettingsFileError
+from pytheca.settings import (
+    CachedEnvSettingsProvider,
+    ChainedSettingsProvider,
+    EnvSettingsProvider,
+    FileSettingsProvider,
+    SettingRequest,
+    SettingsProvider,
+    StaticSettingsProvider,
+)
 
 
 class TestSettingsProvider:
@@ -42,6 +54,28 @@ class TestSettingsProvider:
         assert exc_info.value.setting_identifier == identifier
         assert exc_info.value.setting_type is None
 
+    def test_get_setting_values(self, monkeypatch: Any) -> None:
+        monkeypatch.setenv("FOO_NUMBER", "5")
+        provider = EnvSettingsProvider()
+        assert provider.get_setting_values(
+            [
+                SettingRequest("foo.number", int),
+                SettingRequest("foo.missing", str, "default"),
+            ]
+        ) == [5, "default"]
+
+    def test_get_setting_values_with_converter(self, monkeypatch: Any) -> None:
+        monkeypatch.setenv("FOO_NUMBER", "5")
+        provider = EnvSettingsProvider()
+        assert provider.get_setting_values(
+            [SettingRequest("foo.number", int, None, lambda raw_value: raw_value * 2)]
+        ) == ["55"]
+
+    def test_get_setting_values_error(self) -> None:
+        provider = EnvSettingsProvider()
+        with pytest.raises(SettingError):
+            provider.get_setting_values([SettingRequest("foo.missing", int)])
+
 
 class TestEnvSettingsProvider:
     def test_instantiation_no_arguments(self) -> None:
@@ -58,6 +92,8 @@ class TestEnvSettingsProvider:
             ("1.0", float, 1.0),
             ("1.9", float, 1.9),
             ("10", float, 10.0),
+            ("1,2", list[int], [1, 2]),
+            ("30s", timedelta, timedelta(seconds=30)),
         ],
     )
     def test_get_settings_value_type_casting(
@@ -111,3 +147,354 @@ class TestEnvSettingsProvider:
     def test_default_value(self, monkeypatch: Any) -> None:
         settings_provider = EnvSettingsProvider()
         assert settings_provider.get_setting_value("foo.bar", int, 5) == 5
+
+
+class TestCachedEnvSettingsProvider:
+    def test_snapshot_taken_at_creation(self, monkeypatch: Any) -> None:
+        monkeypatch.setenv("FOO", "5")
+        settings_provider = CachedEnvSettingsProvider()
+        monkeypatch.setenv("FOO", "6")
+        assert settings_provider.snapshot["FOO"] == "5"
+        assert settings_provider.get_setting_value("foo", int) == 5
+
+    def test_snapshot_immutable(self) -> None:
+        settings_provider = CachedEnvSettingsProvider()
+        with pytest.raises(TypeError):
+            settings_provider.snapshot["FOO"] = "5"  # type: ignore[index]
+
+    def test_value_memoized(self, monkeypatch: Any) -> None:
+        monkeypatch.setenv("FOO_BAR", "5")
+        settings_provider = CachedEnvSettingsProvider()
+        assert settings_provider.get_setting_value("foo.bar", int) == 5
+        settings_provider.convert_value = None  # type: ignore[method-assign, assignment]
+        assert settings_provider.get_setting_value("foo.bar", int) == 5
+
+    def test_value_memoized_per_type(self, monkeypatch: Any) -> None:
+        monkeypatch.setenv("FOO", "5")
+        settings_provider = CachedEnvSettingsProvider()
+        assert settings_provider.get_setting_value("foo", int) == 5
+        assert settings_provider.get_setting_value("foo", str) == "5"
+
+    def test_missing_value(self, monkeypatch: Any) -> None:
+        monkeypatch.delenv("FOO_BAR", raising=False)
+        settings_provider = CachedEnvSettingsProvider()
+        assert settings_provider.get_setting_value("foo.bar", int, 5) == 5
+        with pytest.raises(SettingError, match="No value for foo.bar could be found."):
+            settings_provider.get_setting_value("foo.bar", int)
+
+    def test_invalid_identifier(self) -> None:
+        settings_provider = CachedEnvSettingsProvider()
+        with pytest.raises(SettingError, match="does not follow the identifier format"):
+            settings_provider.get_setting_value("foo/bar", int)
+
+    def test_unsuccessful_conversion(self, monkeypatch: Any) -> None:
+        monkeypatch.setenv("FOO", "bar")
+        settings_provider = CachedEnvSettingsProvider()
+        with pytest.raises(SettingError, match="Error converting bar"):
+            settings_provider.get_setting_value("foo", int)
+
+    def test_get_setting_values_memoized(self, monkeypatch: Any) -> None:
+        monkeypatch.setenv("FOO_BAR", "5")
+        settings_provider = CachedEnvSettingsProvider()
+        request = SettingRequest("foo.bar", int, None, lambda raw_value: 0)
+        assert settings_provider.get_setting_values([request]) == [5]
+        settings_provider.convert_value = None  # type: ignore[method-assign, assignment]
+        assert settings_provider.get_setting_values([request]) == [5]
+
+    def test_refresh(self, monkeypatch: Any) -> None:
+        monkeypatch.setenv("FOO", "5")
+        settings_provider = CachedEnvSettingsProvider()
+        assert settings_provider.get_setting_value("foo", int) == 5
+        monkeypatch.setenv("FOO", "6")
+        assert settings_provider.has_changed()
+        settings_provider.refresh()
+        assert not settings_provider.has_changed()
+        assert settings_provider.get_setting_value("foo", int) == 6
+
+    def test_change_detection(self, monkeypatch: Any) -> None:
+        monkeypatch.setenv("FOO", "5")
+        settings_provider = CachedEnvSettingsProvider(change_check_interval=0)
+        assert settings_provider.get_setting_value("foo", int) == 5
+        assert settings_provider.get_setting_value("foo", int) == 5
+        monkeypatch.setenv("FOO", "6")
+        assert settings_provider.get_setting_value("foo", int) == 6
+
+    def test_change_detection_interval(self, monkeypatch: Any) -> None:
+        monkeypatch.setenv("FOO", "5")
+        settings_provider = CachedEnvSettingsProvider(change_check_interval=3600)
+        monkeypatch.setenv("FOO", "6")
+        assert settings_provider.get_setting_value("foo", int) == 5
+
+
+class TestFileSettingsProvider:
+    @pytest.fixture
+    def config_files(self, tmp_path: Path) -> list[Path]:
+        toml_file = tmp_path / "base.toml"
+        toml_file.write_text(
+            'name = "base"\n[db]\nport = 5432\ntimeout = 10\nhosts = ["a"]\n'
+            "[tenant.a-b]\nenabled = true\n"
+        )
+        json_file = tmp_path / "override.json"
+        json_file.write_text('{"db": {"port": 6543}, "ratio": 0.5}')
+        ini_file = tmp_path / "local.ini"
+        ini_file.write_text("[DEFAULT]\nname = local\n[Cache]\nSize = 10\n")
+        return [toml_file, json_file, ini_file]
+
+    @pytest.mark.parametrize(
+        "raw_value,expected",
+        [("false", False), ("No", False), ("off", False), ("0", False), ("yes", True)],
+    )
+    def test_ini_boolean(self, tmp_path: Path, raw_value: str, expected: bool) -> None:
+        ini_file = tmp_path / "local.ini"
+        ini_file.write_text(f"[feature]\nenabled = {raw_value}\n")
+        settings_provider = FileSettingsProvider(ini_file)
+        assert settings_provider.get_setting_value("feature.enabled", bool) is expected
+        assert settings_provider.get_setting_value("feature.enabled", str) == raw_value
+
+    def test_invalid_ini_boolean(self, tmp_path: Path) -> None:
+        ini_file = tmp_path / "local.ini"
+        ini_file.write_text("[feature]\nenabled = maybe\n")
+        settings_provider = FileSettingsProvider(ini_file)
+        with pytest.raises(
+            SettingError,
+            match="Error converting maybe to <class 'bool'> requested for feature.enabled.",
+        ):
+            settings_provider.get_setting_value("feature.enabled", bool)
+
+    def test_ini_boolean_overridden(self, tmp_path: Path) -> None:
+        ini_file = tmp_path / "local.ini"
+        ini_file.write_text("[feature]\nenabled = false\nother = off\n")
+        json_file = tmp_path / "override.json"
+        json_file.write_text('{"feature": {"enabled": true}}')
+        settings_provider = FileSettingsProvider(ini_file, json_file)
+        assert settings_provider.get_setting_value("feature.enabled", bool) is True
+        assert settings_provider.get_setting_value("feature.other", bool) is False
+
+    def test_flat_index(self, config_files: list[Path]) -> None:
+        settings_provider = FileSettingsProvider(*config_files)
+        assert dict(settings_provider.index) == {
+            "name": "local",
+            "db.port": 6543,
+            "db.timeout": 10,
+            "db.hosts": ["a"],
+            "tenant.a-b.enabled": True,
+            "ratio": 0.5,
+            "cache.name": "local",
+            "cache.size": "10",
+        }
+
+    @pytest.mark.parametrize(
+        "identifier,setting_type,expected",
+        [
+            ("db.port", int, 6543),
+            ("DB.PORT", int, 6543),
+            ("db.timeout", float, 10.0),
+            ("db.port", str, "6543"),
+            ("tenant.a-b.enabled", bool, True),
+            ("cache.size", int, 10),
+            ("ratio", float, 0.5),
+            ("db.hosts", list, ["a"]),
+            ("db.hosts", list[str], ["a"]),
+            ("cache.size", ByteSize, 10),
+        ],
+    )
+    def test_get_setting_value(
+        self,
+        config_files: list[Path],
+        identifier: str,
+        setting_type: type,
+        expected: Any,
+    ) -> None:
+        settings_provider = FileSettingsProvider(*config_files)
+        assert settings_provider.get_setting_value(identifier, setting_type) == expected
+
+    def test_unsupported_type(self, config_files: list[Path]) -> None:
+        settings_provider = FileSettingsProvider(*config_files)
+        with pytest.raises(
+            SettingError,
+            match="<class 'str'> requested for db.hosts not supported by SettingProvider.",
+        ):
+            settings_provider.get_setting_value("db.hosts", str)
+
+    def test_unsuccessful_conversion(self, config_files: list[Path]) -> None:
+        settings_provider = FileSettingsProvider(*config_files)
+        with pytest.raises(SettingError, match="Error converting local"):
+            settings_provider.get_setting_value("name", int)
+
+    def test_default_value(self, config_files: list[Path]) -> None:
+        settings_provider = FileSettingsProvider(*config_files)
+        assert settings_provider.get_setting_value("foo.bar", int, 5) == 5
+        with pytest.raises(SettingError, match="No value for foo.bar could be found."):
+            settings_provider.get_setting_value("foo.bar", int)
+
+    def test_invalid_identifier(self, config_files: list[Path]) -> None:
+        settings_provider = FileSettingsProvider(*config_files)
+        with pytest.raises(SettingError, match="does not follow the identifier format"):
+            settings_provider.get_setting_value("foo/bar", int)
+
+    def test_file_parsed_once(self, config_files: list[Path], monkeypatch: Any) -> None:
+        settings_provider = FileSettingsProvider(*config_files)
+        monkeypatch.setattr(
+            settings_provider, "_parse_file", lambda path: pytest.fail("parsed again")
+        )
+        assert settings_provider.get_setting_value("db.port", int) == 6543
+        assert settings_provider.get_setting_value("db.port", int) == 6543
+
+    def test_unsupported_format(self, tmp_path: Path) -> None:
+        with pytest.raises(
+            SettingsFileError, match="settings.yaml has an unsupported format."
+        ) as exc_info:
+            FileSettingsProvider(tmp_path / "settings.yaml")
+        assert exc_info.value.path == str(tmp_path / "settings.yaml")
+
+    def test_missing_file(self, tmp_path: Path, config_files: list[Path]) -> None:
+        missing_file = tmp_path / "missing.toml"
+        with pytest.raises(SettingsFileError, match="missing.toml does not exist."):
+            FileSettingsProvider(missing_file)
+        settings_provider = FileSettingsProvider(
+            config_files[0], missing_file, missing_ok=True
+        )
+        assert settings_provider.get_setting_value("db.port", int) == 5432
+
+    @pytest.mark.parametrize(
+        "file_name,content",
+        [
+            ("broken.toml", "foo = "),
+            ("broken.json", "{"),
+            ("broken.json", "[1, 2]"),
+            ("broken.ini", "foo = bar"),
+        ],
+    )
+    def test_parse_error(self, tmp_path: Path, file_name: str, content: str) -> None:
+        path = tmp_path / file_name
+        path.write_text(content)
+        with pytest.raises(SettingsFileError, match="could not be parsed"):
+            FileSettingsProvider(path)
+
+    def test_refresh(self, config_files: list[Path]) -> None:
+        settings_provider = FileSettingsProvider(config_files[1])
+        assert settings_provider.get_setting_value("db.port", int) == 6543
+        config_files[1].write_text('{"db": {"port": 1234}}')
+        os.utime(config_files[1], ns=(0, 0))
+        assert settings_provider.has_changed()
+        assert settings_provider.get_setting_value("db.port", int) == 6543
+        settings_provider.refresh()
+        assert not settings_provider.has_changed()
+        assert settings_provider.get_setting_value("db.port", int) == 1234
+
+    def test_change_detection(self, config_files: list[Path]) -> None:
+        settings_provider = FileSettingsProvider(
+            config_files[1], change_check_interval=0
+        )
+        assert settings_provider.get_setting_value("db.port", int) == 6543
+        assert settings_provider.get_setting_value("db.port", int) == 6543
+        config_files[1].write_text('{"db": {"port": 1234}}')
+        os.utime(config_files[1], ns=(0, 0))
+        assert settings_provider.get_setting_value("db.port", int) == 1234
+
+
+class TestChainedSettingsProvider:
+    class DictSettingsProvider(SettingsProvider):
+        def __init__(self, values: dict[str, Any]) -> None:
+            super().__init__()
+            self.values = values
+            self.lookups: list[str] = []
+
+        def get_setting_value(
+            self, setting_identifier: str, setting_type: Any, default_value: Any = None
+        ) -> Any:
+            self.lookups.append(setting_identifier)
+            if setting_identifier in self.values:
+                return setting_type(self.values[setting_identifier])
+            if default_value is None:
+                raise SettingError("missing", setting_identifier)
+            return default_value
+
+    @pytest.fixture
+    def layers(self) -> list[DictSettingsProvider]:
+        return [
+            self.DictSettingsProvider({"foo": "1"}),
+            self.DictSettingsProvider({"foo": "2", "bar": "3"}),
+        ]
+
+    def test_first_layer_wins(self, layers: list[DictSettingsProvider]) -> None:
+        settings_provider = ChainedSettingsProvider(*layers)
+        assert settings_provider.get_setting_value("foo", int) == 1
+        assert settings_provider.get_setting_value("bar", int) == 3
+
+    def test_answering_layer_cached(self, layers: list[DictSettingsProvider]) -> None:
+        settings_provider = ChainedSettingsProvider(*layers)
+        settings_provider.get_setting_value("bar", int)
+        settings_provider.get_setting_value("bar", str)
+        assert layers[0].lookups == ["bar"]
+        assert layers[1].lookups == ["bar", "bar"]
+
+    def test_missing_value_not_cached(self, layers: list[DictSettingsProvider]) -> None:
+        settings_provider = ChainedSettingsProvider(*layers)
+        assert settings_provider.get_setting_value("baz", int, 5) == 5
+        with pytest.raises(SettingError, match="No value for baz could be found."):
+            settings_provider.get_setting_value("baz", int)
+        assert layers[0].lookups == ["baz", "baz"]
+        layers[1].values["baz"] = "6"
+        assert settings_provider.get_setting_value("baz", int) == 6
+
+    def test_value_removed_from_cached_layer(
+        self, layers: list[DictSettingsProvider]
+    ) -> None:
+        settings_provider = ChainedSettingsProvider(*layers)
+        assert settings_provider.get_setting_value("foo", int) == 1
+        del layers[0].values["foo"]
+        assert settings_provider.get_setting_value("foo", int) == 2
+
+    def test_clear_cache(self, layers: list[DictSettingsProvider]) -> None:
+        settings_provider = ChainedSettingsProvider(*layers)
+        settings_provider.get_setting_value("bar", int)
+        layers[0].values["bar"] = "4"
+        assert settings_provider.get_setting_value("bar", int) == 3
+        settings_provider.clear_cache()
+        assert settings_provider.get_setting_value("bar", int) == 4
+
+    def test_refresh(self, layers: list[DictSettingsProvider]) -> None:
+        settings_provider = ChainedSettingsProvider(*layers)
+        settings_provider.get_setting_value("bar", int)
+        layers[0].values["bar"] = "4"
+        settings_provider.refresh()
+        assert settings_provider.get_setting_value("bar", int) == 4
+
+    def test_invalid_identifier(self, layers: list[DictSettingsProvider]) -> None:
+        settings_provider = ChainedSettingsProvider(*layers)
+        with pytest.raises(SettingError, match="does not follow the identifier format"):
+            settings_provider.get_setting_value("foo/bar", int)
+
+    def test_builtin_providers(self, monkeypatch: Any, tmp_path: Path) -> None:
+        settings_file = tmp_path / "settings.json"
+        settings_file.write_text('{"foo": {"bar": 1}, "baz": 2}')
+        monkeypatch.setenv("FOO_BAR", "10")
+        settings_provider = ChainedSettingsProvider(
+            CachedEnvSettingsProvider(),
+            EnvSettingsProvider(),
+            FileSettingsProvider(settings_file),
+        )
+        assert settings_provider.get_setting_value("foo.bar", int) == 10
+        assert settings_provider.get_setting_value("baz", int) == 2
+
+
+class TestStaticSettingsProvider:
+    def test_values_returned_unconverted(self) -> None:
+        settings_provider = StaticSettingsProvider({("foo", list[int]): ["1", 2]})
+        assert settings_provider.get_setting_value("foo", list[int]) == ["1", 2]
+
+    def test_values_by_type(self) -> None:
+        settings_provider = StaticSettingsProvider(
+            {("db.port", int): 5432, ("db.port", str): "5432"}
+        )
+        assert settings_provider.get_setting_value("db.port", int) == 5432
+        assert settings_provider.get_setting_value("db.port", str) == "5432"
+        with pytest.raises(SettingError, match="No value for db.port could be found."):
+            settings_provider.get_setting_value("db.port", float)
+
+    def test_default_value(self) -> None:
+        settings_provider = StaticSettingsProvider({})
+        assert settings_provider.get_setting_value("foo", int, 5) == 5
+        with pytest.raises(SettingError, match="No value for foo could be found."):
+            settings_provider.get_setting_value("foo", int)